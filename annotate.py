@@ -0,0 +1,513 @@
+# ---------------------------------------------------------------------------------------------------
+# ANOTAÇÃO DE TIPOS
+# ---------------------------------------------------------------------------------------------------
+# Passada que percorre um comando de nível superior (uma função inteira ou um comando do main) uma
+# única vez, de baixo para cima, e grava em cada expressão o seu tipo C (atributo ctype: 'int',
+# 'float', 'str', 'list[t]', uma lista com elementos do tipo t, ou 'dict[k, v]', um dicionário com
+# chaves do tipo k e valores do tipo v). O gerador de código só lê ctype, sem inferir tipos de novo; assim os tipos
+# usados no printf e nas declarações são sempre os mesmos.
+# Escopos: o env de uma função começa com os seus parâmetros; o do main é o main_env do gerador; cada
+# bloco (corpo de if, else, while ou for) recebe uma cópia do env de fora, como os blocos em C. A
+# primeira atribuição a uma variável no escopo a declara (Assignment.declares) com o tipo do valor;
+# atribuições seguintes não mudam o tipo, já que a variável em C continua declarada com ele.
+# Anotações de tipo têm precedência sobre a inferência: a variável declarada por x: float = 1 (ou por
+# x: float, sem valor) é um float, um parâmetro anotado tem o tipo anotado em todas as especializações
+# (ver CGenerator.param_types) e uma função com -> float devolve float, seja qual for o tipo dos seus
+# returns. Só vale a anotação que declara a variável; as seguintes, no mesmo escopo, são ignoradas.
+# A anotação também registra as partes do runtime (runtime.py) de que os comandos anotados precisam
+# (TypeAnnotator.runtime): 'str' para as strings, 'entrada' para o leitor da entrada padrão e o
+# próprio tipo de cada lista ('list[int]', ...) e de cada dicionário ('dict[str, int]', ...), que têm
+# funções especializadas para os seus elementos.
+# Uma lista literal atribuída a uma variável que já é uma lista, ou com anotação (x: list[float] = []),
+# fica com o tipo da variável; senão, o tipo vem dos elementos, que devem ser todos do mesmo tipo (ou
+# int e float, e a lista é de floats). O mesmo vale para um dicionário literal (d: dict[str, int] =
+# {}), com os tipos das chaves e dos valores vindos dos pares (dict[int, int] se não houver nenhum).
+# Uma variável declarada com uma lista vazia sem anotação (x = []) tem o tipo dos elementos inferido
+# do primeiro x.append(v) ou x[i] = v (ver _Vazia); com um dicionário vazio (d = {}), o tipo das
+# chaves vem do primeiro d[k] = v ou k in d, e o dos valores, do primeiro d[k] = v. Um d[k] lido antes
+# disso (if k in d: d[k] = d[k] + 1, else: d[k] = 1) usa o primeiro d[k] = v do comando de nível
+# superior (ou da função) cujo valor não lê d. Se a variável for usada de outra forma antes disso, ou
+# não houver nenhum no seu escopo, é um erro que pede a anotação.
+# No main, eles podem estar em comandos de nível superior seguintes: a resolução
+# (CGenerator.resolve_specializations) deixa em env um tipo provisório ('list[?]', 'dict[str, ?]')
+# até lá e guarda o tipo inferido em inferidos, usado pela declaração na rodada seguinte e na geração.
+# ---------------------------------------------------------------------------------------------------
+
+from ast_nodes import *
+
+# Operadores binários cujo resultado em C é sempre int.
+_OPERADORES_INT = frozenset(('<', '>', '<=', '>=', '==', '!=', '&&', '||', 'in', 'not in'))
+
+# Tipo devolvido pelas funções do Python traduzidas pelo gerador (ver CGenerator._embutidas) e as
+# partes do runtime que as suas chamadas usam.
+_TIPOS_DAS_EMBUTIDAS = {'input': 'str', 'int': 'int', 'float': 'float', 'str': 'str', 'len': 'int'}
+_RUNTIME_DAS_EMBUTIDAS = {'input': ('str', 'entrada'), 'int': ('entrada',), 'float': ('entrada',), 'str': ('str',)}
+
+# Tipo dos elementos de um tipo de lista ('list[float]' -> 'float'), ou None se t não é uma lista.
+def elemento_da_lista(t):
+    if t is not None and t.startswith('list['):
+        return t[5:-1]
+    return None
+
+# Tipos das chaves e dos valores de um tipo de dicionário ('dict[str, list[int]]' -> ('str',
+# 'list[int]')), ou None se t não é um dicionário.
+def chave_e_valor_do_dict(t):
+    if t is None or not t.startswith('dict['):
+        return None
+    nivel = 0
+    for i, c in enumerate(t[5:-1], 5):
+        if c == '[':
+            nivel += 1
+        elif c == ']':
+            nivel -= 1
+        elif c == ',' and nivel == 0:
+            return t[5:i], t[i + 2:-1]
+    return None
+
+# Tipo comum a valores de uma lista ou de um dicionário literal: float se misturar int e float, int se
+# não houver nenhum. Outras misturas não têm um tipo C comum.
+def _tipo_comum(tipos):
+    if not tipos:
+        return 'int'
+    diferentes = set(tipos)
+    if diferentes == {'int', 'float'}:
+        return 'float'
+    if len(diferentes) > 1:
+        raise NotImplementedError(f"Valores de tipos diferentes no mesmo literal: {', '.join(sorted(diferentes))}")
+    return tipos[0]
+
+# Tipo de x[i]: o dos valores se t é um dicionário, senão o dos elementos da lista (int se t não é
+# nenhum dos dois; o gerador recusa a indexação).
+def _tipo_do_item(t):
+    dicionario = chave_e_valor_do_dict(t)
+    if dicionario is not None:
+        return dicionario[1]
+    return elemento_da_lista(t) or 'int'
+
+# Uma lista ou um dicionário literal com o tipo t, se t é do mesmo tipo de coleção (x: list[float] =
+# [], d[k] = [] em um dict[str, list[int]]), fica com esse tipo em vez do inferido dos seus valores.
+def _ajusta_literal(valor, t):
+    if (type(valor) is List and elemento_da_lista(t) is not None
+            or type(valor) is Dict and chave_e_valor_do_dict(t) is not None):
+        valor.ctype = t
+
+
+# Um tipo provisório de uma variável do main (ver _Vazia.provisorio).
+def _provisorio(t):
+    return type(t) is str and '?' in t
+
+
+# Tipo de uma variável declarada com [] ou {} sem anotação, em env, enquanto o tipo dos elementos (ou
+# o das chaves e o dos valores) não é conhecido. nos são os nós cujo ctype é o tipo da variável (o
+# alvo e o valor da declaração e os usos da variável), preenchidos quando ele é conhecido. do_main: a
+# variável é do escopo do main, e o tipo pode vir de um comando de nível superior seguinte.
+class _Vazia:
+    def __init__(self, nome, literal, do_main=False):
+        self.nome = nome
+        self.literal = literal
+        self.dicionario = literal == "{}"
+        self.do_main = do_main
+        self.chave = self.valor = None
+        self.nos = []
+
+    def tipo(self):
+        if self.valor is None or self.dicionario and self.chave is None:
+            return None
+        return f"dict[{self.chave}, {self.valor}]" if self.dicionario else f"list[{self.valor}]"
+
+    # Tipo que fica em env entre dois comandos de nível superior do main.
+    def provisorio(self):
+        if self.dicionario:
+            return f"dict[{self.chave or '?'}, {self.valor or '?'}]"
+        return f"list[{self.valor or '?'}]"
+
+    # Tipos (chave, valor) de t, se t é o mesmo tipo de coleção (a chave de uma lista é None).
+    def partes(self, t):
+        if self.dicionario:
+            return chave_e_valor_do_dict(t)
+        return None if elemento_da_lista(t) is None else (None, elemento_da_lista(t))
+
+    def erro(self):
+        exemplo = "dict[str, int]" if self.dicionario else "list[int]"
+        return NotImplementedError(f"Não foi possível inferir o tipo de {self.nome} = {self.literal}: anote a "
+                                   f"variável (ex: {self.nome}: {exemplo} = {self.literal})")
+
+
+# Nomes das variáveis lidas na expressão expr.
+def _nomes_lidos(expr):
+    nomes, pilha = set(), [expr]
+    while pilha:
+        e = pilha.pop()
+        if type(e) is Name:
+            nomes.add(e.id)
+        pilha.extend(iter_child_nodes(e))
+    return nomes
+
+# Os comandos nome[k] = v dos comandos de body (e dos blocos dentro deles), na ordem do código.
+def _guardas(body, nome):
+    pilha = list(reversed(body))
+    while pilha:
+        no = pilha.pop()
+        if type(no) is SubscriptAssignment and type(no.target.value) is Name and no.target.value.id == nome:
+            yield no
+        pilha.extend(reversed(list(iter_child_nodes(no))))
+
+# A _Vazia de um tipo provisório t deixado em env por um comando anterior do main.
+def _retoma(nome, t, do_main):
+    vazia = _Vazia(nome, "{}" if t.startswith("dict[") else "[]", do_main)
+    chave, valor = vazia.partes(t)
+    vazia.chave = None if chave == '?' else chave
+    vazia.valor = None if valor == '?' else valor
+    return vazia
+
+
+class TypeAnnotator:
+    # specialize(nome, tipos dos argumentos): devolve a especialização da função chamada (um dicionário
+    # com "name", "params_types" e "ret_type") ou None se não for uma função do programa; é o
+    # CGenerator.specialize, que cria e resolve as especializações sob demanda.
+    def __init__(self, specialize):
+        self.specialize = specialize
+        # Partes do runtime usadas pelos comandos anotados; o gerador as escreve no programa (ver
+        # CGenerator.emit_headers).
+        self.runtime = set()
+        # Tipo do primeiro return encontrado na função sendo anotada (None se ainda não houve).
+        self._retorno = None
+        # Variáveis declaradas com [] ou {} no comando de nível superior sendo anotado (ver _Vazia) e o env
+        # do main, se ele é um comando do main; escopo: os comandos sendo anotados (o comando do main
+        # ou o corpo da função).
+        self._vazias = []
+        self._main = None
+        self._escopo = ()
+        # Resolução do main (ver CGenerator.resolve_specializations): variáveis do main com um tipo
+        # provisório na rodada atual e tipos inferidos para as declaradas com [] ou {}.
+        self.resolvendo = False
+        self._abertas = set()
+        self.inferidos = {}
+
+    # Anota o corpo de uma função com os tipos de parâmetros dados e devolve o tipo de retorno anotado
+    # ou, sem anotação, o do seu primeiro return ('void' se não houver). Pode ser chamada de novo no meio de outra anotação (ao resolver
+    # uma função chamada), por isso o estado do return é salvo e restaurado.
+    def annotate_function(self, f, params_types):
+        anterior, self._retorno = self._retorno, None
+        vazias, self._vazias = self._vazias, []
+        main, self._main = self._main, None
+        escopo, self._escopo = self._escopo, f.body
+        env = dict(zip(f.params, params_types))
+        for t in params_types:
+            self._registra(t)
+        self._registra(f.returns)
+        for st in f.body:
+            self._comando(st, env)
+        self._fecha_vazias(env)
+        retorno, self._retorno = self._retorno, anterior
+        self._vazias, self._main, self._escopo = vazias, main, escopo
+        return f.returns or retorno or 'void'
+
+    # Registra em runtime as partes de que os valores do tipo t precisam.
+    def _registra(self, t):
+        if t == 'str':
+            self.runtime.add('str')
+        elif elemento_da_lista(t) is not None:
+            self.runtime.add(t)
+            self._registra(elemento_da_lista(t))
+        elif chave_e_valor_do_dict(t) is not None:
+            self.runtime.add(t)
+            for tipo in chave_e_valor_do_dict(t):
+                self._registra(tipo)
+
+    # Anota um comando de nível superior do main no escopo env; as variáveis que ele declara são
+    # acrescentadas a env.
+    def annotate(self, node, env):
+        self._vazias, self._main, self._escopo = [], env, (node,)
+        self._comando(node, env)
+        self._fecha_vazias(env)
+        self._vazias, self._main, self._escopo = [], None, ()
+
+    def _comando(self, node, env):
+        anotar = self._comandos.get(type(node))
+        if anotar is not None:
+            anotar(self, node, env)
+
+    def annotate_block(self, body, env):
+        escopo = env.copy()
+        for st in body:
+            self._comando(st, escopo)
+
+    # No fim de um comando de nível superior, toda lista ou dicionário vazio declarado nele precisa
+    # ter o tipo conhecido; só os do main, durante a resolução, podem ficar com o tipo provisório em
+    # env.
+    def _fecha_vazias(self, env):
+        for vazia in self._vazias:
+            if vazia.tipo() is None and not (vazia.do_main and self.resolvendo):
+                raise vazia.erro()
+            if vazia.do_main:
+                env[vazia.nome] = vazia.provisorio()
+                self._abertas.add(vazia.nome)
+
+    # Fim de uma rodada da resolução do main (com o seu env): as variáveis com tipo provisório
+    # precisam tê-lo completado. Devolve True se algum tipo inferido mudou, e a resolução precisa de
+    # outra rodada para a declaração usá-lo.
+    def fecha_main(self, env):
+        mudou = False
+        for var in self._abertas:
+            t = env.get(var)
+            if _provisorio(t):
+                raise _retoma(var, t, True).erro()
+            mudou = mudou or self.inferidos.get(var) != t
+            self.inferidos[var] = t
+        self._abertas = set()
+        return mudou
+
+    # Os tipos que um comando do main reaproveitado do cache deixou em env (sem passar pela anotação):
+    # os provisórios contam como os deixados por _fecha_vazias.
+    def reaproveita(self, efeitos):
+        self._abertas.update(var for var, t in efeitos.items() if _provisorio(t))
+
+    def _nova_vazia(self, vazia):
+        self._vazias.append(vazia)
+        return vazia
+
+    # Tipo da variável var de env para o nó no (o seu ctype); com um tipo provisório (_Vazia), o nó é
+    # guardado para receber o tipo final, e o tipo devolvido é None enquanto ele não é conhecido. Um
+    # tipo provisório deixado em env por um comando anterior do main volta a ser uma _Vazia, a mesma
+    # em todos os blocos do comando.
+    def _tipo_da_variavel(self, var, no, env):
+        t = env[var]
+        if _provisorio(t):
+            if type(self._main.get(var)) is not _Vazia:
+                self._main[var] = self._nova_vazia(_retoma(var, t, True))
+            t = env[var] = self._main[var]
+        if type(t) is _Vazia:
+            t.nos.append(no)
+            t = t.tipo()
+        no.ctype = t
+        return t
+
+    # A _Vazia da variável expr, se expr é uma variável declarada com [] ou {} sem anotação.
+    def _vazia(self, expr, env):
+        if type(expr) is Name and (type(env.get(expr.id)) is _Vazia or _provisorio(env.get(expr.id))):
+            self._tipo_da_variavel(expr.id, expr, env)
+            return env[expr.id]
+        return None
+
+    # d[k] lido com o tipo dos valores de d (uma _Vazia) ainda desconhecido: o tipo vem do primeiro
+    # d[k] = v do escopo cujo valor pode ser anotado agora, sem ler d e só com variáveis já declaradas.
+    def _adianta(self, vazia, env):
+        for guarda in _guardas(self._escopo, vazia.nome):
+            nomes = _nomes_lidos(guarda.value)
+            if vazia.nome not in nomes and nomes <= env.keys():
+                self._completa(vazia, None, self.expr_type(guarda.value, env))
+                return
+
+    # Completa a _Vazia com o tipo das chaves e o dos valores (ou dos elementos), os que ela ainda não
+    # tinha; None quando não é conhecido.
+    def _completa(self, vazia, chave, valor):
+        if vazia.tipo() is not None:
+            return
+        vazia.chave = vazia.chave or chave
+        vazia.valor = vazia.valor or valor
+        if vazia.tipo() is not None:
+            for no in vazia.nos:
+                no.ctype = vazia.tipo()
+            self._registra(vazia.tipo())
+
+    # COMANDOS
+    def stmt_assignment(self, node, env):
+        t = self.expr_type(node.value, env)
+        var = node.target.id
+        vazio = (type(node.value) is List and not node.value.elements
+                 or type(node.value) is Dict and not node.value.keys)
+        node.declares = var not in env
+        if node.declares:
+            if node.annotation is not None or not vazio:
+                env[var] = node.annotation or t
+            elif env is self._main and var in self.inferidos:
+                env[var] = self.inferidos[var]
+            else:
+                literal = "[]" if type(node.value) is List else "{}"
+                env[var] = self._nova_vazia(_Vazia(var, literal, do_main=env is self._main))
+        self._tipo_da_variavel(var, node.target, env)
+        vazia = env[var] if type(env[var]) is _Vazia else None
+        if vazia is not None and vazio:
+            vazia.nos.append(node.value)
+        elif vazia is not None and vazia.partes(t) is not None:
+            self._completa(vazia, *vazia.partes(t))
+        tipo = node.target.ctype
+        _ajusta_literal(node.value, tipo)
+        self._registra(tipo)
+
+    def stmt_declaration(self, node, env):
+        var = node.target.id
+        node.declares = var not in env
+        if node.declares:
+            env[var] = node.annotation
+        self._registra(self._tipo_da_variavel(var, node.target, env))
+
+    # x[i] = v em uma lista declarada com [] dá o tipo dos seus elementos, e d[k] = v em um dicionário
+    # declarado com {}, o das suas chaves e o dos seus valores.
+    def stmt_subscript_assignment(self, node, env):
+        alvo = node.target
+        vazia = self._vazia(alvo.value, env)
+        chave = self.expr_type(alvo.index, env)
+        valor = self.expr_type(node.value, env)
+        if vazia is not None:
+            self._completa(vazia, chave if vazia.dicionario else None, valor)
+        alvo.ctype = _tipo_do_item(self.expr_type(alvo.value, env))
+        _ajusta_literal(node.value, alvo.ctype)
+
+    def stmt_if(self, node, env):
+        self.expr_type(node.condition, env)
+        self.annotate_block(node.body, env)
+        if node.else_body:
+            self.annotate_block(node.else_body, env)
+
+    def stmt_while(self, node, env):
+        self.expr_type(node.condition, env)
+        self.annotate_block(node.body, env)
+
+    # A variável do laço é um int; como em Python, continua existindo depois do laço, então é
+    # declarada no escopo de fora (e não no bloco do corpo).
+    def stmt_for(self, node, env):
+        for arg in (node.start, node.stop, node.step):
+            if arg is not None:
+                self.expr_type(arg, env)
+        var = node.target.id
+        node.declares = var not in env
+        if node.declares:
+            env[var] = 'int'
+        self._tipo_da_variavel(var, node.target, env)
+        self.annotate_block(node.body, env)
+
+    def stmt_return(self, node, env):
+        t = self.expr_type(node.value, env)
+        if self._retorno is None:
+            self._retorno = t
+
+    def stmt_call(self, node, env):
+        self.expr_type(node, env)
+
+    # EXPRESSÕES
+        # Calcula o tipo de uma expressão a partir dos tipos dos filhos (cada nó é visitado uma vez)
+        # e o grava em ctype.
+    def expr_type(self, expr, env):
+        anotar = self._expressoes.get(type(expr))
+        t = anotar(self, expr, env) if anotar is not None else 'int'
+        expr.ctype = t
+        return t
+
+    def type_number(self, expr, env):
+        return 'float' if isinstance(expr.value, float) else 'int'
+
+    def type_string(self, expr, env):
+        self.runtime.add('str')
+        return 'str'
+
+    # Comparações, in e operadores lógicos valem 0 ou 1 em C (int), mesmo entre floats e strings. O +
+    # com uma string é uma concatenação, e o * de uma lista por um int, uma lista repetida ([0] * n).
+    # Nenhuma outra conta aceita listas ou dicionários. k in d, com d declarado com {}, dá o tipo das
+    # chaves de d.
+    def type_binop(self, expr, env):
+        t1 = self.expr_type(expr.left, env)
+        vazia = self._vazia(expr.right, env) if expr.op in ('in', 'not in') else None
+        if vazia is not None and vazia.dicionario:
+            self._completa(vazia, t1, None)
+            return 'int'
+        t2 = self.expr_type(expr.right, env)
+        if expr.op in _OPERADORES_INT:
+            return 'int'
+        if 'str' in (t1, t2) and expr.op == '+':
+            return 'str'
+        if expr.op == '*':
+            if elemento_da_lista(t1) is not None and t2 == 'int':
+                return t1
+            if elemento_da_lista(t2) is not None and t1 == 'int':
+                return t2
+        for t in (t1, t2):
+            if elemento_da_lista(t) is not None or chave_e_valor_do_dict(t) is not None:
+                raise NotImplementedError(f"Operador {expr.op} não suportado para o tipo {t}")
+        return 'float' if 'float' in (t1, t2) else 'int'
+
+    def type_unaryop(self, expr, env):
+        self.expr_type(expr.operand, env)
+        return 'int'
+
+    # Uma variável declarada com [] ou {} só pode ser usada assim depois que o seu tipo é conhecido.
+    def type_name(self, expr, env):
+        if expr.id not in env:
+            return 'int'
+        t = self._tipo_da_variavel(expr.id, expr, env)
+        if t is None:
+            raise env[expr.id].erro()
+        return t
+
+    # Os elementos de uma lista literal têm um único tipo (ver _tipo_comum), assim como as chaves e os
+    # valores de um dicionário literal.
+    def type_list(self, expr, env):
+        t = f"list[{_tipo_comum([self.expr_type(e, env) for e in expr.elements])}]"
+        self._registra(t)
+        return t
+
+    def type_dict(self, expr, env):
+        chave = _tipo_comum([self.expr_type(k, env) for k in expr.keys])
+        valor = _tipo_comum([self.expr_type(v, env) for v in expr.values])
+        t = f"dict[{chave}, {valor}]"
+        self._registra(t)
+        return t
+
+    # x[i] tem o tipo dos elementos da lista; d[k], o dos valores do dicionário (ver _adianta, se d foi
+    # declarado com {} e ele ainda não é conhecido).
+    def type_subscript(self, expr, env):
+        vazia = self._vazia(expr.value, env)
+        if vazia is not None and vazia.dicionario and vazia.tipo() is None:
+            self._completa(vazia, self.expr_type(expr.index, env), None)
+            self._adianta(vazia, env)
+        t = self.expr_type(expr.value, env)
+        self.expr_type(expr.index, env)
+        return _tipo_do_item(t)
+
+    # append não devolve nada; em uma lista declarada com [], o primeiro dá o tipo dos seus elementos.
+    def type_method(self, expr, env):
+        vazia = self._vazia(expr.value, env) if expr.name == 'append' else None
+        tipos = [self.expr_type(arg, env) for arg in expr.args]
+        if vazia is not None and not vazia.dicionario and len(tipos) == 1:
+            self._completa(vazia, None, tipos[0])
+        t = self.expr_type(expr.value, env)
+        if expr.name == 'append' and len(expr.args) == 1:
+            _ajusta_literal(expr.args[0], elemento_da_lista(t))
+        return 'void' if expr.name == 'append' else 'int'
+
+    # Chamada: escolhe a especialização da função para os tipos dos argumentos (guardada em spec).
+    # input e str devolvem uma string, len um int e int e float, o tipo que convertem.
+    def type_call(self, expr, env):
+        arg_types = [self.expr_type(arg, env) for arg in expr.args]
+        expr.spec = self.specialize(expr.name, arg_types)
+        if expr.spec is not None:
+            return expr.spec["ret_type"]
+        self.runtime.update(_RUNTIME_DAS_EMBUTIDAS.get(expr.name, ()))
+        return _TIPOS_DAS_EMBUTIDAS.get(expr.name, 'int')
+
+    # TABELAS DE DESPACHO
+    _comandos = {
+        Assignment: stmt_assignment,
+        Declaration: stmt_declaration,
+        If: stmt_if,
+        While: stmt_while,
+        For: stmt_for,
+        Return: stmt_return,
+        FunctionCall: stmt_call,
+        SubscriptAssignment: stmt_subscript_assignment,
+        MethodCall: stmt_call,
+    }
+
+    _expressoes = {
+        Number: type_number,
+        String: type_string,
+        BinOp: type_binop,
+        UnaryOp: type_unaryop,
+        Name: type_name,
+        FunctionCall: type_call,
+        List: type_list,
+        Dict: type_dict,
+        Subscript: type_subscript,
+        MethodCall: type_method,
+    }
@@ -4,8 +4,36 @@
 # AST é uma estrutura de dados que representa a estrutura hierárquica do código-fonte de maneira mais abstrata. Cada tipo de comando ou expressão no código será representado por um nó na árvore.
 # ---------------------------------------------------------------------------------------------------
 
+# Os nós usam __slots__: sem o __dict__ por instância, cada nó ocupa bem menos memória e é criado
+# mais rápido, o que importa em ASTs de milhões de nós.
+# _fields lista os campos de cada tipo de nó, na ordem do construtor. _child_fields é o subconjunto
+# deles que guarda nós filhos (um nó, uma lista de nós ou None), na ordem em que aparecem no código;
+# é o que as travessias genéricas usam para visitar os filhos (ver iter_child_nodes).
+# Todo nó também guarda a posição onde começa no código-fonte (lineno, col_offset; linha a partir de 1,
+# coluna a partir de 0), preenchida pelo parser. Em nós criados depois do parse, a posição é None.
+# Os nós de expressão têm ainda ctype, o tipo C da expressão, Assignment, Declaration e For têm declares
+# (se o comando declara a variável) e FunctionCall tem spec (a especialização chamada),
+# preenchidos pela anotação de tipos (annotate.py).
+
+# Atributos preenchidos depois da construção do nó; valem None enquanto não forem definidos.
+_ANOTACOES = frozenset(('lineno', 'col_offset', 'ctype', 'declares', 'spec'))
+
 class Node:
-    pass
+    __slots__ = ('lineno', 'col_offset')
+    _fields = ()
+    _child_fields = ()
+
+    # Só é chamado quando o atributo não foi definido: posição ainda não preenchida.
+    def __getattr__(self, nome):
+        if nome in _ANOTACOES:
+            return None
+        raise AttributeError(f"{type(self).__name__!r} object has no attribute {nome!r}")
+
+    # Define a posição do nó no código-fonte e devolve o próprio nó.
+    def set_span(self, lineno, col_offset):
+        self.lineno = lineno
+        self.col_offset = col_offset
+        return self
 
 # ---------------------------------------------------------------------------------------------------
 # PROGRAM
@@ -15,6 +43,10 @@ class Node:
 # O nó Program é o ponto de entrada da árvore, que é alimentado com a lista de comandos que foram extraídos e processados pelo parser.
 
 class Program(Node):
+    __slots__ = ('statements',)
+    _fields = __slots__
+    _child_fields = ('statements',)
+
     def __init__(self, statements):
         self.statements = statements
         
@@ -24,16 +56,26 @@ class Program(Node):
 # FunctionDef representa a definição de uma função.
     # name: o nome da função.
     # body: o corpo da função, que é uma lista de comandos.
+    # returns: o tipo de retorno anotado (def f() -> float:), ou None.
 # A classe armazena o nome da função e o corpo dela, sendo útil para gerar o código de definição de funções na linguagem alvo (C).
 
 class FunctionDef(Node):
-    def __init__(self, name, params, types, body):
+    __slots__ = ('name', 'params', 'types', 'body', 'returns')
+    _fields = __slots__
+    _child_fields = ('body',)
+
+    def __init__(self, name, params, types, body, returns=None):
         self.name = name
         self.params = params
-        self.types = types  # Tipos dos parâmetros (ex: ['int', 'int'])
+        self.types = types  # Tipos dos parâmetros (ex: ['int', 'int']), None nos sem anotação
         self.body = body
+        self.returns = returns
 
 class FunctionCall(Node):
+    __slots__ = ('name', 'args', 'ctype', 'spec')
+    _fields = ('name', 'args')
+    _child_fields = ('args',)
+
     def __init__(self, name, args):
         self.name = name  # Nome da função chamada
         self.args = args  # Lista de argumentos (ex: [x, y])
@@ -48,6 +90,10 @@ class FunctionCall(Node):
 # Essa classe permite que a árvore represente tanto if com ou sem else.
 
 class If(Node):
+    __slots__ = ('condition', 'body', 'else_body')
+    _fields = __slots__
+    _child_fields = ('condition', 'body', 'else_body')
+
     def __init__(self, condition, body, else_body=None):
         self.condition = condition
         self.body = body
@@ -62,22 +108,69 @@ class If(Node):
 # A classe armazena a condição do laço e o seu corpo.
 
 class While(Node):
+    __slots__ = ('condition', 'body')
+    _fields = __slots__
+    _child_fields = ('condition', 'body')
+
     def __init__(self, condition, body):
         self.condition = condition
         self.body = body
 
+# ---------------------------------------------------------------------------------------------------
+# FOR
+# ---------------------------------------------------------------------------------------------------
+# For representa o laço for sobre um range: for target in range(start, stop, step).
+    # target: a variável do laço (um Name).
+    # start, stop, step: os argumentos do range; start e step são None quando omitidos (valem 0 e 1).
+    # body: o corpo do laço.
+# Como em Assignment, declares indica se o laço declara a variável (preenchido pela anotação de tipos).
+
+class For(Node):
+    __slots__ = ('target', 'start', 'stop', 'step', 'body', 'declares')
+    _fields = ('target', 'start', 'stop', 'step', 'body')
+    _child_fields = _fields
+
+    def __init__(self, target, start, stop, step, body):
+        self.target = target
+        self.start = start
+        self.stop = stop
+        self.step = step
+        self.body = body
+
 # ---------------------------------------------------------------------------------------------------
 # ASSIGNMENT
 # ---------------------------------------------------------------------------------------------------
 # Assignment representa uma atribuição de valor a uma variável.
     # target: a variável ou nome do lado esquerdo da atribuição (ex: x).
     # value: o valor ou expressão do lado direito da atribuição (ex: 5 ou uma expressão como a + b).
+    # annotation: o tipo anotado (x: float = 1), ou None.
 # A classe armazena a variável de destino e o valor a ser atribuído a ela.
 
 class Assignment(Node):
-    def __init__(self, target, value):
+    __slots__ = ('target', 'value', 'annotation', 'declares')
+    _fields = ('target', 'value', 'annotation')
+    _child_fields = ('target', 'value')
+
+    def __init__(self, target, value, annotation=None):
         self.target = target
         self.value = value
+        self.annotation = annotation
+
+# ---------------------------------------------------------------------------------------------------
+# DECLARATION
+# ---------------------------------------------------------------------------------------------------
+# Declaration representa uma anotação de tipo sem valor (x: int): declara a variável sem atribuir nada.
+    # target: a variável (um Name).
+    # annotation: o tipo anotado.
+
+class Declaration(Node):
+    __slots__ = ('target', 'annotation', 'declares')
+    _fields = ('target', 'annotation')
+    _child_fields = ('target',)
+
+    def __init__(self, target, annotation):
+        self.target = target
+        self.annotation = annotation
 
 # ---------------------------------------------------------------------------------------------------
 # COMANDOS SIMPLES (BREAK, CONTINUE, PASS)
@@ -87,9 +180,14 @@ class Assignment(Node):
     # Continue: pula para a próxima iteração de um laço (como um continue no C).
     # Pass: não faz nada, sendo um comando nulo (usado como um espaço reservado ou no lugar de código em desenvolvimento).
 # Estas classes não têm atributos, já que representam apenas a ação de interrupção ou continuação no fluxo de execução.
-class Break(Node): pass
-class Continue(Node): pass
-class Pass(Node): pass
+class Break(Node):
+    __slots__ = ()
+
+class Continue(Node):
+    __slots__ = ()
+
+class Pass(Node):
+    __slots__ = ()
 
 
 # ---------------------------------------------------------------------------------------------------
@@ -101,6 +199,10 @@ class Pass(Node): pass
     # right: o operando à direita da operação.
 # Essa classe é útil para operações aritméticas ou comparações, como a + b, x > y, etc.
 class BinOp(Node):
+    __slots__ = ('left', 'op', 'right', 'ctype')
+    _fields = ('left', 'op', 'right')
+    _child_fields = ('left', 'right')
+
     def __init__(self, left, op, right):
         self.left = left
         self.op = op
@@ -114,6 +216,10 @@ class BinOp(Node):
     # Usado para representar variáveis no código, como x, y, foo, etc.
 
 class Name(Node):
+    __slots__ = ('id', 'ctype')
+    _fields = ('id',)
+    _child_fields = ()
+
     def __init__(self, id):
         self.id = id
 
@@ -125,6 +231,10 @@ class Name(Node):
 # Usado para representar números constantes no código.
 
 class Number(Node):
+    __slots__ = ('value', 'ctype')
+    _fields = ('value',)
+    _child_fields = ()
+
     def __init__(self, value):
         self.value = value
 
@@ -132,11 +242,79 @@ class Number(Node):
 # STRING
 # ---------------------------------------------------------------------------------------------------
 class String(Node):
+    __slots__ = ('value', 'ctype')
+    _fields = ('value',)
+    _child_fields = ()
+
     def __init__(self, value):
         # value já inclui as aspas, ex: '"hello"' ou "'mundo'"
         self.value = value
 
+# ---------------------------------------------------------------------------------------------------
+# LISTAS E DICIONÁRIOS
+# ---------------------------------------------------------------------------------------------------
+# List representa uma lista literal ([1, 2, 3] ou []).
+    # elements: as expressões dos elementos, em ordem.
+# Subscript representa a indexação de uma lista (x[i]).
+    # value: a lista; index: o índice.
+# SubscriptAssignment representa a atribuição a um elemento (x[i] = v).
+    # target: um Subscript; value: o valor atribuído.
+# MethodCall representa a chamada de um método (x.append(v)).
+    # value: o objeto; name: o nome do método; args: os argumentos.
+# Dict representa um dicionário literal ({'a': 1} ou {}); a indexação e a atribuição a uma chave
+# (d[k], d[k] = v) também são Subscript e SubscriptAssignment.
+    # keys, values: as expressões das chaves e dos valores, em ordem.
+
+class List(Node):
+    __slots__ = ('elements', 'ctype')
+    _fields = ('elements',)
+    _child_fields = ('elements',)
+
+    def __init__(self, elements):
+        self.elements = elements
+
+class Dict(Node):
+    __slots__ = ('keys', 'values', 'ctype')
+    _fields = ('keys', 'values')
+    _child_fields = ('keys', 'values')
+
+    def __init__(self, keys, values):
+        self.keys = keys
+        self.values = values
+
+class Subscript(Node):
+    __slots__ = ('value', 'index', 'ctype')
+    _fields = ('value', 'index')
+    _child_fields = ('value', 'index')
+
+    def __init__(self, value, index):
+        self.value = value
+        self.index = index
+
+class SubscriptAssignment(Node):
+    __slots__ = ('target', 'value')
+    _fields = __slots__
+    _child_fields = ('target', 'value')
+
+    def __init__(self, target, value):
+        self.target = target
+        self.value = value
+
+class MethodCall(Node):
+    __slots__ = ('value', 'name', 'args', 'ctype')
+    _fields = ('value', 'name', 'args')
+    _child_fields = ('value', 'args')
+
+    def __init__(self, value, name, args):
+        self.value = value
+        self.name = name
+        self.args = args
+
 class UnaryOp(Node):
+    __slots__ = ('op', 'operand', 'ctype')
+    _fields = ('op', 'operand')
+    _child_fields = ('operand',)
+
     def __init__(self, op, operand):
         self.op = op      # ex: '!'
         self.operand = operand
@@ -145,6 +323,10 @@ class UnaryOp(Node):
 # COMENTÁRIOS
 # ---------------------------------------------------------------------------------------------------
 class Comment(Node):
+    __slots__ = ('text',)
+    _fields = __slots__
+    _child_fields = ()
+
     def __init__(self, text):
         self.text = text
 
@@ -153,6 +335,22 @@ class Comment(Node):
 # ---------------------------------------------------------------------------------------------------
 
 class Return(Node):
+    __slots__ = ('value',)
+    _fields = __slots__
+    _child_fields = ('value',)
+
     def __init__(self, value):
         self.value = value
 
+# ---------------------------------------------------------------------------------------------------
+# TRAVESSIA
+# ---------------------------------------------------------------------------------------------------
+# Devolve os filhos diretos de um nó, na ordem do código-fonte, usando apenas os campos listados em
+# _child_fields do seu tipo (sem testar atributo por atributo).
+def iter_child_nodes(node):
+    for campo in node._child_fields:
+        valor = getattr(node, campo)
+        if type(valor) is list:
+            yield from valor
+        elif valor is not None:
+            yield valor
@@ -0,0 +1,57 @@
+# ---------------------------------------------------------------------------------------------------
+# BENCHMARK DA AST
+# ---------------------------------------------------------------------------------------------------
+# Mede, para um programa sintético grande, quantos nós a AST tem, quantos bytes ela ocupa por nó
+# (medido com tracemalloc, descontando a memória que já existia antes do parse) e quanto tempo leva
+# para construí-la (lexer + parser).
+# Uso: python benchmarks/bench_ast.py [linhas]
+# ---------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transpiler import Transpiler
+from ast_nodes import Node
+from programas import FORMAS
+
+def conta_nos(node):
+    total = 0
+    pilha = [node]
+    while pilha:
+        n = pilha.pop()
+        if isinstance(n, list):
+            pilha.extend(n)
+        elif isinstance(n, Node):
+            total += 1
+            pilha.extend(getattr(n, campo, None) for campo in type(n)._fields)
+    return total
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    t = Transpiler()
+    for forma, gera in FORMAS.items():
+        fonte = gera(linhas)
+        t.parse(fonte)      # aquecimento
+
+        inicio = time.perf_counter()
+        ast = t.parse(fonte)
+        segundos = time.perf_counter() - inicio
+        del ast
+
+        tracemalloc.start()
+        antes = tracemalloc.get_traced_memory()[0]
+        ast = t.parse(fonte)
+        bytes_ast = tracemalloc.get_traced_memory()[0] - antes
+        tracemalloc.stop()
+
+        nos = conta_nos(ast)
+        print(f"{forma:9} {nos:>9} nós  {bytes_ast / nos:7.1f} bytes/nó  "
+              f"construção {segundos:6.2f} s ({segundos / nos * 1e6:5.2f} µs/nó)")
+        del ast
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# ---------------------------------------------------------------------------------------------------
+# BENCHMARK DO DESPACHO DA GERAÇÃO DE CÓDIGO
+# ---------------------------------------------------------------------------------------------------
+# Mede, sobre a AST de programas sintéticos grandes, o custo das partes do CGenerator que visitam
+# todos os nós: a anotação de tipos que resolve as especializações das funções
+# (resolve_specializations), a coleta de nomes usados (incremental.referencias) e a geração completa
+# (generate). A AST é construída uma vez; cada medida é a melhor de 3.
+# Uso: python benchmarks/bench_codegen.py [linhas]
+# ---------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transpiler import Transpiler
+from codegen import CGenerator
+from ast_nodes import FunctionDef
+from incremental import referencias
+from programas import FORMAS
+
+def melhor_de_3(funcao):
+    melhor = float("inf")
+    for _ in range(3):
+        inicio = time.perf_counter()
+        funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor
+
+def resolve(ast):
+    gen = CGenerator()
+    funcs = [s for s in ast.statements if isinstance(s, FunctionDef)]
+    mains = [s for s in ast.statements if not isinstance(s, FunctionDef)]
+    gen.functions = {f.name: f for f in funcs}
+    gen.resolve_specializations(lambda: mains)
+
+def main():
+    linhas = int(sys.argv[1]) if len(sys.argv) > 1 else 100_000
+    t = Transpiler()
+    for forma, gera in FORMAS.items():
+        ast = t.parse(gera(linhas))
+        medidas = {
+            "anotação": lambda: resolve(ast),
+            "referencias": lambda: referencias(ast),
+            "geração": lambda: CGenerator().generate(ast),
+        }
+        partes = [f"{nome} {melhor_de_3(f):6.3f} s" for nome, f in medidas.items()]
+        print(f"{forma:9} {linhas:>8} linhas  " + "  ".join(partes))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+# ---------------------------------------------------------------------------------------------------
+# BENCHMARK DE ESCALABILIDADE DO PARSER
+# ---------------------------------------------------------------------------------------------------
+# Gera programas planos e aninhados de 10 mil, 100 mil e 1 milhão de linhas, mede o tempo de parse
+# (lexer + parser, sem geração de código) e verifica que o tempo cresce linearmente com o tamanho:
+# o tempo por linha do maior programa não pode passar de LIMITE vezes o do menor.
+# Uso: python benchmarks/bench_parse_scaling.py [tamanhos...]   (ex: 10000 100000)
+# ---------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transpiler import Transpiler
+from programas import FORMAS
+
+TAMANHOS = [10_000, 100_000, 1_000_000]
+LIMITE = 2.0
+# Só as formas de comandos simples: as demais (ver bench_suite.py) deixariam o programa de 1 milhão de
+# linhas lento demais para este teste.
+FORMAS_MEDIDAS = ("plano", "aninhado")
+
+def main():
+    tamanhos = [int(x) for x in sys.argv[1:]] or TAMANHOS
+    t = Transpiler()
+    falhou = False
+    for forma in FORMAS_MEDIDAS:
+        gera = FORMAS[forma]
+        por_linha = []
+        for n in tamanhos:
+            fonte = gera(n)
+            linhas = fonte.count("\n")
+            # Programas pequenos são medidos mais de uma vez (melhor de 3) para reduzir o ruído
+            segundos = float("inf")
+            for _ in range(3 if n <= 100_000 else 1):
+                inicio = time.perf_counter()
+                ast = t.parse(fonte)
+                segundos = min(segundos, time.perf_counter() - inicio)
+            por_linha.append(segundos / linhas)
+            print(f"{forma:9} {linhas:>9} linhas  {segundos:8.2f} s  {segundos / linhas * 1e6:6.2f} µs/linha  "
+                  f"{len(ast.statements)} comandos")
+            del ast, fonte
+        razao = por_linha[-1] / por_linha[0]
+        ok = razao <= LIMITE
+        falhou |= not ok
+        print(f"{forma:9} crescimento do tempo por linha: {razao:.2f}x ({'ok' if ok else 'NÃO LINEAR'})")
+    assert not falhou, f"tempo de parse cresce mais que linearmente (limite: {LIMITE}x por linha)"
+
+if __name__ == "__main__":
+    main()
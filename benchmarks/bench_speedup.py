@@ -0,0 +1,247 @@
+# ---------------------------------------------------------------------------------------------------
+# SPEEDUP DO C GERADO EM RELAÇÃO AO CPYTHON
+# ---------------------------------------------------------------------------------------------------
+# Para cada programa de um corpus (por padrão, benchmarks/corpus/), transpila e compila o programa
+# (build.Builder) e executa as duas versões, o .py no CPython e o executável, com a mesma entrada
+# padrão: o arquivo <programa>.in ao lado do .py, se existir (senão, uma entrada vazia). Para cada
+# programa, informa:
+    # se as saídas são iguais: comparadas palavra por palavra, com números comparados pelo valor (o
+    #   print do C escreve floats com 6 casas, ex: 3.500000 para 3.5) e True/False valendo 1/0;
+    # o tempo de execução de cada versão (a melhor de --repeticoes) e o speedup (tempo Python / tempo C);
+    # o pico de memória residente (RSS) de cada processo.
+# O padrão de --c-types é wide (int64_t, double): os floats do CPython são de precisão dupla, e os
+# resultados com float do C diferem dos do Python já nas primeiras casas.
+# Como em bench_suite.py, o resultado pode ser gravado em JSON (--json) e comparado com um resultado
+# anterior (--baseline): um programa cujo executável ficou mais lento que o do baseline por mais que
+# --limite é uma regressão na qualidade do C gerado. Saídas diferentes ou regressões terminam o script
+# com código 1.
+# Uso:
+#   python benchmarks/bench_speedup.py [programas ou diretórios ...] [--json base.json]
+#   python benchmarks/bench_speedup.py --baseline base.json [--limite 1.2]
+# Só funciona em sistemas Unix. Cada programa é executado por um pequeno lançador em C (compilado no
+# início com o mesmo compilador), que mede o tempo e o pico de memória com wait4, como o /usr/bin/time:
+# no Linux, o pico de RSS de um processo criado direto pelo script incluiria a memória do próprio
+# script, herdada no fork.
+# ---------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import json
+import math
+import time
+import shlex
+import argparse
+import platform
+import tempfile
+import subprocess
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transpiler import Transpiler, transpiler_version
+from codegen import C_TYPE_MODES
+from build import Builder, COMPILADOR_PADRAO, FLAGS_PADRAO
+
+CORPUS_PADRAO = os.path.join(os.path.dirname(os.path.abspath(__file__)), "corpus")
+
+# Programas .py dos caminhos dados (arquivos ou diretórios, percorridos em ordem).
+def coleta_programas(caminhos):
+    programas = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            for raiz, dirs, arquivos in os.walk(caminho):
+                dirs.sort()
+                programas.extend(os.path.join(raiz, nome) for nome in sorted(arquivos) if nome.endswith(".py"))
+        else:
+            programas.append(caminho)
+    return programas
+
+# Lançador: executa argv[2:] e grava em argv[1] "segundos pico_de_rss código_de_saída".
+LANCADOR_C = r'''
+#include <stdio.h>
+#include <time.h>
+#include <unistd.h>
+#include <sys/resource.h>
+#include <sys/wait.h>
+
+int main(int argc, char** argv) {
+    struct timespec inicio, fim;
+    struct rusage uso;
+    int status;
+    pid_t pid;
+    FILE* f;
+    clock_gettime(CLOCK_MONOTONIC, &inicio);
+    pid = fork();
+    if (pid == 0) {
+        execvp(argv[2], argv + 2);
+        _exit(127);
+    }
+    wait4(pid, &status, 0, &uso);
+    clock_gettime(CLOCK_MONOTONIC, &fim);
+    f = fopen(argv[1], "w");
+    fprintf(f, "%.9f %ld %d\n", (double)(fim.tv_sec - inicio.tv_sec) + (fim.tv_nsec - inicio.tv_nsec) / 1e9,
+            (long)uso.ru_maxrss, WIFEXITED(status) ? WEXITSTATUS(status) : 128 + WTERMSIG(status));
+    fclose(f);
+    return 0;
+}
+'''
+
+def compila_lancador(builder, tmp):
+    fonte = os.path.join(tmp, "_lancador.c")
+    with open(fonte, "w", encoding="utf-8") as f:
+        f.write(LANCADOR_C)
+    lancador = os.path.join(tmp, "_lancador")
+    builder.build(fonte, lancador)
+    return lancador
+
+# Executa comando pelo lançador, com a entrada padrão vinda do arquivo entrada; devolve (saída,
+# segundos, pico de RSS em bytes, código de saída).
+def executa(lancador, comando, entrada):
+    medidas = lancador + ".medidas"
+    with open(entrada, "rb") as fin:
+        saida = subprocess.run([lancador, medidas] + comando, stdin=fin, stdout=subprocess.PIPE,
+                               stderr=subprocess.DEVNULL, check=True).stdout
+    with open(medidas) as f:
+        segundos, rss, codigo = f.read().split()
+    # ru_maxrss vem em KiB no Linux e em bytes no macOS
+    rss = int(rss) if platform.system() == "Darwin" else int(rss) * 1024
+    return saida, float(segundos), rss, int(codigo)
+
+def melhor_de(repeticoes, lancador, comando, entrada):
+    melhor = None
+    for _ in range(repeticoes):
+        saida, segundos, rss, codigo = executa(lancador, comando, entrada)
+        if melhor is None or segundos < melhor[1]:
+            melhor = (saida, segundos, rss, codigo)
+    return melhor
+
+# Palavras da saída, com os números convertidos para float (True/False viram 1/0).
+def _palavras(saida):
+    palavras = []
+    for palavra in saida.decode("utf-8", errors="replace").split():
+        palavra = {"True": "1", "False": "0"}.get(palavra, palavra)
+        try:
+            palavras.append(float(palavra))
+        except ValueError:
+            palavras.append(palavra)
+    return palavras
+
+def saidas_iguais(saida_py, saida_c):
+    a, b = _palavras(saida_py), _palavras(saida_c)
+    if len(a) != len(b):
+        return False
+    for x, y in zip(a, b):
+        if isinstance(x, float) and isinstance(y, float):
+            # %f arredonda para 6 casas
+            if not math.isclose(x, y, rel_tol=1e-9, abs_tol=5e-7):
+                return False
+        elif x != y:
+            return False
+    return True
+
+def mede_programa(programa, transpiler, builder, lancador, python, repeticoes, tmp):
+    base = os.path.splitext(programa)[0]
+    entrada = base + ".in" if os.path.isfile(base + ".in") else os.devnull
+    nome = os.path.basename(base)
+    fonte_c = os.path.join(tmp, nome + ".c")
+    binario = os.path.join(tmp, nome)
+    inicio = time.perf_counter()
+    transpiler.transpile_file(programa, fonte_c)
+    builder.build(fonte_c, binario)
+    s_build = time.perf_counter() - inicio
+
+    saida_py, s_py, rss_py, codigo_py = melhor_de(repeticoes, lancador, [python, programa], entrada)
+    saida_c, s_c, rss_c, codigo_c = melhor_de(repeticoes, lancador, [binario], entrada)
+    return {
+        "iguais": codigo_py == 0 and codigo_c == 0 and saidas_iguais(saida_py, saida_c),
+        "python": s_py,
+        "c": s_c,
+        "speedup": s_py / s_c if s_c else float("inf"),
+        "rss_python": rss_py,
+        "rss_c": rss_c,
+        "transpilacao_e_compilacao": s_build,
+    }
+
+# Compara o tempo do executável com o baseline; devolve a lista de regressões como (programa, razão).
+def compara(resultados, baseline, limite, minimo):
+    regressoes = []
+    print(f"\ncomparação com o baseline (versão {baseline.get('versao')}), limite {limite:.2f}x:")
+    for programa, atual in resultados.items():
+        base = baseline["resultados"].get(programa)
+        if base is None:
+            print(f"  {programa:30} sem baseline")
+            continue
+        razao = atual["c"] / base["c"] if base["c"] else float("inf")
+        regressao = razao > limite and atual["c"] - base["c"] > minimo
+        if regressao:
+            regressoes.append((programa, razao))
+        print(f"  {programa:30} {razao:6.2f}x  {'REGRESSÃO' if regressao else 'ok'}")
+    return regressoes
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Speedup do C gerado em relação ao CPython, programa por programa.")
+    ap.add_argument("programas", nargs="*", default=[CORPUS_PADRAO],
+                    help="programas .py e/ou diretórios (padrão: benchmarks/corpus)")
+    ap.add_argument("--repeticoes", type=int, default=3, help="execuções de cada versão; vale a melhor (padrão: %(default)s)")
+    ap.add_argument("--python", default=sys.executable, help="interpretador Python (padrão: o atual)")
+    ap.add_argument("--cc", default=COMPILADOR_PADRAO, help="compilador C (padrão: a variável de ambiente CC ou gcc)")
+    ap.add_argument("--cflags", default=" ".join(FLAGS_PADRAO), help="flags de compilação (padrão: '%(default)s')")
+    ap.add_argument("--c-types", choices=list(C_TYPE_MODES), default="wide",
+                    help="modo de tipos do C (padrão: %(default)s, com a precisão dos números do Python)")
+    ap.add_argument("--no-optimize", action="store_true", help="transpila sem o otimizador")
+    ap.add_argument("--fast-io", action="store_true", help="transpila com a saída bufferizada (ver runtime.py)")
+    ap.add_argument("--no-bounds-check", action="store_true", help="transpila sem conferir os índices das listas")
+    ap.add_argument("--json", help="grava os resultados neste arquivo JSON")
+    ap.add_argument("--baseline", help="arquivo JSON de uma execução anterior para comparar")
+    ap.add_argument("--limite", type=float, default=1.20,
+                    help="razão máxima entre o tempo do executável atual e o do baseline (padrão: %(default)s)")
+    ap.add_argument("--minimo", type=float, default=0.005,
+                    help="diferença mínima em segundos para contar como regressão (padrão: %(default)s)")
+    args = ap.parse_args(argv)
+
+    transpiler = Transpiler(optimize=not args.no_optimize, c_types=args.c_types, fast_io=args.fast_io,
+                            bounds_check=not args.no_bounds_check)
+    builder = Builder(args.cc, shlex.split(args.cflags))
+    resultados = {}
+    diferentes = []
+    with tempfile.TemporaryDirectory() as tmp:
+        lancador = compila_lancador(builder, tmp)
+        for programa in coleta_programas(args.programas):
+            nome = os.path.relpath(programa)
+            r = mede_programa(programa, transpiler, builder, lancador, args.python, max(1, args.repeticoes), tmp)
+            resultados[nome] = r
+            if not r["iguais"]:
+                diferentes.append(nome)
+            print(f"{nome:30} {'ok' if r['iguais'] else 'DIFERENTE':9} python {r['python']:7.3f} s  "
+                  f"c {r['c']:7.3f} s  speedup {r['speedup']:7.1f}x  "
+                  f"rss python {r['rss_python'] / 2**20:6.1f} MiB  c {r['rss_c'] / 2**20:6.1f} MiB")
+
+    saida = {
+        "versao": transpiler_version(),
+        "python": platform.python_version(),
+        "cc": args.cc,
+        "cflags": args.cflags,
+        "c_types": args.c_types,
+        "fast_io": args.fast_io,
+        "bounds_check": not args.no_bounds_check,
+        "resultados": resultados,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(saida, f, indent=2)
+        print(f"resultados gravados em {args.json}")
+
+    falhou = False
+    if diferentes:
+        print(f"{len(diferentes)} programa(s) com saída diferente do Python: {', '.join(diferentes)}")
+        falhou = True
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressoes = compara(resultados, baseline, args.limite, args.minimo)
+        if regressoes:
+            print(f"{len(regressoes)} regressão(ões) acima de {args.limite:.2f}x")
+            falhou = True
+    return 1 if falhou else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
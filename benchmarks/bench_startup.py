@@ -0,0 +1,46 @@
+# ---------------------------------------------------------------------------------------------------
+# BENCHMARK DE INICIALIZAÇÃO
+# ---------------------------------------------------------------------------------------------------
+# Mede o tempo de "partida a frio" do transpilador: um processo Python novo que importa o
+# transpilador e transpila um arquivo minúsculo. O resultado é comparado com o custo de só iniciar
+# o interpretador, que é o piso possível.
+# Uso: python benchmarks/bench_startup.py [repetições]
+# ---------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import time
+import statistics
+import subprocess
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PROGRAMA_MINIMO = "x = 1\nprint(x)\n"
+COMANDOS = {
+    "python (vazio)": "pass",
+    "import + transpile": f"from transpiler import Transpiler; Transpiler().transpile({PROGRAMA_MINIMO!r})",
+}
+
+def mede(codigo, repeticoes):
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        subprocess.run([sys.executable, "-c", codigo], cwd=RAIZ, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        tempos.append(time.perf_counter() - inicio)
+    return tempos
+
+def main():
+    repeticoes = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    # Uma execução de aquecimento (cache do sistema de arquivos, .pyc)
+    mede(COMANDOS["import + transpile"], 1)
+    resultados = {}
+    for nome, codigo in COMANDOS.items():
+        tempos = mede(codigo, repeticoes)
+        resultados[nome] = tempos
+        print(f"{nome:20} mediana {statistics.median(tempos) * 1000:7.1f} ms   mínimo {min(tempos) * 1000:7.1f} ms")
+    extra = statistics.median(resultados["import + transpile"]) - statistics.median(resultados["python (vazio)"])
+    print(f"custo do transpilador acima do interpretador: {extra * 1000:.1f} ms")
+
+if __name__ == "__main__":
+    main()
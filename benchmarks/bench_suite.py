@@ -0,0 +1,130 @@
+# ---------------------------------------------------------------------------------------------------
+# SUÍTE DE BENCHMARKS POR ETAPA
+# ---------------------------------------------------------------------------------------------------
+# Gera um programa de cada forma de programas.FORMAS com o número de linhas pedido e mede, em
+# separado, o tempo de cada etapa do transpilador:
+    # lexer: só a análise léxica (todos os tokens do programa);
+    # parser: parser.parse, que inclui a análise léxica feita sob demanda pelo parser;
+    # codegen: CGenerator.generate sobre a AST já construída.
+# Cada medida é a melhor de --repeticoes execuções. O resultado pode ser gravado em JSON (--json) e
+# comparado com um resultado anterior (--baseline): a comparação é feita pelo tempo por linha, e uma
+# etapa mais lenta que o baseline por mais que --limite (ex: 1.20 = 20%) é uma regressão, e o
+# script termina com código 1. Diferenças menores que --minimo segundos são ignoradas como ruído.
+# Uso:
+#   python benchmarks/bench_suite.py --json base.json                  # grava o baseline
+#   python benchmarks/bench_suite.py --baseline base.json [--limite 1.2]
+# ---------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from lexer import build_lexer, reset_lexer
+from transpiler import Transpiler, transpiler_version
+from codegen import CGenerator
+from programas import FORMAS
+
+ETAPAS = ("lexer", "parser", "codegen")
+
+def melhor_de(repeticoes, funcao):
+    melhor = float("inf")
+    resultado = None
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        melhor = min(melhor, time.perf_counter() - inicio)
+    return melhor, resultado
+
+def conta_tokens(lx, fonte):
+    reset_lexer(lx)
+    lx.input(fonte)
+    n = 0
+    while lx.token() is not None:
+        n += 1
+    return n
+
+def mede_forma(gera, linhas, repeticoes):
+    fonte = gera(linhas)
+    t = Transpiler()
+    lx = build_lexer()
+    s_lexer, tokens = melhor_de(repeticoes, lambda: conta_tokens(lx, fonte))
+    s_parser, ast = melhor_de(repeticoes, lambda: t.parse(fonte))
+    s_codegen, codigo_c = melhor_de(repeticoes, lambda: CGenerator().generate(ast))
+    return {
+        "linhas": fonte.count("\n"),
+        "tokens": tokens,
+        "bytes_c": len(codigo_c),
+        "lexer": s_lexer,
+        "parser": s_parser,
+        "codegen": s_codegen,
+    }
+
+# Compara com o baseline; devolve a lista de regressões como (forma, etapa, razão).
+def compara(resultados, baseline, limite, minimo):
+    regressoes = []
+    print(f"\ncomparação com o baseline (versão {baseline.get('versao')}), limite {limite:.2f}x:")
+    for forma, atual in resultados.items():
+        base = baseline["resultados"].get(forma)
+        if base is None:
+            print(f"  {forma:11} sem baseline")
+            continue
+        for etapa in ETAPAS:
+            por_linha = atual[etapa] / atual["linhas"]
+            por_linha_base = base[etapa] / base["linhas"]
+            razao = por_linha / por_linha_base if por_linha_base else float("inf")
+            diferenca = (por_linha - por_linha_base) * atual["linhas"]
+            regressao = razao > limite and diferenca > minimo
+            if regressao:
+                regressoes.append((forma, etapa, razao))
+            print(f"  {forma:11} {etapa:8} {razao:6.2f}x  {'REGRESSÃO' if regressao else 'ok'}")
+    return regressoes
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Benchmarks do transpilador por etapa (lexer, parser, codegen).")
+    ap.add_argument("--linhas", type=int, default=20_000, help="linhas de cada programa gerado (padrão: %(default)s)")
+    ap.add_argument("--formas", nargs="+", choices=list(FORMAS), default=list(FORMAS),
+                    help="formas de programa a medir (padrão: todas)")
+    ap.add_argument("--repeticoes", type=int, default=3, help="execuções por medida; vale a melhor (padrão: %(default)s)")
+    ap.add_argument("--json", help="grava os resultados neste arquivo JSON")
+    ap.add_argument("--baseline", help="arquivo JSON de uma execução anterior para comparar")
+    ap.add_argument("--limite", type=float, default=1.20,
+                    help="razão máxima entre o tempo por linha atual e o do baseline (padrão: %(default)s)")
+    ap.add_argument("--minimo", type=float, default=0.005,
+                    help="diferença mínima em segundos para contar como regressão (padrão: %(default)s)")
+    args = ap.parse_args(argv)
+
+    resultados = {}
+    for forma in args.formas:
+        r = mede_forma(FORMAS[forma], args.linhas, args.repeticoes)
+        resultados[forma] = r
+        print(f"{forma:11} {r['linhas']:>8} linhas {r['tokens']:>9} tokens  " +
+              "  ".join(f"{etapa} {r[etapa]:7.3f} s" for etapa in ETAPAS))
+
+    saida = {
+        "versao": transpiler_version(),
+        "python": platform.python_version(),
+        "linhas": args.linhas,
+        "repeticoes": args.repeticoes,
+        "resultados": resultados,
+    }
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(saida, f, indent=2)
+        print(f"resultados gravados em {args.json}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressoes = compara(resultados, baseline, args.limite, args.minimo)
+        if regressoes:
+            print(f"{len(regressoes)} regressão(ões) acima de {args.limite:.2f}x")
+            return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
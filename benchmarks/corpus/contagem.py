@@ -0,0 +1,25 @@
+# Contagem e busca em dicionários, com chaves strings (contagem de palavras) e inteiras (pares com soma dada).
+def conta_palavras(n, repeticoes):
+    contagem: dict[str, int] = {}
+    for r in range(repeticoes):
+        for i in range(n):
+            w = "p" + str(i * 7 + r)
+            if w in contagem:
+                contagem[w] = contagem[w] + 1
+            else:
+                contagem[w] = 1
+    return contagem
+
+def pares_com_soma(n, alvo):
+    visto: dict[int, int] = {}
+    for i in range(n):
+        visto[i * 3] = i
+    pares = 0
+    for i in range(n):
+        if alvo - i * 5 in visto:
+            pares = pares + 1
+    return pares
+
+contagem = conta_palavras(200000, 8)
+print(len(contagem), contagem["p7"], contagem["p700"], contagem["p1399999"])
+print(pares_com_soma(1000000, 1500000))
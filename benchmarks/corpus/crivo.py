@@ -0,0 +1,30 @@
+# Crivo de Eratóstenes e somas de prefixos sobre listas de inteiros.
+def crivo(n):
+    primo = [1] * (n + 1)
+    primo[0] = 0
+    primo[1] = 0
+    i = 2
+    while i * i <= n:
+        if primo[i]:
+            j = i * i
+            while j <= n:
+                primo[j] = 0
+                j = j + i
+        i = i + 1
+    return primo
+
+def primos_ate(primo):
+    lista = []
+    for k in range(len(primo)):
+        if primo[k]:
+            lista.append(k)
+    return lista
+
+n = 2000000
+primo = crivo(n)
+primos = primos_ate(primo)
+prefixo = [0] * (len(primos) + 1)
+for k in range(len(primos)):
+    prefixo[k + 1] = prefixo[k] + primos[k]
+print(len(primos), primos[len(primos) - 1])
+print(prefixo[len(primos)], prefixo[1000] - prefixo[10])
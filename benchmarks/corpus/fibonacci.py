@@ -0,0 +1,8 @@
+# Fibonacci recursivo: mede o custo de chamadas de função.
+def fib(n):
+    if n < 2:
+        return n
+    return fib(n - 1) + fib(n - 2)
+
+for i in range(20, 28):
+    print("fib", i, fib(i))
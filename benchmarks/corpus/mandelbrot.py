@@ -0,0 +1,24 @@
+# Conta, em uma grade de pontos do plano complexo, quantas iterações de z = z * z + c cada ponto
+# leva para escapar (aritmética de ponto flutuante em laços aninhados).
+largura = 160
+altura = 80
+limite = 200
+total = 0
+dentro = 0
+for py in range(altura):
+    ci = py * 2.4 / altura - 1.2
+    for px in range(largura):
+        cr = px * 3.2 / largura - 2.2
+        zr = 0.0
+        zi = 0.0
+        n = 0
+        while n < limite and zr * zr + zi * zi < 4.0:
+            t = zr * zr - zi * zi + cr
+            zi = 2.0 * zr * zi + ci
+            zr = t
+            n = n + 1
+        total = total + n
+        if n == limite:
+            dentro = dentro + 1
+print("iteracoes", total)
+print("dentro", dentro)
@@ -0,0 +1,15 @@
+# Lê registros numéricos da entrada padrão (ver medias.in): a quantidade, e depois um inteiro e um
+# float por registro; mede o custo de input(), int() e float().
+n = int(input())
+soma = 0
+maior = 0
+total = 0.0
+for i in range(n):
+    v = int(input())
+    soma = soma + v
+    if v > maior:
+        maior = v
+    total = total + float(input())
+print("registros", n)
+print("soma", soma, "maior", maior)
+print("total", total)
@@ -0,0 +1,13 @@
+# Raiz quadrada pelo método de Newton para muitos valores (divisões de ponto flutuante).
+def raiz(x):
+    r = x
+    if r < 1.0:
+        r = 1.0
+    for passo in range(30):
+        r = (r + x / r) / 2.0
+    return r
+
+soma = 0.0
+for k in range(1, 60000):
+    soma = soma + raiz(k * 1.0)
+print("soma", soma)
@@ -0,0 +1,8 @@
+# Relatório com muitas linhas de saída: mede o custo do print (inteiros, floats e strings).
+total = 0
+media = 0.0
+for i in range(200000):
+    total = total + i * 7
+    media = total / (i + 1.0)
+    print("linha", i, "total", total, "media", media)
+print("fim", total)
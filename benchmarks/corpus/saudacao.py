@@ -0,0 +1,4 @@
+# Lê um nome da entrada padrão (ver saudacao.in) e o repete várias vezes.
+nome = input()
+for i in range(3):
+    print("ola", nome, i)
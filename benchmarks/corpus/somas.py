@@ -0,0 +1,17 @@
+# Somas em laços aninhados com inteiros, com break e continue.
+n = 1500
+total = 0
+pares = 0
+for i in range(n):
+    parcial = 0
+    for j in range(i, n, 3):
+        if j > i + 900:
+            break
+        if j == i + 6:
+            continue
+        parcial = parcial + j - i
+    total = total + parcial
+    if parcial > 100000:
+        pares = pares + 1
+print("total", total)
+print("acima", pares)
@@ -0,0 +1,122 @@
+# ---------------------------------------------------------------------------------------------------
+# GERADOR DE PROGRAMAS SINTÉTICOS
+# ---------------------------------------------------------------------------------------------------
+# Gera código Python válido para o subconjunto suportado pelo transpilador, com um número de linhas
+# aproximadamente igual ao pedido. Usado pelos benchmarks.
+    # plano: só comandos de nível superior (atribuições, chamadas, prints), um por linha.
+    # aninhado: blocos if/while/else aninhados até a profundidade dada, repetidos até encher as linhas.
+    # funcoes: muitas funções pequenas que chamam umas às outras, com int e float, e o main chamando todas.
+    # expressoes: atribuições com expressões longas (dezenas de operadores e parênteses).
+    # prints: chamadas de print com vários argumentos de tipos misturados.
+# Nomes gerados nunca são nomes de tipo (int, float, str, ...), que o lexer lê como TYPE.
+# ---------------------------------------------------------------------------------------------------
+
+# Funções auxiliares usadas pelos programas gerados (ficam no início de todo programa).
+PRELUDIO = (
+    "def soma(a, b):\n"
+    "    return a + b\n"
+    "\n"
+    "def escala(x, k):\n"
+    "    return x * k\n"
+    "\n"
+)
+
+def plano(linhas):
+    partes = [PRELUDIO]
+    n = PRELUDIO.count("\n")
+    i = 0
+    while n < linhas:
+        v = f"v{i % 100}"
+        tipo = i % 4
+        if tipo == 0:
+            partes.append(f"{v} = {i} + {i % 7} * 3\n")
+        elif tipo == 1:
+            partes.append(f"{v} = soma({i}, {i % 13})\n")
+        elif tipo == 2:
+            partes.append(f"{v} = escala({i}, 2) - {i % 5}\n")
+        else:
+            partes.append(f"print(\"valor\", {i})\n")
+        n += 1
+        i += 1
+    return "".join(partes)
+
+def aninhado(linhas, profundidade=8):
+    partes = [PRELUDIO]
+    n = PRELUDIO.count("\n")
+    i = 0
+    while n < linhas:
+        # Um bloco: profundidade níveis de if/while, cada um com uma atribuição, e um else no fim
+        for d in range(profundidade):
+            ind = "    " * d
+            if d % 2 == 0:
+                partes.append(f"{ind}if x{d} > {i % 10}:\n")
+            else:
+                partes.append(f"{ind}while x{d} < {i % 10}:\n")
+            partes.append(f"{ind}    x{d + 1} = x{d} + {d}\n")
+        partes.append(f"{'    ' * profundidade}print(\"fundo\", {i})\n")
+        partes.append("else:\n")
+        partes.append("    x0 = 0\n")
+        n += 2 * profundidade + 3
+        i += 1
+    return "".join(partes)
+
+def funcoes(linhas):
+    partes = [PRELUDIO]
+    n = PRELUDIO.count("\n")
+    i = 0
+    # Cada função tem 6 linhas (contando a linha em branco) e gera uma chamada no main
+    while n + 7 < linhas:
+        anterior = f"f{i - 1}(a, {i % 3})" if i else "soma(a, b)"
+        partes.append(
+            f"def f{i}(a, b):\n"
+            f"    t = a * {i % 9 + 1} + b\n"
+            f"    if t > {i % 50}:\n"
+            f"        t = t - {anterior}\n"
+            f"    return t\n"
+            f"\n"
+        )
+        n += 7
+        i += 1
+    for k in range(i):
+        arg = f"{k}.5" if k % 2 else f"{k}"
+        partes.append(f"r{k} = f{k}({arg}, {k % 4})\n")
+    return "".join(partes)
+
+# Expressão com aproximadamente `operadores` operadores binários, com parênteses aninhados.
+def _expressao(i, operadores):
+    termos = ["a", "b", "c", f"{i % 17 + 1}", "2.5", "soma(a, b)"]
+    ops = ["+", "-", "*", "/"]
+    expr = termos[i % len(termos)]
+    for k in range(operadores):
+        termo = termos[(i + k) % len(termos)]
+        op = ops[(i + k) % len(ops)]
+        expr = f"({expr} {op} {termo})" if k % 3 == 0 else f"{expr} {op} {termo}"
+    return expr
+
+def expressoes(linhas, operadores=40):
+    partes = [PRELUDIO, "a = 1\n", "b = 2\n", "c = 3.0\n"]
+    n = PRELUDIO.count("\n") + 3
+    i = 0
+    while n < linhas:
+        partes.append(f"e{i % 100} = {_expressao(i, operadores)}\n")
+        n += 1
+        i += 1
+    return "".join(partes)
+
+def prints(linhas):
+    partes = [PRELUDIO, "a = 1\n", "c = 3.0\n", "nome = \"mundo\"\n"]
+    n = PRELUDIO.count("\n") + 3
+    i = 0
+    while n < linhas:
+        partes.append(f"print(\"linha\", {i}, a + {i % 7}, c * {i % 5}, nome, soma(a, {i % 3}))\n")
+        n += 1
+        i += 1
+    return "".join(partes)
+
+FORMAS = {
+    "plano": plano,
+    "aninhado": aninhado,
+    "funcoes": funcoes,
+    "expressoes": expressoes,
+    "prints": prints,
+}
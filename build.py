@@ -0,0 +1,103 @@
+# ---------------------------------------------------------------------------------------------------
+# COMPILAÇÃO DO C GERADO
+# ---------------------------------------------------------------------------------------------------
+# Compila o arquivo .c gerado pelo transpilador com o compilador C da máquina (gcc, clang, ...) e
+# grava o executável. Com um BuildCache, os resultados ficam em disco e são reaproveitados:
+    # objeto: o .o compilado do C, com a chave = hash do código C + identidade do compilador (caminho e
+    #   saída de --version) + flags de compilação;
+    # binário: o executável ligado a partir do objeto, com a chave = chave do objeto + flags de ligação.
+# Um acerto no binário só copia o arquivo do cache; um acerto só no objeto (mesmo C, outras flags de
+# ligação) pula a compilação e refaz apenas a ligação. Como no cache de transpilação, as gravações são
+# atômicas, então vários processos (ou jobs) podem compartilhar o mesmo diretório de cache.
+# ---------------------------------------------------------------------------------------------------
+
+import os
+import stat
+import shutil
+import hashlib
+import tempfile
+import subprocess
+
+from cache import TranspileCache
+
+COMPILADOR_PADRAO = os.environ.get("CC", "gcc")
+FLAGS_PADRAO = ("-O2",)
+
+
+# Erro do compilador C (compilador não encontrado ou código que não compila).
+class BuildError(Exception):
+    pass
+
+
+# Cache dos objetos e executáveis compilados (mesmo formato e mesma política LRU do cache de transpilação).
+class BuildCache(TranspileCache):
+    SUFIXO = ".bin"
+
+
+# Identidade do compilador (caminho real + saída de --version), calculada uma vez por processo: muda se o
+# compilador for trocado ou atualizado, o que invalida os objetos compilados com o anterior.
+_identidades = {}
+
+def compiler_identity(compiler):
+    identidade = _identidades.get(compiler)
+    if identidade is None:
+        caminho = shutil.which(compiler)
+        if caminho is None:
+            raise BuildError(f"compilador C não encontrado: {compiler!r}")
+        versao = subprocess.run([caminho, "--version"], capture_output=True, text=True).stdout
+        identidade = _identidades[compiler] = f"{os.path.realpath(caminho)}\n{versao}"
+    return identidade
+
+def _chave(*partes):
+    h = hashlib.sha256()
+    for parte in partes:
+        h.update(parte if isinstance(parte, bytes) else repr(parte).encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+def _torna_executavel(caminho):
+    modo = os.stat(caminho).st_mode
+    os.chmod(caminho, modo | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+
+
+class Builder:
+    # compiler: comando do compilador C; flags: flags de compilação (otimização, avisos, ...);
+    # link_flags: flags de ligação (bibliotecas, ...); cache: um BuildCache opcional.
+    def __init__(self, compiler=COMPILADOR_PADRAO, flags=FLAGS_PADRAO, link_flags=(), cache=None):
+        self.compiler = compiler
+        self.flags = list(flags)
+        self.link_flags = list(link_flags)
+        self.cache = cache
+
+    def _executa(self, argumentos):
+        try:
+            resultado = subprocess.run([self.compiler] + argumentos, capture_output=True, text=True)
+        except FileNotFoundError:
+            raise BuildError(f"compilador C não encontrado: {self.compiler!r}") from None
+        if resultado.returncode != 0:
+            raise BuildError(f"{self.compiler} falhou (código {resultado.returncode}):\n{resultado.stderr.strip()}")
+
+    # Compila o arquivo C fonte_c no executável binario. Devolve True se o binário veio do cache.
+    def build(self, fonte_c, binario):
+        os.makedirs(os.path.dirname(binario) or ".", exist_ok=True)
+        if self.cache is None:
+            self._executa(self.flags + [fonte_c, "-o", binario] + self.link_flags)
+            return False
+
+        with open(fonte_c, "rb") as f:
+            codigo_c = f.read()
+        chave_objeto = _chave("objeto", compiler_identity(self.compiler), self.flags, codigo_c)
+        chave_binario = _chave("binario", chave_objeto, self.link_flags)
+        if self.cache.copy_to(chave_binario, binario):
+            _torna_executavel(binario)
+            return True
+
+        with tempfile.TemporaryDirectory() as tmp:
+            objeto = os.path.join(tmp, "programa.o")
+            if not self.cache.copy_to(chave_objeto, objeto):
+                self._executa(self.flags + ["-c", fonte_c, "-o", objeto])
+                self.cache.put_file(chave_objeto, objeto)
+            # As flags de compilação também valem na ligação (ex: -flto, -fsanitize=...)
+            self._executa(self.flags + [objeto, "-o", binario] + self.link_flags)
+        self.cache.put_file(chave_binario, binario)
+        return False
@@ -0,0 +1,164 @@
+# ---------------------------------------------------------------------------------------------------
+# CACHE DE TRANSPILAÇÃO
+# ---------------------------------------------------------------------------------------------------
+# Guarda em disco o código C gerado para cada código-fonte, endereçado pelo conteúdo: a chave é um
+# hash SHA-256 do texto Python junto com a versão do transpilador e as opções usadas. Se o mesmo
+# fonte for transpilado de novo com as mesmas opções, o C é devolvido direto do disco, sem passar
+# pelo lexer, parser e gerador.
+# O cache tem um limite de tamanho; quando é ultrapassado, as entradas usadas há mais tempo são
+# removidas (LRU). O "último uso" de cada entrada é o mtime do arquivo, atualizado a cada acerto.
+# ---------------------------------------------------------------------------------------------------
+
+import os
+import hashlib
+import shutil
+import tempfile
+
+DIR_PADRAO = ".spyc_cache"
+TAMANHO_MAXIMO_PADRAO = 256 * 1024 * 1024   # 256 MiB
+
+
+class TranspileCache:
+    # Extensão dos arquivos das entradas.
+    SUFIXO = ".c"
+
+    def __init__(self, directory=DIR_PADRAO, max_size=TAMANHO_MAXIMO_PADRAO):
+        self.directory = directory
+        self.max_size = max_size
+        # Tamanho total estimado das entradas; calculado na primeira gravação e atualizado a cada put,
+        # para não percorrer o diretório inteiro em toda gravação.
+        self._size = None
+        os.makedirs(directory, exist_ok=True)
+
+    # Chave do cache: hash do fonte + versão do transpilador + opções (ordenadas, para ser estável).
+    @staticmethod
+    def _hash_inicial(version, options):
+        h = hashlib.sha256()
+        h.update(version.encode("utf-8"))
+        h.update(b"\0")
+        for nome, valor in sorted((options or {}).items()):
+            h.update(f"{nome}={valor!r}".encode("utf-8"))
+            h.update(b"\0")
+        return h
+
+    @staticmethod
+    def key(source, version, options=None):
+        h = TranspileCache._hash_inicial(version, options)
+        h.update(source.encode("utf-8"))
+        return h.hexdigest()
+
+    # Mesma chave que key(), mas lendo o fonte do arquivo em blocos, sem carregá-lo inteiro na memória.
+    @staticmethod
+    def key_file(path, version, options=None, chunk_size=1 << 20):
+        h = TranspileCache._hash_inicial(version, options)
+        with open(path, "rb") as f:
+            while True:
+                bloco = f.read(chunk_size)
+                if not bloco:
+                    break
+                h.update(bloco)
+        return h.hexdigest()
+
+    def _path(self, key):
+        # Subdiretórios pelos dois primeiros caracteres, para não acumular milhares de arquivos num só diretório
+        return os.path.join(self.directory, key[:2], key + self.SUFIXO)
+
+    # Devolve o caminho do C em cache (e marca como usado agora), ou None se não houver.
+    def lookup(self, key):
+        caminho = self._path(key)
+        try:
+            os.utime(caminho)
+        except FileNotFoundError:
+            return None
+        return caminho
+
+    def get(self, key):
+        caminho = self.lookup(key)
+        if caminho is None:
+            return None
+        with open(caminho, "r", encoding="utf-8") as f:
+            return f.read()
+
+    # Copia a entrada do cache direto para o arquivo de saída. Devolve False se não houver entrada.
+    def copy_to(self, key, destino):
+        caminho = self.lookup(key)
+        if caminho is None:
+            return False
+        shutil.copyfile(caminho, destino)
+        return True
+
+    # Grava uma entrada. A escrita é feita em um arquivo temporário seguido de rename, para que outros
+    # processos usando o mesmo cache nunca leiam uma entrada pela metade.
+    def put(self, key, codigo_c):
+        def grava(f):
+            f.write(codigo_c.encode("utf-8"))
+        self._grava(key, grava)
+
+    # Grava uma entrada copiando um arquivo já gerado (usado na transpilação em streaming).
+    def put_file(self, key, origem):
+        def grava(f):
+            with open(origem, "rb") as fo:
+                shutil.copyfileobj(fo, f)
+        self._grava(key, grava)
+
+    # Se a escrita falhar (erro de E/S, disco cheio), o temporário é apagado: _entries só vê as
+    # entradas, então a remoção por tamanho nunca o apagaria. Uma entrada regravada troca o tamanho
+    # antigo pelo novo no total.
+    def _grava(self, key, grava):
+        caminho = self._path(key)
+        os.makedirs(os.path.dirname(caminho), exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(caminho), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                grava(f)
+            try:
+                anterior = os.path.getsize(caminho)
+            except FileNotFoundError:
+                anterior = 0
+            os.replace(tmp, caminho)
+        except BaseException:
+            os.unlink(tmp)
+            raise
+        if self._size is None:
+            self._size = sum(tamanho for _, tamanho, _ in self._entries())
+        else:
+            self._size += os.path.getsize(caminho) - anterior
+        if self._size > self.max_size:
+            self.evict()
+
+    # Lista (mtime, tamanho, caminho) de todas as entradas.
+    def _entries(self):
+        entradas = []
+        for raiz, _, arquivos in os.walk(self.directory):
+            for nome in arquivos:
+                if not nome.endswith(self.SUFIXO):
+                    continue
+                caminho = os.path.join(raiz, nome)
+                try:
+                    st = os.stat(caminho)
+                except FileNotFoundError:
+                    continue
+                entradas.append((st.st_mtime, st.st_size, caminho))
+        return entradas
+
+    # Remove as entradas usadas há mais tempo até o cache caber no limite de tamanho.
+    def evict(self):
+        entradas = self._entries()
+        total = sum(tamanho for _, tamanho, _ in entradas)
+        if total > self.max_size:
+            entradas.sort()
+            for _, tamanho, caminho in entradas:
+                if total <= self.max_size:
+                    break
+                try:
+                    os.remove(caminho)
+                except FileNotFoundError:
+                    pass
+                total -= tamanho
+        self._size = total
+
+    # Apaga todo o conteúdo do cache.
+    def clear(self):
+        shutil.rmtree(self.directory, ignore_errors=True)
+        os.makedirs(self.directory, exist_ok=True)
+        self._size = 0
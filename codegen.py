@@ -1,19 +1,181 @@
+import io
+import re
+import ast
+
 from ast_nodes import * # Importa todas as classes definidas no ast_nodes.py
+from incremental import fingerprint, referencias
+from annotate import TypeAnnotator, elemento_da_lista, chave_e_valor_do_dict
+from runtime import (SAIDA_BUFFERIZADA, CABECALHOS_SAIDA, STRINGS, CABECALHOS_STRINGS, ENTRADA_BUFFERIZADA,
+                     CABECALHOS_ENTRADA, OBJETOS, CABECALHOS_OBJETOS, LISTAS, LISTA, DICIONARIOS, DICIONARIO,
+                     CABECALHOS_DICIONARIOS)
 
 # ---------------------------------------------------------------------------------------------------
 # CLASSE CGENERATOR
 # ---------------------------------------------------------------------------------------------------
 # Essa classe implementa o gerador de código C: recebe a árvore sintática como entrada e devolve uma string com o código equivalente em C.
+# Com um sink (qualquer objeto com write, como um arquivo aberto), o código é escrito nele à medida que
+# é gerado: cada função e cada comando do main vão para o sink assim que ficam prontos, e o programa
+# inteiro nunca fica na memória. Sem sink, generate devolve a string, como antes.
+# Limite de rodadas da resolução das especializações quando há recursão (ver resolve_specializations).
+MAX_RODADAS_DE_RESOLUCAO = 8
+
+# MODOS DE TIPOS DO C
+    # Tipo do C que cada tipo da AST ('int', 'float', vindos da inferência ou das anotações) vira em
+    # cada modo, escolhido para o programa inteiro (CGenerator(c_types=...), --c-types):
+        # native: int e float do C, sem largura fixa (o padrão);
+        # wide: inteiros de 64 bits e floats de precisão dupla (int64_t, double);
+        # narrow: inteiros de exatamente 32 bits e floats de precisão simples (int32_t, float).
+    # Os demais tipos são os mesmos em todos os modos (_TIPOS_C_FIXOS): str vira o _str do runtime das
+    # strings (runtime.STRINGS), uma lista, um ponteiro para a estrutura das listas do seu tipo de
+    # elemento (list[int] vira _lista_int*, ver runtime.LISTAS), e um dicionário, um ponteiro para a
+    # tabela hash dos seus tipos de chave e de valor (dict[str, int] vira _dict_str_int*, ver
+    # runtime.DICIONARIOS).
+C_TYPE_MODES = {
+    "native": {'int': 'int', 'float': 'float'},
+    "wide": {'int': 'int64_t', 'float': 'double'},
+    "narrow": {'int': 'int32_t', 'float': 'float'},
+}
+_TIPOS_C_FIXOS = {'str': '_str'}
+
+# Especificação do printf de cada tipo do C (%s para os demais). As de largura fixa usam as macros de
+# <inttypes.h>, que fecham e reabrem a string do formato ("%" PRId64 " ...").
+_FORMATO_PRINTF = {
+    'int': '%d',
+    'int32_t': '%" PRId32 "',
+    'int64_t': '%" PRId64 "',
+    'float': '%f',
+    'double': '%f',
+}
+
+# Função do runtime da saída bufferizada (runtime.py) que escreve cada tipo do C (_escreve_str, para
+# o _str, nos demais).
+_ESCRITA_RAPIDA = {
+    'int': '_escreve_int',
+    'int32_t': '_escreve_int',
+    'int64_t': '_escreve_int',
+    'float': '_escreve_float',
+    'double': '_escreve_float',
+    'char': '_escreve_char',
+}
+
+# Tipo do C devolvido pelas conversões do runtime da entrada (_le_int, _str_para_float, ...).
+_TIPO_DO_RUNTIME = {'int': 'long long', 'float': 'double'}
+
+# Literal de string do Python (com aspas simples ou duplas) como literal de string do C.
+def _literal_c(valor):
+    if valor[0] == '"':
+        return valor
+    return '"' + re.sub(r'(?<!\\)"', r'\\"', valor[1:-1]) + '"'
+
+# Sufixo de cada tipo nos nomes das especializações e das funções das listas e dos dicionários
+# (list[int] -> list_int, dict[str, int] -> dict_str_int).
+_SUFIXO_DO_TIPO = {'int': 'int', 'float': 'float', 'str': 'str'}
+
+def _sufixo(t):
+    elemento = elemento_da_lista(t)
+    if elemento is not None:
+        return "list_" + _sufixo(elemento)
+    if chave_e_valor_do_dict(t) is not None:
+        return "dict_" + _nome_do_dict(t)
+    return _SUFIXO_DO_TIPO.get(t, t.replace('*', 'p'))
+
+# Nome das funções de um tipo de dicionário no runtime (dict[str, int] -> str_int, em _dict_str_int_le).
+def _nome_do_dict(t):
+    chave, valor = chave_e_valor_do_dict(t)
+    return f"{_sufixo(chave)}_{_sufixo(valor)}"
+
+# Tipos de chave dos dicionários (ver runtime.DICIONARIOS).
+_CHAVES_DOS_DICTS = ('int', 'str')
+
+def _nome_especializado(name, tipos):
+    return "_".join([name] + [_sufixo(t) for t in tipos])
+
+# Nome em C da função chamada: o da especialização escolhida na anotação, se for uma função do programa.
+def _nome_chamado(call):
+    return call.spec["name"] if call.spec is not None else call.name
+
+# Variáveis atribuídas dentro de um bloco de comandos (inclusive em blocos aninhados e como variável
+# de um for).
+def _atribuidas(body):
+    nomes = set()
+    pilha = list(body)
+    while pilha:
+        node = pilha.pop()
+        if type(node) in (Assignment, For):
+            nomes.add(node.target.id)
+        pilha.extend(iter_child_nodes(node))
+    return nomes
+
+# Expressão que vale o mesmo durante todo um laço: sem chamadas de função, sem ler variáveis que
+# são atribuídas nele e sem ler elementos de listas ou dicionários, nem testar se um dicionário tem
+# uma chave (eles mudam sem atribuir à variável, e até por outro nome do mesmo objeto).
+def _estavel(expr, atribuidas):
+    nomes, chamadas = referencias(expr)
+    if chamadas or not nomes.isdisjoint(atribuidas):
+        return False
+    pilha = [expr]
+    while pilha:
+        e = pilha.pop()
+        if type(e) is Subscript or type(e) is MethodCall or type(e) is BinOp and e.op in ('in', 'not in'):
+            return False
+        pilha.extend(iter_child_nodes(e))
+    return True
+
 class CGenerator:
-    def __init__(self):
+    # cache: um IncrementalCache (incremental.py) opcional, compartilhado entre gerações sucessivas
+    # para reaproveitar o código de funções e comandos que não mudaram.
+    # sink: destino opcional do código gerado (ver flush).
+    # c_types: modo de tipos do C (ver C_TYPE_MODES).
+    # fast_io: print escreve com o runtime da saída bufferizada (runtime.SAIDA_BUFFERIZADA) em vez de printf.
+    # bounds_check: confere os índices das listas (IndexError, índices negativos); sem a conferência,
+    # x[i] é um acesso direto ao vetor.
+    def __init__(self, cache=None, sink=None, c_types="native", fast_io=False, bounds_check=True):
+        self.cache = cache
+        self.sink = sink
+        self.tipos_c = {**C_TYPE_MODES[c_types], **_TIPOS_C_FIXOS}
+        self.fast_io = fast_io
+        self.bounds_check = bounds_check
+        # Se o programa tem os runtimes das strings e dos objetos (listas e dicionários, ver
+        # emit_headers), cuja memória é liberada no fim do main.
+        self._strings = False
+        self._objetos = False
         # Controla o nível de indentação (quantidade de espaços antes das linhas de código).
         self.indent_level = 0
-        # Lista onde o código C gerado será acumulado linha por linha.
+        # Lista onde o código C gerado será acumulado linha por linha (até o próximo flush).
         self.result = []
+        # Se alguma linha já foi escrita no sink (as seguintes são separadas dela por "\n").
+        self._escreveu = False
         # Mapa de tipos de variáveis definidas no main
         self.main_env = {}
-        # Ambiente para armazenar informações das funções: nome -> {"params_types": [...], "ret_type": "int"/"void"/...}
-        self.func_signatures = {}
+        # Funções definidas no programa (nome -> FunctionDef) e as suas especializações:
+        # (nome, tipos dos parâmetros) -> especialização (ver ESPECIALIZAÇÃO DE FUNÇÕES)
+        self.functions = {}
+        self.specializations = {}
+        self.specs_by_function = {}
+        # Estado da resolução das especializações
+        self._resolvidas = set()
+        self._funcoes_resolvidas = set()
+        self._em_andamento = set()
+        self._recursao = False
+        self._deps = []
+        # No modo incremental: impressão digital de cada função e chamadas feitas por cada comando do main
+        self._fp_funcao = {}
+        self._deps_main = {}
+        # Anotação de tipos (annotate.py): os tipos das expressões são calculados uma vez por comando de
+        # nível superior, antes de gerar o seu código, e lidos de expr.ctype.
+        self.annotator = TypeAnnotator(self.specialize)
+
+    # Tipo do C de um tipo da AST no modo de tipos do gerador.
+    def tipo_c(self, t):
+        tipo = self.tipos_c.get(t)
+        if tipo is not None:
+            return tipo
+        elemento = elemento_da_lista(t)
+        if elemento is not None:
+            return f"_lista_{_sufixo(elemento)}*"
+        if chave_e_valor_do_dict(t) is not None:
+            return f"_dict_{_nome_do_dict(t)}*"
+        return t
 
     # Função Emit
         # Adiciona uma linha ao código C, com a indentação apropriada (4 espaços por nível).
@@ -21,291 +183,833 @@ class CGenerator:
     def emit(self, line):
         self.result.append("    " * self.indent_level + line)
 
-    # Inferência de tipo simples para retorno e variáveis
-    def infer_type(self, expr, env):
-        from ast_nodes import Number, BinOp, Name, FunctionCall, String
-        if isinstance(expr, FunctionCall) and expr.name == 'input':
-            return 'char*'
-        if isinstance(expr, Number):
-            return 'float' if isinstance(expr.value, float) else 'int'
-        if isinstance(expr, String):
-            return 'char*'
-        if isinstance(expr, BinOp):
-            t1 = self.infer_type(expr.left, env)
-            t2 = self.infer_type(expr.right, env)
-            return 'float' if 'float' in (t1, t2) else 'int'
-        if isinstance(expr, Name):
-            return self.main_env.get(expr.id, env.get(expr.id, 'int'))
-        if isinstance(expr, FunctionCall):
-            # Tenta pegar assinatura da função
-            sig = self.func_signatures.get(expr.name)
-            if sig:
-                return sig.get("ret_type", "int")
-            return 'int'
-        return 'int'
-    
-    # Função para inferir tipos dos argumentos passados em chamadas de funções em todo o programa
-    def infer_function_params_types(self, node):
-        # Percorre todos os nós recursivamente e para cada FunctionCall guarda os tipos dos argumentos
-        if isinstance(node, FunctionCall):
-            # Extrair tipos dos argumentos
-            arg_types = [self.infer_type(arg, {}) for arg in node.args]
-            # Atualizar assinatura da função, se já existir, confirmar compatibilidade ou expandir
-            sig = self.func_signatures.get(node.name)
-            if sig is None:
-                self.func_signatures[node.name] = {
-                    "params_types": arg_types,
-                    "ret_type": "int"  # Inicialmente padrão
-                }
+    # Função Flush
+        # Escreve no sink as linhas acumuladas em result e esvazia a lista. As linhas são separadas por
+        # "\n", sem "\n" no fim, exatamente como o "\n".join(...) do programa inteiro.
+        # Só é chamada entre comandos de nível superior, nunca no meio de um.
+    def flush(self):
+        if self.sink is None or not self.result:
+            return
+        if self._escreveu:
+            self.sink.write("\n")
+        self.sink.write("\n".join(self.result))
+        self._escreveu = True
+        self.result.clear()
+
+    # ESPECIALIZAÇÃO DE FUNÇÕES (MONOMORFIZAÇÃO)
+        # Cada função é gerada uma vez para cada combinação distinta de tipos de argumentos com que é
+        # chamada (ex: soma_int_int e soma_float_float), e cada chamada vai para a versão com os seus
+        # tipos: uma chamada só com inteiros continua em aritmética inteira, mesmo que outra chamada da
+        # mesma função passe floats. Chamadas com os mesmos tipos compartilham a mesma especialização.
+        # As especializações são descobertas durante a anotação de tipos: ao anotar uma chamada, o
+        # anotador pede a especialização para os tipos dos argumentos (specialize), que é criada e tem o
+        # corpo anotado na hora, se ainda não existir. Cada uma é um dicionário
+        #   {"name": nome em C, "params_types": [...], "ret_type": ..., "deps": chamadas feitas no corpo,
+        #    como tuplas (função, tipos dos parâmetros, tipo de retorno)}.
+        # Uma função com uma única especialização mantém o nome original em C.
+
+    # Tipos dos parâmetros da especialização de f para uma chamada com arg_types: o tipo declarado do
+    # parâmetro, se houver, ou o do argumento (int se faltar argumento).
+    @staticmethod
+    def param_types(f, arg_types):
+        n = len(f.params)
+        tipos = list(arg_types[:n]) + ['int'] * (n - len(arg_types))
+        return tuple(d if d is not None else t for d, t in zip(f.types, tipos))
+
+    # Devolve a especialização de name para os tipos dos argumentos, ou None se name não é uma função
+    # definida no programa (print, input, ...).
+    def specialize(self, name, arg_types):
+        f = self.functions.get(name)
+        if f is None:
+            return None
+        tipos = self.param_types(f, arg_types)
+        key = (name, tipos)
+        spec = self.specializations.get(key)
+        if spec is None:
+            spec = {"name": _nome_especializado(name, tipos), "params_types": list(tipos),
+                    "ret_type": f.returns or 'int', "deps": ()}
+            self.specializations[key] = spec
+        if key in self._em_andamento:
+            # Chamada recursiva: usa o tipo de retorno provisório (ver resolve_specializations)
+            self._recursao = True
+        elif key not in self._resolvidas:
+            self._resolve(f, key, spec)
+        if self._deps:
+            self._deps[-1].append((name, tipos, spec["ret_type"]))
+        return spec
+
+    # Anota o corpo de f com os tipos da especialização e fixa o tipo de retorno e as dependências.
+    # No modo incremental, o resultado de uma resolução anterior da mesma função (mesmo fonte) com os
+    # mesmos tipos é reaproveitado se as funções que ela chama ainda devolvem os mesmos tipos.
+    def _resolve(self, f, key, spec):
+        self._em_andamento.add(key)
+        self._deps.append([])
+        entrada = None
+        if self.cache is not None:
+            chave = (self._fp_funcao.get(f.name), key[1])
+            entrada = self.cache.get_annotation(chave)
+            if entrada is not None and not self._deps_validas(entrada[1]):
+                entrada = None
+            if entrada is not None:
+                self.annotator.runtime.update(entrada[2])
+        if entrada is None:
+            self._deps[-1] = []
+            ret, partes = self._anota(self.annotator.annotate_function, f, key[1])
+            entrada = (ret, tuple(self._deps[-1]), partes)
+            if self.cache is not None:
+                self.cache.put_annotation(chave, entrada)
+        self._deps.pop()
+        self._em_andamento.discard(key)
+        self._resolvidas.add(key)
+        self._funcoes_resolvidas.add(f.name)
+        spec["ret_type"], spec["deps"] = entrada[:2]
+
+    # Chama anotar(*args) e devolve o seu resultado e as partes do runtime usadas pelo que foi anotado
+    # (que também continuam em annotator.runtime). Com uma anotação reaproveitada do cache, o anotador
+    # não vê o comando, então as partes são guardadas junto com ela.
+    def _anota(self, anotar, *args):
+        anteriores, self.annotator.runtime = self.annotator.runtime, set()
+        try:
+            resultado = anotar(*args)
+        finally:
+            partes, self.annotator.runtime = self.annotator.runtime, anteriores
+            anteriores.update(partes)
+        return resultado, frozenset(partes)
+
+    # Se cada chamada (função, tipos, tipo de retorno) ainda resolve para o mesmo tipo de retorno.
+    def _deps_validas(self, deps):
+        for name, tipos, ret in deps:
+            spec = self.specialize(name, tipos)
+            if spec is None or spec["ret_type"] != ret:
+                return False
+        return True
+
+    # Resolve as especializações do programa: anota os comandos do main em ordem (com um ambiente à
+    # parte; main_env só é preenchido na geração) e as funções nunca chamadas, com os tipos declarados
+    # ou int. Se houve recursão, os tipos de retorno provisórios podem ter mudado o resultado, então a
+    # resolução é repetida, partindo dos tipos da rodada anterior, até não mudar mais; também é
+    # repetida quando o tipo de uma lista ou dicionário vazio do main só foi inferido por um comando
+    # seguinte (ver TypeAnnotator.inferidos), para a sua declaração usá-lo.
+    # main_statements: função que devolve, a cada chamada, um iterável com os comandos do main.
+    # fingerprints: no modo incremental, id(comando) -> impressão digital.
+    def resolve_specializations(self, main_statements, fingerprints=None):
+        self.annotator.resolvendo = True
+        for _ in range(MAX_RODADAS_DE_RESOLUCAO):
+            antes = {k: s["ret_type"] for k, s in self.specializations.items()}
+            self._resolvidas = set()
+            self._funcoes_resolvidas = set()
+            self._recursao = False
+            env = {}
+            for s in main_statements():
+                self.resolve_main_statement(s, env, fingerprints[id(s)] if fingerprints else None)
+            inferiu = self.annotator.fecha_main(env)
+            for name in self.functions:
+                if name not in self._funcoes_resolvidas:
+                    self.specialize(name, ())
+            # Descarta as especializações que deixaram de ser usadas nesta rodada
+            self.specializations = {k: s for k, s in self.specializations.items() if k in self._resolvidas}
+            if not inferiu and (not self._recursao
+                                or all(antes.get(k) == s["ret_type"] for k, s in self.specializations.items())):
+                break
+        self.annotator.resolvendo = False
+
+        self.specs_by_function = {}
+        for (name, _), spec in self.specializations.items():
+            self.specs_by_function.setdefault(name, []).append(spec)
+        for name, specs in self.specs_by_function.items():
+            if len(specs) == 1:
+                specs[0]["name"] = name
+
+    # Anota um comando do main durante a resolução. No modo incremental, guarda (ou reaproveita) as
+    # variáveis que ele declara e as chamadas que faz, para a geração e para a próxima resolução.
+    def resolve_main_statement(self, s, env, fp=None):
+        if self.cache is None:
+            self.annotator.annotate(s, env)
+            return
+        nomes, _ = self.cache.get_refs(fp, s)
+        chave = (fp, self._tipos_no_env(nomes, env))
+        self._deps.append([])
+        entrada = self.cache.get_annotation(chave)
+        if entrada is not None and self._deps_validas(entrada[1]):
+            env.update(entrada[0])
+            self.annotator.reaproveita(entrada[0])
+            self.annotator.runtime.update(entrada[2])
+        else:
+            self._deps[-1] = []
+            _, partes = self._anota(self.annotator.annotate, s, env)
+            entrada = ({n: env[n] for n in nomes if n in env}, tuple(self._deps[-1]), partes)
+            self.cache.put_annotation(chave, entrada)
+        self._deps.pop()
+        self._deps_main[id(s)] = entrada[1]
+
+    # Tipos das variáveis nomes em env, para as chaves do cache. Uma variável que ainda vai ser
+    # declarada com [] ou {} entra com o tipo inferido para ela (ver TypeAnnotator.inferidos).
+    def _tipos_no_env(self, nomes, env):
+        inferidos = self.annotator.inferidos
+        return tuple(sorted((n, env.get(n, inferidos.get(n))) for n in nomes))
+
+    # ETAPAS DO PROGRAMA
+        # Partes da geração de um Program, separadas para poderem ser usadas também pela transpilação em
+        # streaming (transpiler.py), que recebe os comandos de nível superior um de cada vez.
+        # Os trechos do runtime (runtime.py) vêm depois dos #include: a saída bufferizada com fast_io, as
+        # strings se o programa usa alguma, o leitor da entrada se ele chama input, int ou float e as
+        # listas e os dicionários de cada tipo usado (ver TypeAnnotator.runtime), cada um depois dos
+        # tipos dos seus elementos (que são nomes mais curtos). O leitor da entrada, as listas e os
+        # dicionários usam as strings.
+    def emit_headers(self):
+        cabecalhos = ["#include <stdio.h>", "#include <string.h>"]
+        trechos = []
+        partes = self.annotator.runtime
+        listas = [t for t in partes if elemento_da_lista(t) is not None]
+        dicts = [t for t in partes if chave_e_valor_do_dict(t) is not None]
+        for t in dicts:
+            chave = chave_e_valor_do_dict(t)[0]
+            if chave not in _CHAVES_DOS_DICTS:
+                raise NotImplementedError(f"Chaves de dicionário do tipo {chave} não são suportadas")
+        if any(t.endswith("_t") for t in self.tipos_c.values()):
+            cabecalhos += ["#include <stdint.h>", "#include <inttypes.h>"]
+        if self.fast_io:
+            cabecalhos += CABECALHOS_SAIDA
+            trechos.append(SAIDA_BUFFERIZADA)
+        self._strings = 'str' in partes or 'entrada' in partes or bool(listas) or bool(dicts)
+        if self._strings:
+            cabecalhos += CABECALHOS_STRINGS
+            trechos.append(STRINGS)
+        if 'entrada' in partes:
+            cabecalhos += CABECALHOS_ENTRADA
+            trechos.append(ENTRADA_BUFFERIZADA)
+        self._objetos = bool(listas) or bool(dicts)
+        if self._objetos:
+            cabecalhos += CABECALHOS_OBJETOS
+            trechos.append(OBJETOS)
+        if listas:
+            trechos.append(LISTAS)
+        if dicts:
+            cabecalhos += CABECALHOS_DICIONARIOS
+            trechos.append(DICIONARIOS)
+        for t in sorted(listas + dicts, key=lambda t: (len(t), t)):
+            elemento = elemento_da_lista(t)
+            if elemento is not None:
+                trechos.append(LISTA.substitute(nome=_sufixo(elemento), tipo=self.tipo_c(elemento)))
             else:
-                # Ajustar tipos para o mais geral (exemplo: se já tinha int e agora recebe float, muda para float)
-                new_types = []
-                for i, t in enumerate(arg_types):
-                    if i < len(sig["params_types"]):
-                        old_t = sig["params_types"][i]
-                        if old_t == 'int' and t == 'float':
-                            new_types.append('float')
-                        else:
-                            new_types.append(old_t)
-                    else:
-                        new_types.append(t)
-                sig["params_types"] = new_types
-
-        # Recursão para outros tipos de nó
-        if hasattr(node, 'statements'):
-            for s in node.statements:
-                self.infer_function_params_types(s)
-        if hasattr(node, 'body'):
-            for s in node.body:
-                self.infer_function_params_types(s)
-        if hasattr(node, 'args'):
-            for a in node.args:
-                self.infer_function_params_types(a)
-        if hasattr(node, 'value'):
-            self.infer_function_params_types(node.value)
-        if hasattr(node, 'left'):
-            self.infer_function_params_types(node.left)
-        if hasattr(node, 'right'):
-            self.infer_function_params_types(node.right)
-        if hasattr(node, 'condition'):
-            self.infer_function_params_types(node.condition)
-        if hasattr(node, 'else_body') and node.else_body:
-            for s in node.else_body:
-                self.infer_function_params_types(s)
+                chave, valor = chave_e_valor_do_dict(t)
+                trechos.append(DICIONARIO.substitute(nome=_nome_do_dict(t), chave=self.tipo_c(chave),
+                                                     valor=self.tipo_c(valor), k=chave))
+        self.result.extend(dict.fromkeys(cabecalhos))
+        for trecho in trechos:
+            self.result.extend(trecho.rstrip("\n").split("\n"))
+        self.result.append("")
+
+    def begin_main(self):
+        self.emit("int main() {")
+        self.indent_level += 1
+
+        # Declaração antecipada de variáveis do main (sem inicialização)
+        for var, t in self.main_env.items():
+            self.emit(f"{self.tipo_c(t)} {var};")
+
+    def end_main(self):
+        if self.fast_io:
+            self.emit("_saida_flush();")
+        if self._objetos:
+            self.emit("_objetos_libera();")
+        if self._strings:
+            self.emit("_arena_libera();")
+        self.emit("return 0;")
+        self.indent_level -= 1
+        self.emit("}")
 
     # Função Principal: Generate
         # Essa função navega na AST e chama recursivamente o código necessário para cada tipo de nó.
         # Ela trata os comandos e estruturas do programa (e não expressões).
-    def generate(self, node, env=None, is_main=False):
-        if env is None:
-            env = {}
-        # PROGRAM
-            # Itera sobre todos os comandos do programa e gera código para cada um.
-            # No final, retorna todo o código como uma string com quebras de linha.
-        if isinstance(node, Program):
-            # Primeiro: inferir assinaturas das funções pelas chamadas
-            self.infer_function_params_types(node)
-
-            # Cabeçalhos
-            self.result.append("#include <stdio.h>")
-            self.result.append("#include <string.h>")
-            self.result.append("")
-
-            # Separar definições de função e statements do main
-            funcs, mains = [], []
-            for s in node.statements:
-                (funcs if isinstance(s, FunctionDef) else mains).append(s)
-
-            # Atualizar assinaturas das funções definidas com base no que foi inferido
-            for f in funcs:
-                sig = self.func_signatures.get(f.name)
-                if sig:
-                    f.types = sig["params_types"]
+        # O método que gera cada tipo de comando é escolhido pela tabela _comandos (tipo do nó -> método),
+        # com uma única consulta em vez de uma sequência de isinstance.
+        # Tipos e declarações de variáveis já vêm da anotação de tipos (ctype e Assignment.declares).
+    # fingerprints: opcional, só para Program no modo incremental — impressões digitais dos comandos de
+    # nível superior (ver incremental.source_fingerprints); sem elas, são calculadas a partir da AST.
+    def generate(self, node, fingerprints=None):
+        if type(node) is Program:
+            return self.generate_program(node, fingerprints)
+        gerador = self._comandos.get(type(node))
+        # ERRO PARA NÓS NÃO TRATADOS
+            # Levanta um erro caso seja passado um nó que ainda não tem suporte na geração de código.
+        if gerador is None:
+            raise NotImplementedError(f"Node não tratado: {type(node).__name__}")
+        gerador(self, node)
+
+    # PROGRAM
+        # Itera sobre todos os comandos do programa e gera código para cada um.
+        # Sem sink, o código é escrito em um io.StringIO e devolvido como uma string; com sink, é
+        # escrito nele (uma função ou comando do main por vez) e nada é devolvido.
+        # É feito em duas partes, que também podem ser chamadas em separado (ex: para medir cada uma,
+        # ver profiling.py): resolve_program anota os tipos e resolve as especializações das funções, e
+        # emit_program gera o código a partir do resultado.
+    def generate_program(self, node, fingerprints=None):
+        if self.sink is None:
+            self.sink = io.StringIO()
+            try:
+                self.generate_program(node, fingerprints)
+                return self.sink.getvalue()
+            finally:
+                self.sink = None
+
+        self.emit_program(self.resolve_program(node, fingerprints))
+
+    # Devolve (funções, comandos do main, impressões digitais) para emit_program.
+    def resolve_program(self, node, fingerprints=None):
+        if self.cache is not None:
+            self.cache.begin()
+            if fingerprints is None or len(fingerprints) != len(node.statements):
+                fingerprints = [fingerprint(s) for s in node.statements]
+            fingerprints = {id(s): fp for s, fp in zip(node.statements, fingerprints)}
+
+        # Separar definições de função e statements do main
+        funcs, mains = [], []
+        for s in node.statements:
+            (funcs if isinstance(s, FunctionDef) else mains).append(s)
+
+        # Primeiro: descobrir as especializações das funções pelas chamadas (se uma função for definida
+        # mais de uma vez, vale a última definição)
+        self.functions = {f.name: f for f in funcs}
+        if self.cache is not None:
+            self._fp_funcao = {f.name: fingerprints[id(f)] for f in funcs}
+        self.resolve_specializations(lambda: mains, fingerprints)
+        return funcs, mains, fingerprints
+
+    def emit_program(self, resolvido):
+        funcs, mains, fingerprints = resolvido
+
+        # Cabeçalhos
+        self.emit_headers()
+
+        # Gerar funções: uma definição em C por especialização
+        for f in funcs:
+            if self.functions[f.name] is not f:
+                continue
+            for spec in self.specs_by_function[f.name]:
+                if self.cache is None:
+                    self.generate_specialization(f, spec)
                 else:
-                    # Caso não haja assinatura inferida, colocar tudo int
-                    f.types = ['int'] * len(f.params)
-                # Inferir o tipo de retorno
-                local_env = {p: t for p, t in zip(f.params, f.types)}
-                ret_t = 'void'
-                for st in f.body:
-                    if isinstance(st, Return):
-                        ret_t = self.infer_type(st.value, local_env)
-                        break
-                self.func_signatures[f.name] = {"params_types": f.types, "ret_type": ret_t}
-
-            # Gerar funções
-            for f in funcs:
-                self.generate(f)
+                    self.generate_cached(f, fingerprints[id(f)], spec["deps"], spec=spec)
                 self.result.append("")
+                self.flush()
 
-            # Gerar main
-            self.emit("int main() {")
-            self.indent_level += 1
+        # Gerar main
+        self.begin_main()
 
-            # Declaração antecipada de variáveis do main (sem inicialização)
-            for var, t in self.main_env.items():
-                self.emit(f"{t} {var};")
+        for s in mains:
+            if self.cache is None:
+                self.generate_main_statement(s)
+            else:
+                self.generate_cached(s, fingerprints[id(s)], self._deps_main[id(s)], self.main_env)
+            self.flush()
 
-            for s in mains:
-                self.generate(s, self.main_env, is_main=True)
-                
-            self.emit("return 0;")
-            self.indent_level -= 1
-            self.emit("}")
-
-            return "\n".join(self.result)
-        
-        # FUNCTION DEF
-            # Gera a definição de uma função em C.
-            # O nome da função vem de node.name, e o corpo é gerado recursivamente com node.body.
-            # O corpo da função é indentado.
-        elif isinstance(node, FunctionDef):
-            local_env = {p: t for p, t in zip(node.params, node.types)}
-            ret = self.func_signatures.get(node.name, {}).get("ret_type", "void")
-            sig = ', '.join(f"{t} {p}" for t, p in zip(node.types, node.params))
-            self.emit(f"{ret} {node.name}({sig}) {{")
-            self.indent_level += 1
-            for st in node.body:
-                self.generate(st, local_env)
-            self.indent_level -= 1
-            self.emit("}")
-
-        # RETURN
-        elif isinstance(node, Return):
-            expr = self.generate_expr(node.value)
-            self.emit(f"return {expr};")
-
-        # IF / ELSE
-            # Gera um bloco if (e opcionalmente else) em C.
-            # Usa generate_expr para obter a condição.
-            # Trata separadamente os corpos if e else.
-        elif isinstance(node, If):
-            self.emit(f"if ({self.generate_expr(node.condition)}) {{")
-            self.indent_level += 1
-            local_env = env.copy()
-            for stmt in node.body:
-                self.generate(stmt, local_env)
-            self.indent_level -= 1
-            if node.else_body:
-                self.emit("} else {")
-                self.indent_level += 1
-                local_env_else = env.copy()
-                for stmt in node.else_body:
-                    self.generate(stmt, local_env_else)
-                self.indent_level -= 1
-            self.emit("}")
-
-        # WHILE
-            # Traduz um laço while.
-            # A condição é passada para generate_expr.
-            # O corpo é gerado com recursão e indentado.
-        elif isinstance(node, While):
-            self.emit(f"while ({self.generate_expr(node.condition)}) {{")
+        self.end_main()
+        self.flush()
+
+        if self.cache is not None:
+            self.cache.end()
+
+    # COMANDO DO MAIN
+        # Anota os tipos de um comando de nível superior do main (as variáveis que ele declara entram em
+        # main_env) e gera o seu código.
+    def generate_main_statement(self, node):
+        self.annotator.annotate(node, self.main_env)
+        self.generate(node)
+
+    # FUNCTION DEF
+        # Gera a definição de uma função em C, uma vez para cada especialização (separadas por uma
+        # linha em branco).
+        # O nome da função vem da especialização, e o corpo é gerado recursivamente com node.body.
+        # O corpo da função é indentado.
+    def generate_function_def(self, node):
+        for i, spec in enumerate(self.specs_by_function.get(node.name, ())):
+            if i:
+                self.result.append("")
+            self.generate_specialization(node, spec)
+
+    def generate_specialization(self, node, spec):
+        # Anota o corpo com os tipos desta especialização (outra especialização da mesma função pode
+        # ter sido anotada depois da resolução desta)
+        self.annotator.annotate_function(node, spec["params_types"])
+        sig = ', '.join(f"{self.tipo_c(t)} {p}" for t, p in zip(spec["params_types"], node.params))
+        self.emit(f"{self.tipo_c(spec['ret_type'])} {spec['name']}({sig}) {{")
+        self.generate_block(node.body)
+        self.emit("}")
+
+    # Gera os comandos de um bloco um nível de indentação para dentro.
+    def generate_block(self, body):
+        self.indent_level += 1
+        for st in body:
+            self.generate(st)
+        self.indent_level -= 1
+
+    # RETURN
+    def generate_return(self, node):
+        expr = self.generate_expr(node.value)
+        self.emit(f"return {expr};")
+
+    # IF / ELSE
+        # Gera um bloco if (e opcionalmente else) em C.
+        # Usa generate_expr para obter a condição.
+        # Trata separadamente os corpos if e else.
+    def generate_if(self, node):
+        self.emit(f"if ({self.generate_expr(node.condition)}) {{")
+        self.generate_block(node.body)
+        if node.else_body:
+            self.emit("} else {")
+            self.generate_block(node.else_body)
+        self.emit("}")
+
+    # WHILE
+        # Traduz um laço while.
+        # A condição é passada para generate_expr.
+        # O corpo é gerado com recursão e indentado.
+    def generate_while(self, node):
+        self.emit(f"while ({self.generate_expr(node.condition)}) {{")
+        self.generate_block(node.body)
+        self.emit("}")
+
+    # FOR
+        # Traduz for i in range(...) em um for do C com um contador inteiro. No caso comum, o contador é
+        # a própria variável do laço: for (i = 0; i < n; i++). Com um passo constante, o teste é < (passo
+        # positivo) ou > (negativo); com um passo não constante, o sinal do passo é testado a cada volta.
+        # Em Python, os argumentos do range são avaliados uma única vez, antes do laço, e atribuir à
+        # variável do laço dentro do corpo não muda as voltas seguintes. Quando o for do C não garante
+        # isso (o fim ou o passo têm chamadas de função ou leem variáveis atribuídas no corpo, ou o corpo
+        # atribui à variável do laço), o contador passa a ser uma variável escondida (_cont_i), declarada
+        # no próprio for junto com o fim e o passo já calculados, e a variável do laço recebe o seu valor
+        # no início de cada volta.
+        # break e continue funcionam como no C: o continue vai para o incremento do contador.
+        # Diferenças em relação ao Python: com passo zero, o laço não executa (em vez de um ValueError);
+        # no caso comum, a variável termina o laço com o primeiro valor fora do range (e não o último).
+    def generate_for(self, node):
+        var = node.target.id
+        tipo = self.tipo_c('int')
+        if node.declares:
+            self.emit(f"{tipo} {var};")
+        inicio = self.generate_expr(node.start) if node.start is not None else "0"
+        fim = self.generate_expr(node.stop)
+        if node.step is None:
+            passo, constante = "1", 1
+        else:
+            passo = self.generate_expr(node.step)
+            constante = node.step.value if type(node.step) is Number else None
+            if type(constante) is not int:
+                constante = None
+
+        mudam = _atribuidas(node.body)
+        if var not in mudam:
+            mudam.add(var)
+            direto = _estavel(node.stop, mudam) and (node.step is None or _estavel(node.step, mudam))
+        else:
+            direto = False
+        if direto:
+            contador = var
+            inicializacao = f"{var} = {inicio}"
+        else:
+            contador = f"_cont_{var}"
+            declaracoes = [f"{contador} = {inicio}"]
+            if type(node.stop) is not Number:
+                fim, declaracoes = f"_fim_{var}", declaracoes + [f"_fim_{var} = {fim}"]
+            if constante is None:
+                passo, declaracoes = f"_passo_{var}", declaracoes + [f"_passo_{var} = {passo}"]
+            inicializacao = f"{tipo} " + ", ".join(declaracoes)
+
+        if constante is None:
+            teste = f"({passo} > 0 && {contador} < {fim}) || ({passo} < 0 && {contador} > {fim})"
+            incremento = f"{contador} += {passo}"
+        elif constante == 0:
+            teste, incremento = "0", ""
+        else:
+            teste = f"{contador} {'<' if constante > 0 else '>'} {fim}"
+            if abs(constante) == 1:
+                incremento = contador + ("++" if constante > 0 else "--")
+            else:
+                incremento = f"{contador} {'+=' if constante > 0 else '-='} {abs(constante)}"
+
+        self.emit(f"for ({inicializacao}; {teste}; {incremento}) {{")
+        if contador != var:
             self.indent_level += 1
-            local_env_while = env.copy()
-            for stmt in node.body:
-                self.generate(stmt, local_env_while)
+            self.emit(f"{var} = {contador};")
             self.indent_level -= 1
-            self.emit("}")
-
-        # ASSIGNMENT
-            # Traduz uma atribuição.
-            # Usa generate_expr para avaliar o lado direito.
-            # Aqui há uma simplificação: toda variável é declarada como int. Isso pode ser melhorado depois, se desejar gerar código com inferência ou tipos diferentes.
-        elif isinstance(node, Assignment):
-            var = node.target.id
-            if isinstance(node.value, FunctionCall) and node.value.name == 'input':
-                t = self.infer_type(node.value, env)
-                if var not in env:
-                    self.emit(f"char {var}[256];")
-                env[var] = t
-                if is_main:
-                    self.main_env[var] = t
-                if node.value.args:
-                    prompt = self.generate_expr(node.value.args[0])
-                    self.emit(f"printf({prompt});")
-                self.emit(f"scanf(\"%255s\", {var});")
-            else:
-                expr = self.generate_expr(node.value)
-                t = self.infer_type(node.value, env)
-                if var not in env:
-                    self.emit(f"{t} {var} = {expr};")
-                else:
-                    self.emit(f"{var} = {expr};")
-                env[var] = t
-                if is_main:
-                    self.main_env[var] = t
-
-        # COMANDOS SIMPLES
-            # Traduções diretas dos comandos break, continue, e pass.
-            # O pass vira um comentário, já que não tem equivalente em C.
-        elif isinstance(node, Break):
-            self.emit("break;")
-        elif isinstance(node, Continue):
-            self.emit("continue;")
-        elif isinstance(node, Pass):
-            self.emit("// pass")
-        # Comentário Python → comentário C
-        elif isinstance(node, Comment):
-            # emitir com // prefixo
-            self.emit(f"// {node.text}")
-
-        elif isinstance(node, FunctionCall):
-            if node.name == 'print':
-                specs, vals = [], []
-                for arg in node.args:
-                    t = self.infer_type(arg, {})
-                    if t == 'int':
-                        spec = '%d'
-                    elif t == 'float':
-                        spec = '%f'
+        self.generate_block(node.body)
+        self.emit("}")
+
+    # ASSIGNMENT
+        # Traduz uma atribuição.
+        # Usa generate_expr para avaliar o lado direito.
+        # A primeira atribuição a uma variável no escopo a declara (node.declares, marcado pela anotação de
+        # tipos), com o tipo do valor; as seguintes só atribuem.
+    def generate_assignment(self, node):
+        var = node.target.id
+        expr = self.generate_expr(node.value)
+        if node.declares:
+            self.emit(f"{self.tipo_c(node.target.ctype)} {var} = {expr};")
+        else:
+            self.emit(f"{var} = {expr};")
+
+    # ATRIBUIÇÃO A UM ELEMENTO DE LISTA OU A UMA CHAVE DE DICIONÁRIO
+        # x[i] = v vira _lista_int_guarda(x, i, v) ou, sem bounds_check, _lista_int_poe(x, i, v) (ver
+        # runtime.LISTAS), e d[k] = v, _dict_str_int_guarda(d, k, v) (ver runtime.DICIONARIOS).
+    def generate_subscript_assignment(self, node):
+        alvo = node.target
+        if chave_e_valor_do_dict(alvo.value.ctype) is not None:
+            dicionario = self.generate_expr(alvo.value)
+            chave = self.generate_expr(alvo.index)
+            self.emit(f"_dict_{_nome_do_dict(alvo.value.ctype)}_guarda({dicionario}, {chave}, "
+                      f"{self.generate_expr(node.value)});")
+            return
+        elemento = elemento_da_lista(alvo.value.ctype)
+        if elemento is None:
+            raise NotImplementedError(f"Indexação não suportada para o tipo {alvo.value.ctype}")
+        funcao = "guarda" if self.bounds_check else "poe"
+        lista = self.generate_expr(alvo.value)
+        indice = self.generate_expr(alvo.index)
+        self.emit(f"_lista_{_sufixo(elemento)}_{funcao}({lista}, {indice}, {self.generate_expr(node.value)});")
+
+    # DECLARATION
+        # Uma anotação sem valor (x: int) só declara a variável, se ela ainda não existir no escopo.
+    def generate_declaration(self, node):
+        if node.declares:
+            self.emit(f"{self.tipo_c(node.target.ctype)} {node.target.id};")
+
+    # COMANDOS SIMPLES
+        # Traduções diretas dos comandos break, continue, e pass.
+        # O pass vira um comentário, já que não tem equivalente em C.
+    def generate_break(self, node):
+        self.emit("break;")
+
+    def generate_continue(self, node):
+        self.emit("continue;")
+
+    def generate_pass(self, node):
+        self.emit("// pass")
+
+    # Comentário Python → comentário C
+    def generate_comment(self, node):
+        # emitir com // prefixo
+        self.emit(f"// {node.text}")
+
+    # CHAMADA DE FUNÇÃO COMO COMANDO
+    def generate_call(self, node):
+        if node.name == 'print' and any(elemento_da_lista(arg.ctype) is not None
+                                        or chave_e_valor_do_dict(arg.ctype) is not None for arg in node.args):
+            raise NotImplementedError("print de listas e dicionários não é suportado")
+        if node.name == 'print' and self.fast_io:
+            self.generate_fast_print(node)
+        elif node.name == 'print':
+            specs, vals = [], []
+            for arg in node.args:
+                t = self.tipo_c(arg.ctype)
+                if arg.ctype == 'str':
+                    # Strings literais vão direto para o printf; uma variável, com o seu tamanho (%.*s)
+                    if type(arg) is String:
+                        specs.append('%s')
+                        vals.append(_literal_c(arg.value))
+                    elif type(arg) is Name:
+                        specs.append('%.*s')
+                        vals.append(f"(int){arg.id}.n, {arg.id}.p")
                     else:
-                        spec = '%s'
-                    specs.append(spec)
-                    vals.append(self.generate_expr(arg))
-                fmt = ' '.join(specs) + '\\n'
-                args_list = ', '.join(vals)
-                self.emit(f'printf("{fmt}", {args_list});')
-            else:
-                args = ', '.join(self.generate_expr(a) for a in node.args)
-                self.emit(f"{node.name}({args});")
+                        specs.append('%s')
+                        vals.append(f"_str_cstr({self.generate_expr(arg)})")
+                    continue
+                specs.append(_FORMATO_PRINTF.get(t, '%s'))
+                val = self.generate_expr(arg)
+                # Literais e expressões inteiras do C são int: no printf, viram o tipo de largura fixa
+                vals.append(f"({t}){val}" if t.endswith("_t") else val)
+            fmt = ' '.join(specs) + '\\n'
+            args_list = ', '.join(vals)
+            self.emit(f'printf("{fmt}", {args_list});')
+        else:
+            self.emit(f"{self.generate_expr(node)};")
 
-        # ERRO PARA NÓS NÃO TRATADOS
-            # Levanta um erro caso seja passado um nó que ainda não tem suporte na geração de código.
+    # CHAMADA DE MÉTODO COMO COMANDO
+    def generate_method_call(self, node):
+        self.emit(f"{self.generate_expr(node)};")
+
+    # PRINT COM A SAÍDA BUFFERIZADA
+        # Com fast_io, cada argumento do print vira uma chamada à função do runtime do seu tipo (ver
+        # _ESCRITA_RAPIDA). Strings literais e os separadores vizinhos são juntados em um único
+        # _escreve_literal (o C concatena literais adjacentes): print("x =", x) vira
+        # _escreve_literal("x =" " "); _escreve_int(x); _escreve_literal("\n");
+    def generate_fast_print(self, node):
+        literais = []
+
+        def descarrega():
+            if literais:
+                self.emit(f"_escreve_literal({' '.join(literais)});")
+                literais.clear()
+
+        for i, arg in enumerate(node.args):
+            if i:
+                literais.append('" "')
+            if type(arg) is String:
+                literais.append(_literal_c(arg.value))
+                continue
+            descarrega()
+            t = self.tipo_c(arg.ctype)
+            self.emit(f"{_ESCRITA_RAPIDA.get(t, '_escreve_str')}({self.generate_expr(arg)});")
+        literais.append('"\\n"')
+        descarrega()
+
+    # GERAÇÃO INCREMENTAL
+        # Gera um comando de nível superior (uma especialização de função ou um comando do main)
+        # reaproveitando, se possível, as linhas emitidas em uma geração anterior. A chave junta a
+        # impressão digital do comando, a especialização (nome em C, tipos dos parâmetros e de retorno),
+        # as chamadas que ele faz (deps, com o nome em C da especialização chamada) e, no main, o tipo
+        # atual de cada variável que ele usa.
+        # Para comandos do main, também são guardadas as variáveis que o comando declara (efeitos).
+    def generate_cached(self, node, fp, deps, env=None, spec=None):
+        callees = tuple((n, t, r, self.specializations[(n, t)]["name"]) for n, t, r in deps)
+        is_main = env is not None
+        if is_main:
+            nomes, _ = self.cache.get_refs(fp, node)
+            vars_env = self._tipos_no_env(nomes, env)
+            assinatura = ()
         else:
-            raise NotImplementedError(f"Node não tratado: {type(node).__name__}")
+            vars_env = ()
+            assinatura = (spec["name"], tuple(spec["params_types"]), spec["ret_type"])
+        key = (fp, assinatura, callees, vars_env, self.indent_level)
+
+        cached = self.cache.get_code(key)
+        if cached is not None:
+            linhas, efeitos = cached
+            self.result.extend(linhas)
+            if is_main:
+                env.update(efeitos)
+            return
+
+        inicio = len(self.result)
+        if is_main:
+            self.generate_main_statement(node)
+            efeitos = {n: env[n] for n in nomes if n in env}
+        else:
+            self.generate_specialization(node, spec)
+            efeitos = None
+        self.cache.put_code(key, self.result[inicio:], efeitos)
 
     # GERAÇÃO DE EXPRESSÕES
         # Essa função trata expressões, como x + y ou 3 * z.
+        # Assim como em generate, o método de cada tipo de expressão vem de uma tabela (_expressoes).
     def generate_expr(self, expr):
-        # BINOP
-            # Constrói uma expressão binária com parênteses ao redor.
-            # Ex: x + 1 vira (x + 1).
-        if isinstance(expr, BinOp):
-            left = self.generate_expr(expr.left)
-            right = self.generate_expr(expr.right)
-            # Parênteses aqui
-            return f"({left} {expr.op} {right})"
-        # NAME
-            # Retorna o nome da variável diretamente.
-        elif isinstance(expr, Name):
-            return expr.id
-        # NUMBER
-            # Retorna o número como string.
-        elif isinstance(expr, Number):
-            return str(expr.value)
-        # STRING
-        elif isinstance(expr, String):
-            # imprime a aspa junto
-            return expr.value
-        elif isinstance(expr, UnaryOp):
-            operand = self.generate_expr(expr.operand)
-            return f"{expr.op}{operand}"
-        # Função chamada
-        elif isinstance(expr, FunctionCall):
-            args = ', '.join(self.generate_expr(arg) for arg in expr.args)  # Gera os argumentos
-            return f"{expr.name}({args})"
+        gerador = self._expressoes.get(type(expr))
         # ERROS
             # Erro para expressões não tratadas
-        else:
+        if gerador is None:
             raise NotImplementedError(f"Expressão não tratada: {type(expr).__name__}")
+        return gerador(self, expr)
+
+    # BINOP
+        # Constrói uma expressão binária com parênteses ao redor.
+        # Ex: x + 1 vira (x + 1).
+        # Entre strings, + é uma concatenação (_str_concat), == e != comparam o conteúdo (_str_igual) e
+        # <, <=, >, >= comparam o resultado de _str_compara com zero. k in d procura a chave no
+        # dicionário (_dict_str_int_contem).
+    def expr_binop(self, expr):
+        if elemento_da_lista(expr.ctype) is not None:
+            return self.expr_repete(expr)
+        if expr.op in ('in', 'not in'):
+            return self.expr_in(expr)
+        left = self.generate_expr(expr.left)
+        right = self.generate_expr(expr.right)
+        if 'str' in (expr.left.ctype, expr.right.ctype):
+            if expr.op == '+':
+                return f"_str_concat({left}, {right})"
+            if expr.op == '==':
+                return f"_str_igual({left}, {right})"
+            if expr.op == '!=':
+                return f"(!_str_igual({left}, {right}))"
+            return f"(_str_compara({left}, {right}) {expr.op} 0)"
+        # Parênteses aqui
+        return f"({left} {expr.op} {right})"
+
+    # NAME
+        # Retorna o nome da variável diretamente.
+    def expr_name(self, expr):
+        return expr.id
+
+    # NUMBER
+        # Retorna o número como string.
+    def expr_number(self, expr):
+        return str(expr.value)
+
+    # STRING
+        # Um literal vira um _str constante: _STR("texto", número de caracteres).
+    def expr_string(self, expr):
+        return f"_STR({_literal_c(expr.value)}, {len(ast.literal_eval(expr.value))})"
+
+    # LISTAS
+        # Uma lista literal é criada a partir de um vetor literal do C com os elementos
+        # (_lista_int_de(3, (int[]){1, 2, 3})), e [] é uma lista nova vazia. [v] * n preenche a lista
+        # direto com v (_lista_int_cheia), sem criar a lista [v]; as demais repetições copiam a lista.
+    def expr_list(self, expr):
+        elemento = elemento_da_lista(expr.ctype)
+        sufixo = _sufixo(elemento)
+        if not expr.elements:
+            return f"_lista_{sufixo}_nova(0)"
+        valores = ', '.join(self.generate_expr(e) for e in expr.elements)
+        return f"_lista_{sufixo}_de({len(expr.elements)}, ({self.tipo_c(elemento)}[]){{{valores}}})"
+
+    def expr_in(self, expr):
+        if chave_e_valor_do_dict(expr.right.ctype) is None:
+            raise NotImplementedError(f"Operador {expr.op} não suportado para o tipo {expr.right.ctype}")
+        chave = self.generate_expr(expr.left)
+        contem = f"_dict_{_nome_do_dict(expr.right.ctype)}_contem({self.generate_expr(expr.right)}, {chave})"
+        return contem if expr.op == 'in' else f"(!{contem})"
+
+    def expr_repete(self, expr):
+        lista, vezes = expr.left, expr.right
+        if elemento_da_lista(lista.ctype) is None:
+            lista, vezes = vezes, lista
+        sufixo = _sufixo(elemento_da_lista(expr.ctype))
+        vezes = self.generate_expr(vezes)
+        if type(lista) is List and len(lista.elements) == 1:
+            return f"_lista_{sufixo}_cheia({vezes}, {self.generate_expr(lista.elements[0])})"
+        return f"_lista_{sufixo}_repete({self.generate_expr(lista)}, {vezes})"
+
+    # SUBSCRIPT
+        # x[i] é o elemento i, conferido por _lista_<tipo>_le ou, sem bounds_check, x->dados[i]. d[k] é o
+        # valor da chave k, lido por _dict_<tipos>_le (KeyError se a chave não estiver no dicionário).
+    def expr_subscript(self, expr):
+        if chave_e_valor_do_dict(expr.value.ctype) is not None:
+            dicionario = self.generate_expr(expr.value)
+            return f"_dict_{_nome_do_dict(expr.value.ctype)}_le({dicionario}, {self.generate_expr(expr.index)})"
+        elemento = elemento_da_lista(expr.value.ctype)
+        if elemento is None:
+            raise NotImplementedError(f"Indexação não suportada para o tipo {expr.value.ctype}")
+        lista = self.generate_expr(expr.value)
+        indice = self.generate_expr(expr.index)
+        if not self.bounds_check:
+            return f"{lista}->dados[{indice}]"
+        return f"_lista_{_sufixo(elemento)}_le({lista}, {indice})"
+
+    def expr_method(self, expr):
+        elemento = elemento_da_lista(expr.value.ctype)
+        if elemento is None or expr.name != 'append' or len(expr.args) != 1:
+            raise NotImplementedError(f"Método não suportado: {expr.name}")
+        lista = self.generate_expr(expr.value)
+        return f"_lista_{_sufixo(elemento)}_append({lista}, {self.generate_expr(expr.args[0])})"
+
+    # DICIONÁRIOS
+        # Como as listas, um dicionário literal é criado a partir de vetores literais do C com as chaves
+        # e os valores (_dict_str_int_de(2, (_str[]){...}, (int[]){1, 2})), e {} é um dicionário novo vazio.
+    def expr_dict(self, expr):
+        nome = _nome_do_dict(expr.ctype)
+        if not expr.keys:
+            return f"_dict_{nome}_novo(0)"
+        chave, valor = chave_e_valor_do_dict(expr.ctype)
+        chaves = ', '.join(self.generate_expr(k) for k in expr.keys)
+        valores = ', '.join(self.generate_expr(v) for v in expr.values)
+        return (f"_dict_{nome}_de({len(expr.keys)}, ({self.tipo_c(chave)}[]){{{chaves}}}, "
+                f"({self.tipo_c(valor)}[]){{{valores}}})")
+
+    def expr_unaryop(self, expr):
+        operand = self.generate_expr(expr.operand)
+        return f"{expr.op}{operand}"
+
+    # Função chamada
+    def expr_call(self, expr):
+        if expr.spec is None:
+            embutida = self._embutidas.get(expr.name)
+            if embutida is not None:
+                return embutida(self, expr)
+        args = ', '.join(self.generate_expr(arg) for arg in expr.args)  # Gera os argumentos
+        return f"{_nome_chamado(expr)}({args})"
+
+    # INPUT, INT E FLOAT
+        # input() lê uma linha inteira da entrada padrão com o leitor do runtime (ver
+        # runtime.ENTRADA_BUFFERIZADA). O prompt, se houver, é escrito antes da leitura com o operador
+        # vírgula do C, para que a chamada continue sendo uma expressão:
+        # (_escreve_str(_STR("Nome: ", 6)), _le_linha()).
+        # int(input()) e float(input()) convertem a linha direto no buffer da entrada (_le_int,
+        # _le_float). int(x) e float(x) de uma string usam as conversões do runtime; de um número, viram
+        # um cast (int(x) trunca em direção a zero, como no Python). As funções do runtime devolvem long
+        # long e double, convertidos para o tipo do C do modo de tipos quando ele é outro.
+    def expr_input(self, expr, leitura="_le_linha()"):
+        if not expr.args:
+            return leitura
+        return f"(_escreve_str({self.generate_expr(expr.args[0])}), {leitura})"
+
+    def expr_conversion(self, expr):
+        tipo = expr.name
+        if not expr.args:
+            return "0" if tipo == 'int' else "0.0"
+        arg = expr.args[0]
+        tipo_c = self.tipo_c(tipo)
+        if type(arg) is FunctionCall and arg.name == 'input' and arg.spec is None:
+            leitura = f"_le_{tipo}()"
+            if tipo_c != _TIPO_DO_RUNTIME[tipo]:
+                leitura = f"(({tipo_c}){leitura})"
+            return self.expr_input(arg, leitura)
+        valor = self.generate_expr(arg)
+        if arg.ctype == 'str':
+            valor = f"_str_para_{tipo}({valor})"
+            if tipo_c == _TIPO_DO_RUNTIME[tipo]:
+                return valor
+        return f"(({tipo_c}){valor})"
+
+    # STR E LEN
+        # str(x) de um número usa as conversões do runtime das strings, com o mesmo texto do Python (com
+        # um float do C, o menor texto que volta ao mesmo float de precisão simples); de uma string, é a
+        # própria string. len(x) lê o tamanho guardado no _str, na lista ou no
+        # dicionário, sem percorrer a string.
+    def expr_str(self, expr):
+        if not expr.args:
+            return '_STR("", 0)'
+        arg = expr.args[0]
+        valor = self.generate_expr(arg)
+        if arg.ctype == 'float':
+            if self.tipo_c('float') == 'float':
+                return f"_str_de_float_simples({valor})"
+            return f"_str_de_float({valor})"
+        if arg.ctype == 'str':
+            return valor
+        return f"_str_de_int({valor})"
+
+    def expr_len(self, expr):
+        arg = expr.args[0]
+        acesso = "." if arg.ctype == 'str' else "->"
+        return f"(({self.tipo_c('int')})({self.generate_expr(arg)}){acesso}len)"
+
+    # TABELAS DE DESPACHO
+        # Tipo do nó -> método que o trata. Um novo tipo de nó só precisa do seu método e de uma
+        # entrada aqui.
+    _comandos = {
+        FunctionDef: generate_function_def,
+        Return: generate_return,
+        If: generate_if,
+        While: generate_while,
+        For: generate_for,
+        Assignment: generate_assignment,
+        Declaration: generate_declaration,
+        Break: generate_break,
+        Continue: generate_continue,
+        Pass: generate_pass,
+        Comment: generate_comment,
+        FunctionCall: generate_call,
+        SubscriptAssignment: generate_subscript_assignment,
+        MethodCall: generate_method_call,
+    }
+
+    _expressoes = {
+        BinOp: expr_binop,
+        Name: expr_name,
+        Number: expr_number,
+        String: expr_string,
+        UnaryOp: expr_unaryop,
+        FunctionCall: expr_call,
+        List: expr_list,
+        Dict: expr_dict,
+        Subscript: expr_subscript,
+        MethodCall: expr_method,
+    }
+
+    # Funções do Python traduzidas pelo gerador (as demais chamadas vão para as funções do programa).
+    _embutidas = {
+        'input': expr_input,
+        'int': expr_conversion,
+        'float': expr_conversion,
+        'str': expr_str,
+        'len': expr_len,
+    }
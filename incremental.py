@@ -0,0 +1,124 @@
+# ---------------------------------------------------------------------------------------------------
+# GERAÇÃO INCREMENTAL
+# ---------------------------------------------------------------------------------------------------
+# Cache em memória usado pelo CGenerator para não refazer o trabalho de partes do programa que não
+# mudaram entre duas transpilações (por exemplo, um serviço que transpila de novo o mesmo módulo
+# a cada edição).
+# Cada comando de nível superior (FunctionDef ou comando do main) recebe uma impressão digital
+# (fingerprint): o hash do seu trecho de código-fonte (ou, na falta dele, da sua estrutura). São guardados:
+    # annotations: o resultado da anotação de tipos de cada especialização de função (tipo de retorno)
+    #   e de cada comando do main (variáveis declaradas), junto com as chamadas feitas, como
+    #   (função, tipos, tipo de retorno). Quem usa a entrada confere antes que cada função chamada
+    #   ainda devolve o mesmo tipo (ver CGenerator._deps_validas).
+    # code: as linhas de C emitidas para o comando. A chave inclui, além da impressão digital, tudo
+    #   de que a geração depende: a especialização da própria função, as especializações chamadas
+    #   e, para comandos do main, o tipo atual das variáveis que o comando usa.
+    # refs: nomes de variáveis e funções chamadas que aparecem no comando.
+# Só sobrevivem as entradas usadas na última geração, então a memória fica proporcional ao programa atual.
+# ---------------------------------------------------------------------------------------------------
+
+import re
+import hashlib
+
+from ast_nodes import Node, Name, FunctionCall, iter_child_nodes
+
+
+# Estrutura de um nó (tipo + campos, recursivamente) em uma forma que pode ser comparada/hasheada.
+# A posição no código-fonte não entra: mover uma função de lugar não muda a sua impressão digital.
+def _estrutura(node):
+    if isinstance(node, Node):
+        campos = tuple(_estrutura(getattr(node, k)) for k in node._fields)
+        return (type(node).__name__,) + campos
+    if isinstance(node, list):
+        return tuple(_estrutura(x) for x in node)
+    return node
+
+# Impressão digital de um nó: muda se, e somente se, a estrutura do nó mudar.
+def fingerprint(node):
+    return hashlib.sha1(repr(_estrutura(node)).encode("utf-8")).hexdigest()
+
+# Início de cada comando de nível superior: uma linha que começa na coluna 0 e não é um "else" (que
+# pertence ao if anterior). Strings não atravessam linhas, então isso coincide com o que o lexer
+# considera indentação zero.
+_INICIO_DE_COMANDO = re.compile(r'^(?![ \t\r\n]|else\b)', re.M)
+
+# Impressões digitais dos comandos de nível superior calculadas direto do texto, uma por comando, na
+# mesma ordem de Program.statements. Bem mais barato do que percorrer a AST.
+def source_fingerprints(source):
+    inicios = [m.start() for m in _INICIO_DE_COMANDO.finditer(source) if m.start() < len(source)]
+    inicios.append(len(source))
+    return [
+        hashlib.sha1(source[a:b].rstrip().encode("utf-8")).hexdigest()
+        for a, b in zip(inicios, inicios[1:])
+    ]
+
+# Nomes de variáveis e de funções chamadas que aparecem dentro de um nó.
+def referencias(node, nomes=None, chamadas=None):
+    if nomes is None:
+        nomes, chamadas = set(), set()
+    if isinstance(node, list):
+        for x in node:
+            referencias(x, nomes, chamadas)
+        return nomes, chamadas
+    tipo = type(node)
+    if tipo is Name:
+        nomes.add(node.id)
+    elif tipo is FunctionCall:
+        chamadas.add(node.name)
+    for filho in iter_child_nodes(node):
+        referencias(filho, nomes, chamadas)
+    return nomes, chamadas
+
+
+class IncrementalCache:
+    def __init__(self):
+        # Entradas da geração anterior e da geração atual (as não usadas são descartadas em end()).
+        self._annotations_old, self._annotations = {}, {}
+        self._code_old, self._code = {}, {}
+        self._refs_old, self._refs = {}, {}
+        self.hits = 0
+        self.misses = 0
+
+    def begin(self):
+        self.hits = 0
+        self.misses = 0
+
+    def end(self):
+        self._annotations_old, self._annotations = self._annotations, {}
+        self._code_old, self._code = self._code, {}
+        self._refs_old, self._refs = self._refs, {}
+
+    @staticmethod
+    def _busca(atual, antigo, key):
+        if key in atual:
+            return atual[key]
+        valor = antigo.pop(key, None)
+        if valor is not None:
+            atual[key] = valor
+        return valor
+
+    def get_annotation(self, key):
+        return self._busca(self._annotations, self._annotations_old, key)
+
+    def put_annotation(self, key, valor):
+        self._annotations[key] = valor
+
+    # Devolve (nomes, chamadas) que aparecem no comando com a impressão digital fp.
+    def get_refs(self, fp, node):
+        refs = self._busca(self._refs, self._refs_old, fp)
+        if refs is None:
+            refs = referencias(node)
+            self._refs[fp] = refs
+        return refs
+
+    # Devolve (linhas, efeitos) ou None. efeitos são as variáveis que o comando declara no main.
+    def get_code(self, key):
+        valor = self._busca(self._code, self._code_old, key)
+        if valor is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return valor
+
+    def put_code(self, key, linhas, efeitos=None):
+        self._code[key] = (linhas, efeitos or {})
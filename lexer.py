@@ -1,4 +1,7 @@
 # lexer.py
+import sys
+import hashlib
+import threading
 import ply.lex as lex   # Importa o módulo lex do PLY para criar o analisador léxico.
 
 # TOKENS
@@ -6,7 +9,7 @@ import ply.lex as lex   # Importa o módulo lex do PLY para criar o analisador l
 # Esses são os tipos de tokens que o lexer irá reconhecer. Estão incluídos:
     # Operadores Aritméticos: +, -, *, /
     # Comparações: ==, !=, <, <=, etc.
-    # Símbolos: =, (, ), :
+    # Símbolos: =, (, ), [, ], {, }, :, .
     # Controle de Indentação: NEWLINE, INDENT, DEDENT
     # Palavras Reservadas e Identificadores
 # -------------------------------------------------------------------------------------
@@ -15,7 +18,7 @@ tokens = [
     'NAME','NUMBER', 'STRING',
     'PLUS','MINUS','TIMES','DIVIDE',
     'LT','GT','LE','GE','EQEQ','NE',
-    'ASSIGN','LPAREN','RPAREN','COLON',
+    'ASSIGN','LPAREN','RPAREN','LBRACKET','RBRACKET','LBRACE','RBRACE','COLON','ARROW','DOT',
     'NEWLINE','INDENT','DEDENT',
     'COMMA',
     'TYPE',
@@ -39,9 +42,17 @@ reserved = {
     'not': 'NOT',
     'pass': 'PASS',
     'return': 'RETURN',
+    'list': 'LIST',
+    'dict': 'DICT',
 }
 tokens += list(reserved.values())
 
+# TIPOS
+# Nomes de tipo das anotações (x: int, -> float) e dos parâmetros no estilo do C (int x). São
+# reconhecidos pelo t_NAME como palavras inteiras: nomes como "interval" ou "floaty" continuam sendo NAME.
+type_names = ('int', 'float', 'char', 'str', 'bool')
+reserved.update(dict.fromkeys(type_names, 'TYPE'))
+
 # EXPRESSÕES REGULARES
 # Essas regras usam expressões regulares para tokens que têm uma forma fixa. Cada variável t_NOME define a regex correspondente.
 t_PLUS    = r'\+'
@@ -57,7 +68,13 @@ t_GT      = r'>'    # Maior
 t_ASSIGN  = r'='
 t_LPAREN  = r'\('
 t_RPAREN  = r'\)'
+t_LBRACKET = r'\['  # Listas e indexação
+t_RBRACKET = r'\]'
+t_LBRACE  = r'\{'   # Dicionários
+t_RBRACE  = r'\}'
+t_DOT     = r'\.'   # Métodos (x.append(v))
 t_COLON   = r':'
+t_ARROW   = r'->'   # Tipo de retorno (def f() -> int:)
 t_COMMA = r','
 
 # COMENTÁRIOS
@@ -70,11 +87,7 @@ def t_COMMENT(t):
 
 # IDENTIFICADORES E PALAVRAS-CHAVE
 # Reconhece nomes de variáveis ou funções.
-# Se for uma palavra-chave reservada (como if, while, etc.), troca o tipo para o correspondente (IF, WHILE...).
-
-def t_TYPE(t):
-    r'int|float|char'   # ou qualquer regex que cubra seus tipos
-    return t
+# Se for uma palavra-chave reservada (como if, while, etc.) ou um nome de tipo, troca o tipo para o correspondente (IF, WHILE, TYPE...).
 
 def t_NAME(t):
     r'[A-Za-z_][A-Za-z0-9_]*'
@@ -102,8 +115,9 @@ t_ignore = ' \t'
 # Essa é a parte mais complexa e crucial para emular o comportamento do Python (que depende de indentação):
 # Stack de indentação
 # -------------------------------------------------------------------------------------
-
-INDENT_STACK = [0]      # Mantém a pilha de indentação. Ex: [0, 4, 8] para blocos com 0, 4 e 8 espaços.
+# A pilha de indentação fica em cada instância do lexer (t.lexer.indent_stack), e não em uma
+# variável global: assim duas transpilações no mesmo processo (ou em threads diferentes) não
+# corrompem o estado uma da outra. Ex: [0, 4, 8] para blocos com 0, 4 e 8 espaços.
 
 # NOVA LINHA
 # Quando encontra uma nova linha, ele:
@@ -114,6 +128,8 @@ INDENT_STACK = [0]      # Mantém a pilha de indentação. Ex: [0, 4, 8] para bl
     # Os tokens INDENT/DEDENT são armazenados em t.lexer.pending_tokens, que serão entregues um a um.
 def t_NEWLINE(t):
     r'\n[ \t]*'
+    # o NEWLINE pertence à linha que ele termina; INDENT/DEDENT, à linha seguinte
+    newline = _make_token('NEWLINE', '\n', t)
     t.lexer.lineno += 1
     indent_str = t.value[1:]  # Pega os espaços/tabs após o \n
     indent = 0
@@ -124,75 +140,124 @@ def t_NEWLINE(t):
             indent += 4  # ou 8, dependendo do padrão adotado
 
     t.value = '\n'
+    indent_stack = t.lexer.indent_stack
     tokens_to_emit = []
 
     # sempre emitimos um NEWLINE
-    tok = lex.LexToken()
-    tok.type  = 'NEWLINE'
-    tok.value = '\n'
-    tok.lineno = t.lexer.lineno
-    tok.lexpos = t.lexpos
-    tokens_to_emit.append(tok)
-
-    if indent > INDENT_STACK[-1]:
-        INDENT_STACK.append(indent)
-        tok = lex.LexToken()
-        tok.type  = 'INDENT'
-        tok.value = ''
-        tok.lineno = t.lexer.lineno
-        tok.lexpos = t.lexpos
-        tokens_to_emit.append(tok)
+    tokens_to_emit.append(newline)
+
+    if indent > indent_stack[-1]:
+        indent_stack.append(indent)
+        tokens_to_emit.append(_make_token('INDENT', '', t))
     else:
         # emitir quantos DEDENT forem necessários
-        while indent < INDENT_STACK[-1]:
-            INDENT_STACK.pop()
-            tok = lex.LexToken()
-            tok.type  = 'DEDENT'
-            tok.value = ''
-            tok.lineno = t.lexer.lineno
-            tok.lexpos = t.lexpos
-            tokens_to_emit.append(tok)
+        while indent < indent_stack[-1]:
+            indent_stack.pop()
+            tokens_to_emit.append(_make_token('DEDENT', '', t))
 
     # agora guardamos essa lista no lexer e emitimos um por vez
-    t.lexer.pending_tokens = tokens_to_emit
+    t.lexer.pending_tokens.extend(tokens_to_emit)
     return t.lexer.token()  # pega o primeiro
-    
-# Garante emissão de DEDENTs após NEWLINE
-# Essa função sobrescreve lexer.token() para que ele retorne os tokens pendentes primeiro (como INDENT/DEDENT), antes de continuar a análise normal.
-def lexer_token():
-    if hasattr(lexer, 'pending_tokens') and lexer.pending_tokens:
-        return lexer.pending_tokens.pop(0)
-    else:
-        return lexer.original_token()
+
+# Cria um token sintético (NEWLINE/INDENT/DEDENT) na posição do token t.
+def _make_token(type_, value, t):
+    tok = lex.LexToken()
+    tok.type   = type_
+    tok.value  = value
+    tok.lineno = t.lexer.lineno
+    tok.lexpos = t.lexpos
+    return tok
 
 # ERROS
-# Captura qualquer caractere não reconhecido e mostra uma mensagem de erro.
+# Captura qualquer caractere não reconhecido: a mensagem de erro é acumulada em errors, no estado do
+# lexer (como os erros do parser, ver parser.build_parser), e o caractere é pulado para a análise
+# continuar; quem chamou decide o que fazer com os erros (Transpiler.parse levanta SyntaxError).
 def t_error(t):
-    print(f"Caracter inválido: {t.value[0]!r} na linha {t.lexer.lineno}")
+    t.lexer.errors.append(f"Erro léxico: caractere inválido {t.value[0]!r} na linha {t.lexer.lineno}")
     t.lexer.skip(1)
 
 def t_eof(t):
+    if t.lexer.at_eof:
+        return None
+    t.lexer.at_eof = True
+    # Se o arquivo não termina com quebra de linha, fecha o último comando com um NEWLINE
+    data = t.lexer.lexdata
+    if data and not data.endswith('\n'):
+        t.lexer.pending_tokens.append(_make_token('NEWLINE', '\n', t))
     # Ao encontrar o EOF, emite um DEDENT para cada indent extra ainda na pilha
-    while len(INDENT_STACK) > 1:
-        INDENT_STACK.pop()
-        tok = lex.LexToken()
-        tok.type   = 'DEDENT'
-        tok.value  = ''
-        tok.lineno = t.lexer.lineno
-        tok.lexpos = t.lexpos
-        if not hasattr(t.lexer, 'pending_tokens'):
-            t.lexer.pending_tokens = []
-        t.lexer.pending_tokens.append(tok)
+    indent_stack = t.lexer.indent_stack
+    while len(indent_stack) > 1:
+        indent_stack.pop()
+        t.lexer.pending_tokens.append(_make_token('DEDENT', '', t))
     return None
 
 # CRIAÇÃO DO LEXER
 # -------------------------------------------------------------------------------------
-# Cria o analisador léxico.
-# Salva a função original token().
-# Substitui por lexer_token() para gerenciar INDENT/DEDENT.
+# O lexer "mestre" (com a regex já compilada) é criado uma única vez, só no primeiro uso.
+# Ele é carregado em modo otimizado a partir da tabela pré-gerada em tables/lextab_<assinatura>.py,
+# sem validar as regras nem recompilar a regex mestre a cada início de processo. A assinatura é um
+# hash das regras do lexer: se alguma regra mudar, o nome da tabela muda e ela é gerada de novo
+# (ver tables/__main__.py).
+# Cada chamada de build_lexer() devolve um clone independente, com sua própria pilha de
+# indentação e fila de tokens pendentes, e com token() substituído para entregar primeiro
+# os tokens pendentes (INDENT/DEDENT) antes de continuar a análise normal.
 # -------------------------------------------------------------------------------------
 
-lexer = lex.lex()
-lexer.original_token = lexer.token
-lexer.token = lexer_token
-lexer.dedent_queue = []
+# Hash das regras que definem a tabela do lexer (tokens, regex das strings t_* e das funções t_*, na ordem em que aparecem).
+def assinatura_lexer():
+    g = globals()
+    regras_str = sorted((k, v) for k, v in g.items() if k.startswith('t_') and isinstance(v, str))
+    regras_fn = sorted((v.__code__.co_firstlineno, k, v.__doc__) for k, v in g.items()
+                       if k.startswith('t_') and callable(v))
+    dados = repr((tokens, regras_str, [(k, doc) for _, k, doc in regras_fn]))
+    return hashlib.sha1(dados.encode('utf-8')).hexdigest()[:12]
+
+LEXTAB = f"tables.lextab_{assinatura_lexer()}"
+
+_master_lexer = None
+_master_lock = threading.Lock()
+
+def _lexer_mestre():
+    global _master_lexer
+    if _master_lexer is None:
+        with _master_lock:
+            if _master_lexer is None:
+                _master_lexer = lex.lex(module=sys.modules[__name__], optimize=1, lextab=LEXTAB)
+    return _master_lexer
+
+def build_lexer():
+    novo = _lexer_mestre().clone()
+    original_token = novo.token
+
+    # Garante emissão de INDENT/DEDENT após NEWLINE e dos DEDENTs gerados no EOF
+    def token():
+        if novo.pending_tokens:
+            return novo.pending_tokens.pop(0)
+        tok = original_token()
+        if tok is None and novo.pending_tokens:
+            return novo.pending_tokens.pop(0)
+        return tok
+
+    novo.original_token = original_token
+    novo.token = token
+    reset_lexer(novo)
+    return novo
+
+# Zera o estado de indentação e posição do lexer, para reaproveitá-lo em uma nova entrada
+# (inclusive depois de um parse que falhou no meio de um bloco).
+def reset_lexer(lx):
+    lx.indent_stack = [0]
+    lx.pending_tokens = []
+    lx.errors = []
+    lx.at_eof = False
+    lx.lineno = 1
+
+# Lexer padrão do módulo, mantido para quem faz "from lexer import lexer". Criado só quando é
+# acessado pela primeira vez. O parser usa lex.lexer quando nenhum lexer é passado para parse().
+def __getattr__(nome):
+    global lexer
+    if nome == 'lexer':
+        lexer = build_lexer()
+        lex.lexer = lexer
+        return lexer
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
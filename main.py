@@ -1,33 +1,292 @@
 import os
-from parser import parser
-from codegen import CGenerator
+import sys
+import json
+import time
+import shlex
+import argparse
+import contextlib
+from concurrent.futures import ProcessPoolExecutor
+from transpiler import Transpiler
+from codegen import C_TYPE_MODES
+from build import Builder, BuildCache, BuildError, COMPILADOR_PADRAO, FLAGS_PADRAO
+from cache import TranspileCache, DIR_PADRAO, TAMANHO_MAXIMO_PADRAO
 
-def main():
+# ---------------------------------------------------------------------------------------------------
+# MODO ARQUIVO ÚNICO
+# ---------------------------------------------------------------------------------------------------
+# Sem argumentos, o transpilador continua lendo input/input.py e gravando output/output.c (e, com
+# --build, o executável output/program). Devolve o código de saída do processo: 1 se o arquivo não
+# existe ou se a transpilação ou a compilação falhou (o erro é mostrado), como no modo lote.
+def main_arquivo_unico(config_cache=None, stream=False, perfil=None, opcoes=None, mostra_removidos=False,
+                       config_build=None):
     caminho_entrada = "input/input.py"
 
     if not os.path.isfile(caminho_entrada):
         print(f"Erro: arquivo '{caminho_entrada}' não encontrado.")
+        return 1
+
+    # Lê o input/input.py, faz o parsing, gera o código C e salva em output/output.c
+    # (a pasta 'output' é criada se não existir)
+    transpiler = _cria_transpiler(config_cache, opcoes)
+    try:
+        if perfil is None:
+            do_cache = transpiler.transpile_file(caminho_entrada, "output/output.c", stream)
+        else:
+            relatorio = transpiler.profile_file(caminho_entrada, "output/output.c", *perfil[1:])
+            do_cache = False
+    except SyntaxError as e:
+        print(e)
+        return 1
+    except NotImplementedError as e:
+        print(f"NotImplementedError: {e}")
+        return 1
+
+    print("Código C gerado em 'output/output.c'" + (" (cache)" if do_cache else ""))
+    if mostra_removidos:
+        imprime_removidos(transpiler.removed)
+    if perfil is not None:
+        grava_perfil(perfil[0], [relatorio])
+    if config_build is not None:
+        try:
+            do_cache = _cria_builder(config_build).build("output/output.c", "output/program")
+        except BuildError as e:
+            print(e)
+            return 1
+        print("Executável gerado em 'output/program'" + (" (cache)" if do_cache else ""))
+    return 0
+
+# Com --report-removed, lista o que o otimizador removeu (ver Transpiler.removed).
+def imprime_removidos(removidos, prefixo="  "):
+    for r in removidos:
+        if r["tipo"] == "funcao":
+            o_que = f"função '{r['nome']}'"
+        elif r["tipo"] == "atribuicao":
+            o_que = f"atribuição a '{r['nome']}'"
+        else:
+            o_que = "comando"
+        print(f"{prefixo}removido: linha {r['linha']}: {o_que} ({r['motivo']})")
+
+# ---------------------------------------------------------------------------------------------------
+# PERFIL (--profile)
+# ---------------------------------------------------------------------------------------------------
+# Com --profile, cada arquivo é transpilado pelo pipeline completo, sem consultar o cache, medindo o
+# tempo e a memória de cada etapa (ver profiling.py). Os relatórios, um por arquivo, são gravados
+# como uma lista JSON no arquivo dado. Com "-", o JSON vai para a saída padrão e as demais mensagens
+# são desviadas para a saída de erros (ver main), para que a saída padrão seja só o JSON.
+# perfil: None ou (destino do JSON, mede memória, número de funções do cProfile).
+def grava_perfil(destino, relatorios):
+    if destino == "-":
+        json.dump(relatorios, sys.__stdout__, indent=2, ensure_ascii=False)
+        sys.__stdout__.write("\n")
         return
+    with open(destino, "w", encoding="utf-8") as f:
+        json.dump(relatorios, f, indent=2, ensure_ascii=False)
+    print(f"Perfil gravado em '{destino}'")
+
+# config_cache: None (sem cache) ou (diretório, tamanho máximo em bytes).
+# opcoes: opções do Transpiler que mudam o código gerado, como dicionário (optimize, desligado com
+# --no-optimize; c_types, escolhido com --c-types; fast_io, ligado com --fast-io; bounds_check,
+# desligado com --no-bounds-check).
+def _cria_transpiler(config_cache, opcoes=None):
+    opcoes = opcoes or {}
+    if config_cache is None:
+        return Transpiler(**opcoes)
+    return Transpiler(cache=TranspileCache(*config_cache), **opcoes)
+
+# ---------------------------------------------------------------------------------------------------
+# COMPILAÇÃO (--build)
+# ---------------------------------------------------------------------------------------------------
+# Com --build, o C gerado é compilado com o compilador C (--cc, --cflags, --ldflags) em um executável
+# com o mesmo nome do .c, sem a extensão (ver build.py). O cache dos objetos e executáveis fica no
+# subdiretório build/ do diretório do cache e não é usado com --no-cache.
+# config_build: (compilador, flags, flags de ligação, None ou (diretório do cache, tamanho máximo)).
+def _cria_builder(config_build):
+    compilador, flags, flags_ligacao, config_cache = config_build
+    cache = BuildCache(*config_cache) if config_cache is not None else None
+    return Builder(compilador, flags, flags_ligacao, cache)
+
+# ---------------------------------------------------------------------------------------------------
+# MODO LOTE
+# ---------------------------------------------------------------------------------------------------
+# Recebe vários arquivos e/ou diretórios, distribui os arquivos entre um pool de processos e grava
+# cada .c em uma árvore de saída que espelha a de entrada. Cada processo do pool cria o seu
+# Transpiler uma única vez e o reaproveita para todos os arquivos que receber.
+
+_transpiler = None
+_builder = None
+_stream = False
+_perfil = None
+
+def _inicializa_worker(config_cache=None, stream=False, perfil=None, opcoes=None, config_build=None):
+    global _transpiler, _builder, _stream, _perfil
+    _transpiler = _cria_transpiler(config_cache, opcoes)
+    _builder = _cria_builder(config_build) if config_build is not None else None
+    _stream = stream
+    _perfil = perfil
+
+# Transpila um arquivo (e, com --build, compila o C gerado); devolve (entrada, saida, segundos, do_cache,
+# erro, relatorio, removidos, compilado) — erro é None em caso de sucesso, relatorio é o perfil do
+# arquivo com --profile (senão, None), removidos é o que o otimizador removeu (vazio se o resultado veio
+# do cache) e compilado é None sem --build ou se o executável veio (True) ou não (False) do cache.
+def _transpila_arquivo(tarefa):
+    entrada, saida = tarefa
+    inicio = time.perf_counter()
+    do_cache = False
+    relatorio = None
+    compilado = None
+    try:
+        if _perfil is None:
+            do_cache = _transpiler.transpile_file(entrada, saida, _stream)
+        else:
+            relatorio = _transpiler.profile_file(entrada, saida, *_perfil[1:])
+        removidos = _transpiler.removed if not do_cache else []
+        if _builder is not None:
+            compilado = _builder.build(saida, os.path.splitext(saida)[0])
+        erro = None
+    except Exception as e:
+        erro = f"{type(e).__name__}: {e}"
+        removidos = []
+    return entrada, saida, time.perf_counter() - inicio, do_cache, erro, relatorio, removidos, compilado
+
+# Expande as entradas em pares (arquivo .py, arquivo .c de saída).
+# Um arquivo avulso vai para a raiz da saída; um diretório é percorrido e a estrutura é espelhada.
+def coleta_tarefas(entradas, dir_saida):
+    tarefas = []
+    for entrada in entradas:
+        if os.path.isdir(entrada):
+            for raiz, dirs, arquivos in os.walk(entrada):
+                dirs.sort()
+                for nome in sorted(arquivos):
+                    if nome.endswith(".py"):
+                        caminho = os.path.join(raiz, nome)
+                        relativo = os.path.relpath(caminho, entrada)
+                        tarefas.append((caminho, os.path.join(dir_saida, os.path.splitext(relativo)[0] + ".c")))
+        elif os.path.isfile(entrada):
+            nome = os.path.splitext(os.path.basename(entrada))[0] + ".c"
+            tarefas.append((entrada, os.path.join(dir_saida, nome)))
+        else:
+            print(f"Erro: '{entrada}' não encontrado.")
+    return tarefas
+
+def main_lote(entradas, dir_saida, jobs, config_cache=None, stream=False, perfil=None, opcoes=None,
+              mostra_removidos=False, config_build=None):
+    tarefas = coleta_tarefas(entradas, dir_saida)
+    if not tarefas:
+        print("Nenhum arquivo .py encontrado.")
+        return 1
+
+    inicio = time.perf_counter()
+    if jobs == 1:
+        _inicializa_worker(config_cache, stream, perfil, opcoes, config_build)
+        resultados = [_transpila_arquivo(t) for t in tarefas]
+    else:
+        # Lotes maiores diminuem o custo de comunicação entre processos quando há milhares de arquivos
+        chunksize = max(1, len(tarefas) // (jobs * 8))
+        with ProcessPoolExecutor(max_workers=jobs, initializer=_inicializa_worker,
+                                 initargs=(config_cache, stream, perfil, opcoes, config_build)) as pool:
+            resultados = list(pool.map(_transpila_arquivo, tarefas, chunksize=chunksize))
+    total = time.perf_counter() - inicio
+
+    # Resumo: tempo de cada arquivo, falhas e totais
+    falhas = acertos = 0
+    for entrada, saida, segundos, do_cache, erro, _, removidos, compilado in resultados:
+        if erro is None:
+            acertos += do_cache
+            status = "cache" if do_cache else "ok"
+            binario = ""
+            if compilado is not None:
+                binario = f" -> {os.path.splitext(saida)[0]}" + (" (cache)" if compilado else "")
+            print(f"  {status:5} {segundos * 1000:8.1f} ms  {entrada} -> {saida}{binario}")
+            if mostra_removidos:
+                imprime_removidos(removidos, prefixo="        ")
+        else:
+            falhas += 1
+            print(f"  FALHA {segundos * 1000:8.1f} ms  {entrada}: {erro}")
+    print(f"{len(resultados)} arquivo(s), {len(resultados) - falhas} ok ({acertos} do cache), "
+          f"{falhas} falha(s) em {total:.2f} s com {jobs} processo(s)")
+    if perfil is not None:
+        grava_perfil(perfil[0], [r[5] for r in resultados if r[5] is not None])
+    return 1 if falhas else 0
 
-    # Lê o conteúdo do arquivo input/input.py
-    with open(caminho_entrada, "r", encoding="utf-8") as f:
-        codigo_python = f.read()
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="Transpilador de Python para C.")
+    ap.add_argument("entradas", nargs="*",
+                    help="arquivos .py e/ou diretórios a transpilar (padrão: input/input.py -> output/output.c)")
+    ap.add_argument("-o", "--saida", default="output",
+                    help="diretório onde a árvore de arquivos .c é gravada (padrão: output)")
+    ap.add_argument("-j", "--jobs", type=int, default=os.cpu_count() or 1,
+                    help="número de processos em paralelo (padrão: número de CPUs)")
+    ap.add_argument("--no-cache", action="store_true",
+                    help="não consulta nem grava o cache de transpilação")
+    ap.add_argument("--clear-cache", action="store_true",
+                    help="apaga o cache de transpilação antes de começar")
+    ap.add_argument("--cache-dir", default=DIR_PADRAO,
+                    help=f"diretório do cache (padrão: {DIR_PADRAO})")
+    ap.add_argument("--cache-max-size", type=int, default=TAMANHO_MAXIMO_PADRAO // (1024 * 1024),
+                    help="tamanho máximo do cache em MiB; as entradas menos usadas são removidas (padrão: %(default)s)")
+    ap.add_argument("--stream", action="store_true",
+                    help="lê a entrada em blocos e grava o C à medida que é gerado, com memória "
+                         "proporcional ao maior comando (para entradas muito grandes)")
+    ap.add_argument("--no-optimize", action="store_true",
+                    help="não passa a AST pelo otimizador (dobra e propagação de constantes, if/while constantes)")
+    ap.add_argument("--c-types", choices=list(C_TYPE_MODES), default="native",
+                    help="tipos do C para int e float: native (int, float), wide (int64_t, double) ou "
+                         "narrow (int32_t, float) (padrão: %(default)s)")
+    ap.add_argument("--fast-io", action="store_true",
+                    help="o C gerado escreve a saída do print em um buffer próprio, com uma função por tipo, "
+                         "em vez de um printf por chamada (para programas que imprimem muito)")
+    ap.add_argument("--no-bounds-check", action="store_true",
+                    help="o C gerado indexa as listas sem conferir os índices (sem IndexError nem índices "
+                         "negativos), como um acesso direto a um vetor do C")
+    ap.add_argument("--report-removed", action="store_true",
+                    help="lista o que o otimizador removeu de cada arquivo (funções não usadas, código "
+                         "inalcançável, atribuições a variáveis nunca lidas); ignora o cache")
+    ap.add_argument("--profile", metavar="ARQUIVO",
+                    help="mede o tempo e a memória de cada etapa (lex, parse, tipos, codegen, escrita) e grava "
+                         "os relatórios em JSON neste arquivo ('-' para a saída padrão); ignora o cache")
+    ap.add_argument("--profile-top", type=int, default=0, metavar="N",
+                    help="inclui no perfil as N funções com mais tempo próprio segundo o cProfile (padrão: 0)")
+    ap.add_argument("--profile-no-memory", action="store_true",
+                    help="não mede a memória no perfil (o tracemalloc deixa a transpilação mais lenta)")
+    ap.add_argument("--build", action="store_true",
+                    help="compila cada .c gerado em um executável com o mesmo nome (output/program no modo "
+                         "arquivo único), reaproveitando objetos e executáveis do cache")
+    ap.add_argument("--cc", default=COMPILADOR_PADRAO,
+                    help="compilador C usado por --build (padrão: a variável de ambiente CC ou gcc)")
+    ap.add_argument("--cflags", default=" ".join(FLAGS_PADRAO),
+                    help="flags de compilação usadas por --build (padrão: '%(default)s')")
+    ap.add_argument("--ldflags", default="",
+                    help="flags de ligação usadas por --build, como bibliotecas (padrão: nenhuma)")
+    args = ap.parse_args(argv)
+    if args.profile and args.stream:
+        ap.error("--profile não pode ser usado com --stream")
 
-    # Faz o parsing do código Python
-    ast = parser.parse(codigo_python)
+    perfil = None
+    if args.profile:
+        perfil = (args.profile, not args.profile_no_memory, max(0, args.profile_top))
 
-    # Gera o código C
-    gen = CGenerator()
-    codigo_c = gen.generate(ast)
+    config_cache = None
+    if not args.no_cache and not args.report_removed:
+        config_cache = (args.cache_dir, args.cache_max_size * 1024 * 1024)
+    if args.clear_cache:
+        TranspileCache(args.cache_dir).clear()
 
-    # Cria a pasta 'output' se ela não existir
-    os.makedirs("output", exist_ok=True)
+    config_build = None
+    if args.build:
+        config_cache_build = None
+        if not args.no_cache:
+            config_cache_build = (os.path.join(args.cache_dir, "build"), args.cache_max_size * 1024 * 1024)
+        config_build = (args.cc, shlex.split(args.cflags), shlex.split(args.ldflags), config_cache_build)
 
-    # Salva o código C no arquivo output/output.c
-    with open("output/output.c", "w", encoding="utf-8") as f:
-        f.write(codigo_c)
+    opcoes = {"optimize": not args.no_optimize, "c_types": args.c_types, "fast_io": args.fast_io,
+              "bounds_check": not args.no_bounds_check}
 
-    print("Código C gerado em 'output/output.c'")
+    with contextlib.redirect_stdout(sys.stderr) if args.profile == "-" else contextlib.nullcontext():
+        if not args.entradas:
+            return main_arquivo_unico(config_cache, args.stream, perfil, opcoes, args.report_removed,
+                                      config_build)
+        return main_lote(args.entradas, args.saida, max(1, args.jobs), config_cache, args.stream, perfil,
+                         opcoes, args.report_removed, config_build)
 
 if __name__ == "__main__":
-    main()
+    sys.exit(main())
@@ -0,0 +1,583 @@
+# ---------------------------------------------------------------------------------------------------
+# OTIMIZAÇÃO DA AST
+# ---------------------------------------------------------------------------------------------------
+# Passada entre o parser e o gerador de código que simplifica a AST sem mudar o comportamento do C
+# gerado:
+    # dobra de constantes: expressões aritméticas, comparações e and/or/not sobre números são calculadas
+    #   aqui, com a semântica do C (divisão de inteiros truncada em direção a zero; comparações e
+    #   operadores lógicos valem 0 ou 1). Divisões por zero, resultados inteiros fora da faixa de um int
+    #   de 32 bits e resultados float infinitos ou NaN não são dobrados: ficam para o C.
+    # propagação de constantes: uma variável atribuída uma única vez no seu escopo (corpo de função ou
+    #   main), fora de qualquer bloco, com um valor inteiro constante, é trocada por esse valor em todos
+    #   os usos depois da atribuição. A atribuição continua lá, declarando a variável. Floats não são
+    #   propagados: a variável é um float do C, com menos precisão que o literal. Nem uma variável
+    #   anotada com outro tipo (x: float = 1, ou x: float antes de x = 1): ela é um float, e o literal
+    #   inteiro mudaria o resultado (x / 2 viraria uma divisão de inteiros).
+    # if/while com condição constante: o if é trocado pelos comandos do corpo escolhido (que passam
+    #   para o bloco de fora) e some se não sobrar nenhum. Se o corpo escolhido pode declarar
+    #   variáveis (atribuições, anotações e for no seu nível de cima), ele continua sendo um bloco
+    #   próprio, um if com condição 1 e sem else: no bloco de fora, a declaração mudaria o escopo e o
+    #   tipo da variável. Um while com condição falsa some, e um com condição verdadeira fica com a
+    #   condição 1. Um for sobre um range constante vazio some.
+    # código inalcançável: os comandos de um bloco depois de um return, break ou continue (ou de um
+    #   if/else em que os dois lados terminam assim) são removidos. Comentários ficam.
+    # atribuições mortas: as atribuições a uma variável que nunca é lida no seu escopo (nem para
+    #   calcular outra variável que é lida) são removidas. Se o valor tem chamadas de função, elas
+    #   continuam sendo feitas: x = f(y) vira só f(y); um valor com chamadas em outra forma fica como está.
+#   Uma lista ou um dicionário que só é alterado (x[i] = v, x.append(v), d[k] = v) conta como lido: a
+#   atribuição que o cria fica.
+    # funções não usadas: só ficam as funções alcançáveis pelo grafo de chamadas a partir do main (e,
+    #   de uma função definida mais de uma vez, só a última definição).
+# Cada comando de nível superior é otimizado em separado, o que permite usar a mesma passada no modo
+# streaming. As decisões que dependem do programa inteiro são tomadas a partir de passadas anteriores
+# sobre os comandos: o construtor conta as atribuições do main (quais variáveis são atribuídas uma única
+# vez); depois de optimize, collect junta as leituras de variáveis do main e as chamadas de cada função
+# e finish decide quais atribuições do main e quais funções são removidas, o que eliminate aplica.
+# O que foi removido é registrado no relatório (report): uma entrada por função, comando ou atribuição,
+# com o motivo e a linha.
+# ---------------------------------------------------------------------------------------------------
+
+import math
+import operator
+
+from ast_nodes import *
+
+# Faixa de um int do C (32 bits); resultados fora dela não são dobrados.
+INT_MIN = -2 ** 31
+INT_MAX = 2 ** 31 - 1
+
+# Divisão com a semântica do C: entre inteiros, truncada em direção a zero. None se o divisor for zero.
+def _divide(a, b):
+    if b == 0:
+        return None
+    if type(a) is int and type(b) is int:
+        q = abs(a) // abs(b)
+        return q if (a < 0) == (b < 0) else -q
+    return a / b
+
+_ARITMETICOS = {
+    '+': operator.add,
+    '-': operator.sub,
+    '*': operator.mul,
+    '/': _divide,
+}
+
+_COMPARACOES = {
+    '<': operator.lt,
+    '>': operator.gt,
+    '<=': operator.le,
+    '>=': operator.ge,
+    '==': operator.eq,
+    '!=': operator.ne,
+}
+
+# Operadores cujo resultado em C já é 0 ou 1.
+_BOOLEANOS = frozenset(_COMPARACOES) | {'&&', '||', 'in', 'not in'}
+
+# Comandos que podem declarar uma variável no bloco em que estão.
+_DECLARAM = (Assignment, Declaration, For)
+
+# Número com o valor dado, na posição do nó origem; None se o valor não puder ser escrito como
+# literal com o mesmo significado no C.
+def _numero(valor, origem):
+    if type(valor) is int:
+        if not INT_MIN <= valor <= INT_MAX:
+            return None
+    elif not math.isfinite(valor):
+        return None
+    return Number(valor).set_span(origem.lineno, origem.col_offset)
+
+# Valor de uma expressão que é um número inteiro constante (None se não for).
+def _valor_int(expr):
+    if type(expr) is Number and type(expr.value) is int:
+        return expr.value
+    return None
+
+def _booleano(expr):
+    tipo = type(expr)
+    if tipo is BinOp:
+        return expr.op in _BOOLEANOS
+    if tipo is UnaryOp:
+        return expr.op == '!'
+    return tipo is Number and expr.value in (0, 1) and type(expr.value) is int
+
+# Expressão sem chamadas de função (nem de métodos): pode deixar de ser avaliada sem mudar o programa.
+def _pura(expr):
+    chamadas = set()
+    _leituras(expr, set(), chamadas)
+    return not chamadas
+
+# Acrescenta a nomes as variáveis lidas e a chamadas as funções chamadas em uma expressão (sem recursão,
+# percorrendo só os tipos de nó que aparecem em expressões). Um método entra em chamadas como
+# ".nome", que não é o nome de nenhuma função.
+def _leituras(expr, nomes, chamadas):
+    pilha = [expr]
+    while pilha:
+        e = pilha.pop()
+        tipo = type(e)
+        if tipo is BinOp:
+            pilha.append(e.left)
+            pilha.append(e.right)
+        elif tipo is Name:
+            nomes.add(e.id)
+        elif tipo is FunctionCall:
+            chamadas.add(e.name)
+            pilha.extend(e.args)
+        elif tipo is UnaryOp:
+            pilha.append(e.operand)
+        elif tipo is Subscript:
+            pilha.append(e.value)
+            pilha.append(e.index)
+        elif tipo is List:
+            pilha.extend(e.elements)
+        elif tipo is Dict:
+            pilha.extend(e.keys)
+            pilha.extend(e.values)
+        elif tipo is MethodCall:
+            chamadas.add("." + e.name)
+            pilha.append(e.value)
+            pilha.extend(e.args)
+
+# Último comando de um bloco que não é um comentário (None se não houver).
+def _ultimo_comando(body):
+    for st in reversed(body):
+        if type(st) is not Comment:
+            return st
+    return None
+
+# Comando depois do qual o resto do bloco nunca é executado.
+def _termina(st):
+    tipo = type(st)
+    if tipo in (Return, Break, Continue):
+        return True
+    if tipo is If and st.else_body:
+        return _termina(_ultimo_comando(st.body)) and _termina(_ultimo_comando(st.else_body))
+    return False
+
+# Blocos de comandos dentro de um comando (atribuições só aparecem neles, nunca em expressões).
+def _blocos(st):
+    tipo = type(st)
+    if tipo is If:
+        return (st.body, st.else_body) if st.else_body else (st.body,)
+    if tipo is While or tipo is For:
+        return (st.body,)
+    return ()
+
+# Conta, em contagem, as atribuições a cada variável dentro do comando st (inclusive nos blocos). A
+# variável de um for conta como atribuída.
+def _conta_atribuicoes(st, contagem):
+    tipo = type(st)
+    if tipo is Assignment or tipo is For:
+        contagem[st.target.id] = contagem.get(st.target.id, 0) + 1
+    if tipo is Assignment:
+        return
+    for bloco in _blocos(st):
+        for filho in bloco:
+            _conta_atribuicoes(filho, contagem)
+
+# Variáveis que podem ser propagadas em um escopo: atribuídas uma única vez, por um comando do nível
+# de cima do escopo (fora de blocos), e que não são parâmetros.
+def _candidatas(statements, params=()):
+    contagem = {}
+    for st in statements:
+        _conta_atribuicoes(st, contagem)
+    return {st.target.id for st in statements
+            if type(st) is Assignment and contagem[st.target.id] == 1} - set(params)
+
+
+# USOS DE VARIÁVEIS E FUNÇÕES EM UM ESCOPO
+    # Junta, percorrendo os comandos de um escopo (sem entrar em funções definidas nele), o que é
+    # preciso para achar as atribuições mortas e as funções usadas:
+        # raizes: variáveis lidas por código que fica de qualquer jeito (condições, argumentos, returns,
+        #   valores com chamadas de função);
+        # dependencias: variável -> variáveis lidas pelos valores sem chamadas atribuídos a ela, que só
+        #   importam se ela for lida;
+        # atribuidas: variáveis atribuídas; chamadas: funções chamadas.
+    # As variáveis vivas são as alcançáveis a partir das raízes pelas dependências; as atribuições às
+    # demais são mortas.
+class _Usos:
+    def __init__(self):
+        self.raizes = set()
+        self.dependencias = {}
+        self.atribuidas = set()
+        self.chamadas = set()
+
+    def visit(self, node):
+        tipo = type(node)
+        if tipo is Assignment:
+            nomes, chamadas = set(), set()
+            _leituras(node.value, nomes, chamadas)
+            self.atribuidas.add(node.target.id)
+            if chamadas:
+                self.raizes |= nomes
+                self.chamadas |= chamadas
+            else:
+                self.dependencias.setdefault(node.target.id, set()).update(nomes)
+            return
+        if tipo is FunctionDef:
+            return
+        if tipo is Name:
+            self.raizes.add(node.id)
+        elif tipo is FunctionCall:
+            self.chamadas.add(node.name)
+        for filho in iter_child_nodes(node):
+            self.visit(filho)
+
+    def mortas(self):
+        vivas = set()
+        pendentes = list(self.raizes)
+        while pendentes:
+            nome = pendentes.pop()
+            if nome not in vivas:
+                vivas.add(nome)
+                pendentes.extend(self.dependencias.get(nome, ()))
+        return self.atribuidas - vivas
+
+
+class Optimizer:
+    # statements: os comandos de nível superior do programa (só os do main são usados), em qualquer
+    # iterável; percorridos uma única vez.
+    # report: dicionário onde as remoções são registradas (ver report_entry); pode ser compartilhado
+    # entre vários Optimizer.
+    def __init__(self, statements=(), report=None):
+        contagem = {}
+        topo = []
+        for st in statements:
+            if type(st) is FunctionDef:
+                continue
+            _conta_atribuicoes(st, contagem)
+            if type(st) is Assignment:
+                topo.append(st.target.id)
+        self._candidatas_main = {nome for nome in topo if contagem[nome] == 1}
+        # Escopo atual: variáveis que podem ser propagadas e as constantes já conhecidas (nome -> valor)
+        self._candidatas = self._candidatas_main
+        self._constantes = {}
+        # (nome, valor) das constantes propagadas pela última chamada de optimize
+        self.substituidas = set()
+        self.report = {} if report is None else report
+        # Usos no main e chamadas feitas por (e linha da última definição de) cada função, juntados por
+        # collect; atribuições mortas do main e funções alcançáveis, calculadas por finish.
+        self._usos_main = _Usos()
+        self._chamadas_funcao = {}
+        self._definicao = {}
+        # (função, linha) -> entradas do relatório registradas ao otimizar o corpo dela, que saem do
+        # relatório se a função inteira for removida
+        self._relatorio_funcao = {}
+        self._mortas_main = set()
+        self.reachable = None
+        # Variáveis cujas atribuições foram removidas pela última chamada de eliminate
+        self.eliminadas = set()
+
+    # Registra uma remoção no relatório. tipo: "funcao", "comando" ou "atribuicao".
+    def report_entry(self, tipo, node, motivo, nome=None):
+        chave = (tipo, nome, node.lineno, motivo)
+        if chave not in self.report:
+            self.report[chave] = {"tipo": tipo, "nome": nome, "linha": node.lineno, "motivo": motivo}
+
+    # Volta ao início do main: as constantes do main são esquecidas (para percorrê-lo de novo).
+    def reset(self):
+        self._candidatas = self._candidatas_main
+        self._constantes = {}
+
+    # Otimiza um comando de nível superior e devolve a lista de comandos que o substitui (vazia se ele
+    # foi eliminado). Os comandos do main devem ser passados na ordem do programa.
+    def optimize(self, st):
+        self.substituidas = set()
+        return self.optimize_block([st], topo=True)
+
+    # Otimiza os comandos de um bloco. topo: o bloco é o nível de cima do escopo, onde as atribuições
+    # das variáveis candidatas definem constantes.
+    def optimize_block(self, body, topo=False):
+        resultado = []
+        for i, st in enumerate(body):
+            otimizar = self._comandos.get(type(st))
+            novos = otimizar(self, st) if otimizar is not None else [st]
+            resultado.extend(novos)
+            if topo and type(st) is Assignment and st.target.id in self._candidatas:
+                valor = st.value
+                if type(valor) is Number and type(valor.value) is int and st.annotation in (None, 'int'):
+                    self._constantes[st.target.id] = valor.value
+            elif topo and type(st) is Declaration and st.annotation != 'int':
+                self._candidatas = self._candidatas - {st.target.id}
+            if novos and _termina(_ultimo_comando(novos)):
+                for resto in body[i + 1:]:
+                    if type(resto) is Comment:
+                        resultado.append(resto)
+                    else:
+                        self.report_entry("comando", resto, "inalcançável")
+                break
+        return resultado
+
+    # COMANDOS
+        # Cada método devolve a lista de comandos que substitui o comando recebido.
+    def stmt_function(self, node):
+        antes = set(self.report)
+        anteriores = self._candidatas, self._constantes
+        self._candidatas = _candidatas(node.body, node.params)
+        self._constantes = {}
+        node.body = self.optimize_block(node.body, topo=True)
+        self._candidatas, self._constantes = anteriores
+        usos = _Usos()
+        for st in node.body:
+            usos.visit(st)
+        node.body = self._sem_atribuicoes(node.body, usos.mortas(), set())
+        self._relatorio_funcao[(node.name, node.lineno)] = [k for k in self.report if k not in antes]
+        return [node]
+
+    def stmt_assignment(self, node):
+        node.value = self.optimize_expr(node.value)
+        return [node]
+
+    def stmt_return(self, node):
+        if node.value is not None:
+            node.value = self.optimize_expr(node.value)
+        return [node]
+
+    def stmt_call(self, node):
+        node.args = [self.optimize_expr(arg) for arg in node.args]
+        return [node]
+
+    def stmt_subscript_assignment(self, node):
+        node.target = self.optimize_expr(node.target)
+        node.value = self.optimize_expr(node.value)
+        return [node]
+
+    def stmt_method_call(self, node):
+        return [self.optimize_expr(node)]
+
+    def stmt_if(self, node):
+        node.condition = self.optimize_expr(node.condition)
+        if type(node.condition) is Number:
+            escolhido = self.optimize_block(node.body if node.condition.value else (node.else_body or []))
+            if any(type(st) in _DECLARAM for st in escolhido):
+                node.condition = Number(1).set_span(node.condition.lineno, node.condition.col_offset)
+                node.body, node.else_body = escolhido, None
+                return [node]
+            return escolhido
+        node.body = self.optimize_block(node.body)
+        if node.else_body:
+            node.else_body = self.optimize_block(node.else_body)
+        return [node]
+
+    def stmt_while(self, node):
+        condicao = self.optimize_expr(node.condition)
+        if type(condicao) is Number:
+            if not condicao.value:
+                return []
+            condicao = Number(1).set_span(condicao.lineno, condicao.col_offset)
+        node.condition = condicao
+        node.body = self.optimize_block(node.body)
+        return [node]
+
+    # Um for sobre um range constante vazio (ou com passo zero, que não executa no C gerado) some.
+    def stmt_for(self, node):
+        argumentos = []
+        for campo in ('start', 'stop', 'step'):
+            arg = getattr(node, campo)
+            if arg is not None:
+                arg = self.optimize_expr(arg)
+                setattr(node, campo, arg)
+            argumentos.append(arg)
+        inicio, fim, passo = argumentos
+        valores = [0 if inicio is None else _valor_int(inicio), _valor_int(fim),
+                   1 if passo is None else _valor_int(passo)]
+        if None not in valores and (valores[2] == 0 or not range(*valores)):
+            return []
+        node.body = self.optimize_block(node.body)
+        return [node]
+
+    # EXPRESSÕES
+        # Cada método devolve a expressão que substitui a recebida (ela mesma, se não mudou).
+    def optimize_expr(self, expr):
+        otimizar = self._expressoes.get(type(expr))
+        return otimizar(self, expr) if otimizar is not None else expr
+
+    def expr_name(self, expr):
+        valor = self._constantes.get(expr.id)
+        if valor is None:
+            return expr
+        self.substituidas.add((expr.id, valor))
+        return Number(valor).set_span(expr.lineno, expr.col_offset)
+
+    def expr_binop(self, expr):
+        expr.left = esquerda = self.optimize_expr(expr.left)
+        expr.right = direita = self.optimize_expr(expr.right)
+        if expr.op in ('&&', '||'):
+            return self._logico(expr, esquerda, direita)
+        if type(esquerda) is not Number or type(direita) is not Number:
+            return expr
+        a, b = esquerda.value, direita.value
+        comparar = _COMPARACOES.get(expr.op)
+        if comparar is not None:
+            return _numero(int(comparar(a, b)), expr)
+        calcular = _ARITMETICOS.get(expr.op)
+        valor = calcular(a, b) if calcular is not None else None
+        if valor is None:
+            return expr
+        return _numero(valor, expr) or expr
+
+    # && e || com avaliação em curto-circuito: o lado direito só é descartado se o esquerdo o decide; o
+    # esquerdo só é descartado se não tiver chamadas de função. Um lado não constante só substitui a
+    # expressão inteira se já valer 0 ou 1.
+    def _logico(self, expr, esquerda, direita):
+        e = expr.op == '&&'
+        if type(esquerda) is Number:
+            if bool(esquerda.value) != e:
+                return _numero(int(not e), expr)
+            if type(direita) is Number:
+                return _numero(int(bool(direita.value)), expr)
+            return direita if _booleano(direita) else expr
+        if type(direita) is Number and _pura(esquerda):
+            if bool(direita.value) != e:
+                return _numero(int(not e), expr)
+            return esquerda if _booleano(esquerda) else expr
+        return expr
+
+    def expr_unaryop(self, expr):
+        expr.operand = operando = self.optimize_expr(expr.operand)
+        if expr.op == '!' and type(operando) is Number:
+            return _numero(int(not operando.value), expr)
+        return expr
+
+    def expr_call(self, expr):
+        expr.args = [self.optimize_expr(arg) for arg in expr.args]
+        return expr
+
+    def expr_list(self, expr):
+        expr.elements = [self.optimize_expr(e) for e in expr.elements]
+        return expr
+
+    def expr_dict(self, expr):
+        expr.keys = [self.optimize_expr(k) for k in expr.keys]
+        expr.values = [self.optimize_expr(v) for v in expr.values]
+        return expr
+
+    def expr_subscript(self, expr):
+        expr.value = self.optimize_expr(expr.value)
+        expr.index = self.optimize_expr(expr.index)
+        return expr
+
+    def expr_method(self, expr):
+        expr.value = self.optimize_expr(expr.value)
+        expr.args = [self.optimize_expr(arg) for arg in expr.args]
+        return expr
+
+    # CÓDIGO MORTO
+        # Junta os usos de um comando de nível superior já otimizado: as leituras e chamadas de um
+        # comando do main, ou as chamadas feitas por uma função (e a sua linha, para saber qual é a
+        # última definição). Os comandos devem ser passados na ordem do programa.
+    def collect(self, st):
+        if type(st) is FunctionDef:
+            usos = _Usos()
+            for filho in st.body:
+                usos.visit(filho)
+            self._chamadas_funcao[st.name] = usos.chamadas
+            self._definicao[st.name] = st.lineno
+        else:
+            self._usos_main.visit(st)
+
+    # Depois de collect sobre todos os comandos: calcula as atribuições mortas do main e as funções
+    # alcançáveis a partir dele (reachable).
+    def finish(self):
+        self._mortas_main = self._usos_main.mortas()
+        self.reachable = set()
+        pendentes = [n for n in self._usos_main.chamadas if n in self._chamadas_funcao]
+        while pendentes:
+            nome = pendentes.pop()
+            if nome not in self.reachable:
+                self.reachable.add(nome)
+                pendentes.extend(n for n in self._chamadas_funcao[nome] if n in self._chamadas_funcao)
+
+    # Aplica a um comando de nível superior já otimizado as remoções decididas por finish e devolve a
+    # lista de comandos que o substitui.
+    def eliminate(self, st):
+        self.eliminadas = set()
+        if type(st) is FunctionDef:
+            if st.name not in self.reachable:
+                motivo = "nunca chamada"
+            elif self._definicao.get(st.name) != st.lineno:
+                motivo = "redefinida depois"
+            else:
+                return [st]
+            for chave in self._relatorio_funcao.pop((st.name, st.lineno), ()):
+                self.report.pop(chave, None)
+            self.report_entry("funcao", st, motivo, st.name)
+            return []
+        return self._sem_atribuicoes([st], self._mortas_main, self.eliminadas)
+
+    # Remove dos comandos (e dos blocos dentro deles) as atribuições às variáveis mortas e acrescenta
+    # a eliminadas as variáveis das atribuições removidas.
+    def _sem_atribuicoes(self, body, mortas, eliminadas):
+        if not mortas:
+            return body
+        resultado = []
+        for st in body:
+            tipo = type(st)
+            if tipo is Assignment and st.target.id in mortas:
+                valor = st.value
+                if _pura(valor):
+                    self.report_entry("atribuicao", st, "variável nunca lida", st.target.id)
+                    eliminadas.add(st.target.id)
+                    continue
+                if type(valor) is FunctionCall:
+                    self.report_entry("atribuicao", st, "variável nunca lida", st.target.id)
+                    eliminadas.add(st.target.id)
+                    st = valor
+            elif tipo is If:
+                st.body = self._sem_atribuicoes(st.body, mortas, eliminadas)
+                if st.else_body:
+                    st.else_body = self._sem_atribuicoes(st.else_body, mortas, eliminadas)
+            elif tipo is While or tipo is For:
+                st.body = self._sem_atribuicoes(st.body, mortas, eliminadas)
+            resultado.append(st)
+        return resultado
+
+    # TABELAS DE DESPACHO
+    _comandos = {
+        FunctionDef: stmt_function,
+        Assignment: stmt_assignment,
+        Return: stmt_return,
+        FunctionCall: stmt_call,
+        SubscriptAssignment: stmt_subscript_assignment,
+        MethodCall: stmt_method_call,
+        If: stmt_if,
+        While: stmt_while,
+        For: stmt_for,
+    }
+
+    _expressoes = {
+        Name: expr_name,
+        BinOp: expr_binop,
+        UnaryOp: expr_unaryop,
+        FunctionCall: expr_call,
+        List: expr_list,
+        Dict: expr_dict,
+        Subscript: expr_subscript,
+        MethodCall: expr_method,
+    }
+
+
+# Otimiza os comandos de nível superior de um programa (uma lista). Para cada comando, na ordem, gera a
+# lista de comandos que o substitui e o que veio de fora dele e mudou o resultado: as constantes
+# propagadas e as variáveis cujas atribuições foram removidas (usado pelo modo incremental).
+def optimize_statements(statements, report=None):
+    otimizador = Optimizer(statements, report)
+    otimizados = []
+    for st in statements:
+        resultado = otimizador.optimize(st)
+        for novo in resultado:
+            otimizador.collect(novo)
+        otimizados.append((resultado, otimizador.substituidas))
+    otimizador.finish()
+    for resultado, substituidas in otimizados:
+        finais, eliminadas = [], set()
+        for novo in resultado:
+            finais.extend(otimizador.eliminate(novo))
+            eliminadas |= otimizador.eliminadas
+        yield finais, (tuple(sorted(substituidas)), tuple(sorted(eliminadas)))
+
+# Otimiza um programa inteiro (altera e devolve o próprio Program).
+def optimize(program, report=None):
+    program.statements = [novo for finais, _ in optimize_statements(program.statements, report)
+                          for novo in finais]
+    return program
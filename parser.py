@@ -1,3 +1,8 @@
+import os
+import sys
+import copy
+import hashlib
+import threading
 import ply.yacc as yacc     # biblioteca de análise sintática (parser).
 from lexer import tokens    # importados do analisador léxico (lexer.py), são usados nas regras.
 from ast_nodes import *     # define as classes de nós da árvore sintática abstrata (como Program, Assignment, If, etc.).
@@ -7,11 +12,31 @@ precedence = (
     ('left',  'OR'),
     ('left',  'AND'),
     ('right', 'NOT'),
-    ('nonassoc', 'LT','LE','GT','GE','EQEQ','NE'),
+    ('nonassoc', 'LT','LE','GT','GE','EQEQ','NE','IN'),
     ('left',  'PLUS','MINUS'),
     ('left',  'TIMES','DIVIDE'),
+    ('left',  'LBRACKET','DOT'),
 )
 
+# ---------------------------------------------------------------------
+# POSIÇÕES NO CÓDIGO-FONTE
+# ---------------------------------------------------------------------
+    # Cada nó criado recebe a linha e a coluna onde começa.
+    # _pos(node, p) copia para node a posição onde começa o primeiro símbolo da regra: de um token,
+    # pela posição no texto; de um não-terminal que já é um nó, pela posição do próprio nó.
+    # _pos(node, p, i) usa o i-ésimo símbolo da regra no lugar do primeiro.
+def _pos(node, p, i=1):
+    sym = p.slice[i]
+    valor = sym.value
+    if isinstance(valor, Node):
+        node.lineno = valor.lineno
+        node.col_offset = valor.col_offset
+    else:
+        lexpos = sym.lexpos
+        node.lineno = sym.lineno
+        node.col_offset = lexpos - p.lexer.lexdata.rfind('\n', 0, lexpos) - 1
+    return node
+
 # ---------------------------------------------------------------------
 # PROGRAM
 # ---------------------------------------------------------------------
@@ -19,7 +44,7 @@ precedence = (
     # Cria o nó raiz da AST do tipo Program, contendo todos os comandos.
 def p_program(p):
     'program : stmt_list'
-    p[0] = Program(p[1])
+    p[0] = Program(p[1]).set_span(1, 0)
 
 
 # ---------------------------------------------------------------------
@@ -27,12 +52,13 @@ def p_program(p):
 # ---------------------------------------------------------------------
     # Caso tenha múltiplos comandos: acumula os comandos em uma lista.
     # Ignora comandos nulos (como quebras de linha isoladas).
+    # A lista é estendida no lugar (append), e não copiada a cada redução, para que o parse de
+    # listas longas de comandos seja linear e não quadrático.
 def p_stmt_list_multi(p):
     'stmt_list : stmt_list statement'
     if p[2]:
-        p[0] = p[1] + [p[2]]
-    else:
-        p[0] = p[1]
+        p[1].append(p[2])
+    p[0] = p[1]
 
     # Caso tenha apenas um comando.
     # Também ignora comandos nulos.
@@ -60,7 +86,7 @@ def p_statement_comment(p):
     '''statement : COMMENT
                  | COMMENT NEWLINE'''
     from ast_nodes import Comment
-    p[0] = Comment(p[1])
+    p[0] = _pos(Comment(p[1]), p)
 
 
 # ---------------------------------------------------------------------
@@ -68,7 +94,7 @@ def p_statement_comment(p):
 # ---------------------------------------------------------------------
 def p_statement_funccall(p):
     'statement : NAME LPAREN arg_list RPAREN NEWLINE'
-    p[0] = FunctionCall(p[1], p[3])
+    p[0] = _pos(FunctionCall(p[1], p[3]), p)
 
 # Expressão solta como statement (captura qualquer outro expression NEWLINE)
 def p_statement_expr(p):
@@ -81,15 +107,36 @@ def p_statement_expr(p):
     # Cada um desses comandos cria um nó na AST correspondente à sua ação
 def p_stmt_pass(p):
     'statement : PASS NEWLINE'
-    p[0] = Pass()
+    p[0] = _pos(Pass(), p)
 
 def p_stmt_break(p):
     'statement : BREAK NEWLINE'
-    p[0] = Break()
+    p[0] = _pos(Break(), p)
 
 def p_stmt_continue(p):
     'statement : CONTINUE NEWLINE'
-    p[0] = Continue()
+    p[0] = _pos(Continue(), p)
+
+# ---------------------------------------------------------------------
+# TIPOS
+# ---------------------------------------------------------------------
+    # Tipo (como é usado nos ctype da AST) de cada nome de tipo das anotações. O tipo do C que cada um
+    # vira depende do modo de tipos da geração de código (ver codegen.C_TYPE_MODES).
+TIPOS_DAS_ANOTACOES = {'int': 'int', 'float': 'float', 'str': 'str', 'bool': 'int', 'char': 'char'}
+
+def p_type(p):
+    'type : TYPE'
+    p[0] = TIPOS_DAS_ANOTACOES[p[1]]
+
+    # Lista com o tipo dos elementos: list[int] vira o tipo 'list[int]'.
+def p_type_list(p):
+    'type : LIST LBRACKET type RBRACKET'
+    p[0] = f"list[{p[3]}]"
+
+    # Dicionário com os tipos das chaves e dos valores: dict[str, int] vira o tipo 'dict[str, int]'.
+def p_type_dict(p):
+    'type : DICT LBRACKET type COMMA type RBRACKET'
+    p[0] = f"dict[{p[3]}, {p[5]}]"
 
 # ---------------------------------------------------------------------
 # Atribuição
@@ -98,7 +145,22 @@ def p_stmt_continue(p):
     # Exemplo: x = 5 → nó Assignment com Name('x') e Number(5).
 def p_assign(p):
     'statement : NAME ASSIGN expression NEWLINE'
-    p[0] = Assignment(Name(p[1]), p[3])
+    p[0] = _pos(Assignment(_pos(Name(p[1]), p), p[3]), p)
+
+    # Atribuição com anotação de tipo: x: int = 5 declara x com o tipo anotado (e não o do valor).
+def p_assign_annotated(p):
+    'statement : NAME COLON type ASSIGN expression NEWLINE'
+    p[0] = _pos(Assignment(_pos(Name(p[1]), p), p[5], p[3]), p)
+
+    # Só a anotação, sem valor: x: float declara x sem atribuir nada.
+def p_declaration(p):
+    'statement : NAME COLON type NEWLINE'
+    p[0] = _pos(Declaration(_pos(Name(p[1]), p), p[3]), p)
+
+    # Atribuição a um elemento de uma lista (x[i] = v) ou a uma chave de um dicionário (d[k] = v).
+def p_assign_subscript(p):
+    'statement : expression LBRACKET expression RBRACKET ASSIGN expression NEWLINE'
+    p[0] = _pos(SubscriptAssignment(_pos(Subscript(p[1], p[3]), p), p[6]), p)
 
 # ---------------------------------------------------------------------
 # Definição de Função
@@ -107,22 +169,32 @@ def p_assign(p):
     # Cria um nó FunctionDef com o nome da função e seu corpo (bloco).
 # Definindo uma função com parâmetros
 def p_funcdef(p):
-    'statement : DEF NAME LPAREN param_list RPAREN COLON NEWLINE block'
+    'statement : DEF NAME LPAREN param_list RPAREN returns COLON NEWLINE block'
     param_names, param_types = p[4]
-    p[0] = FunctionDef(p[2], param_names, param_types, p[8])
+    p[0] = _pos(FunctionDef(p[2], param_names, param_types, p[9], p[6]), p)
 
 # Definindo uma função sem parâmetros
 def p_funcdef_no_params(p):
-    'statement : DEF NAME LPAREN RPAREN COLON NEWLINE block'
-    p[0] = FunctionDef(p[2], [], [], p[7])
+    'statement : DEF NAME LPAREN RPAREN returns COLON NEWLINE block'
+    p[0] = _pos(FunctionDef(p[2], [], [], p[8], p[5]), p)
+
+# Tipo de retorno anotado (-> float), opcional
+def p_returns(p):
+    '''returns : ARROW type
+               | empty'''
+    p[0] = p[2] if len(p) == 3 else None
 
 # Definindo um único parâmetro com tipo
 def p_param(p):
-    '''param : TYPE NAME
+    '''param : type NAME
+             | NAME COLON type
              | NAME'''
     if len(p) == 3:
-        # veio com anotação explícita
+        # veio com tipo no estilo do C (int x)
         p[0] = (p[2], p[1])
+    elif len(p) == 4:
+        # veio com anotação no estilo do Python (x: int)
+        p[0] = (p[1], p[3])
     else:
         # sem anotação → tipo indefinido (para inferência posterior)
         p[0] = (p[1], None)
@@ -132,9 +204,11 @@ def p_param_list(p):
     '''param_list : param_list COMMA param
                   | param'''
     if len(p) == 4:
-        names, types = p[1]         # listas acumuladas
+        names, types = p[1]         # listas acumuladas (estendidas no lugar)
         name, type_ = p[3]          # novo parâmetro
-        p[0] = (names + [name], types + [type_])
+        names.append(name)
+        types.append(type_)
+        p[0] = p[1]
     else:
         name, type_ = p[1]
         p[0] = ([name], [type_])
@@ -145,7 +219,13 @@ def p_param_list(p):
 # ---------------------------------------------------------------------
 def p_expression_function_call(p):
     'expression : NAME LPAREN arg_list RPAREN'
-    p[0] = FunctionCall(p[1], p[3])
+    p[0] = _pos(FunctionCall(p[1], p[3]), p)
+
+    # Conversão de tipo: int(x), float(input()). Os nomes de tipo são palavras reservadas (TYPE), então
+    # a chamada precisa da sua própria regra; vira uma FunctionCall com o nome do tipo.
+def p_expression_conversion(p):
+    'expression : TYPE LPAREN arg_list RPAREN'
+    p[0] = _pos(FunctionCall(p[1], p[3]), p)
 
 def p_arg_list(p):
     """
@@ -156,7 +236,8 @@ def p_arg_list(p):
     if len(p) == 2:
         p[0] = [] if p[1] is None else [p[1]]
     else:
-        p[0] = p[1] + [p[3]]
+        p[1].append(p[3])
+        p[0] = p[1]
 
 def p_empty(p):
     'empty :'
@@ -167,7 +248,7 @@ def p_empty(p):
 # ---------------------------------------------------------------------
 def p_stmt_return(p):
     'statement : RETURN expression NEWLINE'
-    p[0] = Return(p[2])
+    p[0] = _pos(Return(p[2]), p)
 
 # ---------------------------------------------------------------------
 # Estrutura condicional (if / if-else)
@@ -175,11 +256,11 @@ def p_stmt_return(p):
     # Cria um nó If com a condição (p[2]), o bloco then (p[5]) e opcionalmente o else (p[9]).
 def p_if(p):
     'statement : IF expression COLON NEWLINE block'
-    p[0] = If(p[2], p[5])
+    p[0] = _pos(If(p[2], p[5]), p)
 
 def p_if_else(p):
     'statement : IF expression COLON NEWLINE block ELSE COLON NEWLINE block'
-    p[0] = If(p[2], p[5], p[9])
+    p[0] = _pos(If(p[2], p[5], p[9]), p)
 
 # ---------------------------------------------------------------------
 # While
@@ -188,7 +269,29 @@ def p_if_else(p):
     # Cria um nó While com condição e corpo.
 def p_while(p):
     'statement : WHILE expression COLON NEWLINE block'
-    p[0] = While(p[2], p[5])
+    p[0] = _pos(While(p[2], p[5]), p)
+
+# ---------------------------------------------------------------------
+# For
+# ---------------------------------------------------------------------
+    # Laço sobre um range, com 1, 2 ou 3 argumentos: range(stop), range(start, stop) ou
+    # range(start, stop, step). Cria um nó For com a variável, os argumentos e o corpo.
+def p_for(p):
+    'statement : FOR NAME IN RANGE LPAREN range_args RPAREN COLON NEWLINE block'
+    start, stop, step = p[6]
+    p[0] = _pos(For(_pos(Name(p[2]), p, 2), start, stop, step, p[10]), p)
+
+    # Argumentos do range como (start, stop, step), com None nos omitidos.
+def p_range_args(p):
+    '''range_args : expression
+                  | expression COMMA expression
+                  | expression COMMA expression COMMA expression'''
+    if len(p) == 2:
+        p[0] = (None, p[1], None)
+    elif len(p) == 4:
+        p[0] = (p[1], p[3], None)
+    else:
+        p[0] = (p[1], p[3], p[5])
 
 # ---------------------------------------------------------------------
 # Bloco de Código Indentado
@@ -214,11 +317,55 @@ def p_expression_binop(p):
                   | expression GE expression
                   | expression EQEQ expression
                   | expression NE expression'''
-    p[0] = BinOp(p[1], p[2], p[3])
+    p[0] = _pos(BinOp(p[1], p[2], p[3]), p)
+
+    # Pertencimento a um dicionário: k in d e k not in d.
+def p_expression_in(p):
+    '''expression : expression IN expression
+                  | expression NOT IN expression'''
+    if len(p) == 4:
+        p[0] = _pos(BinOp(p[1], 'in', p[3]), p)
+    else:
+        p[0] = _pos(BinOp(p[1], 'not in', p[4]), p)
 
 # ---------------------------------------------------------------------
 # OUTRAS EXPRESSÕES
 # ---------------------------------------------------------------------
+    # Lista literal: [1, 2, 3] ou [].
+def p_expression_list(p):
+    'expression : LBRACKET arg_list RBRACKET'
+    p[0] = _pos(List(p[2]), p)
+
+    # Dicionário literal: {'a': 1, 'b': 2} ou {}.
+def p_expression_dict(p):
+    'expression : LBRACE dict_items RBRACE'
+    chaves, valores = p[2]
+    p[0] = _pos(Dict(chaves, valores), p)
+
+    # Pares chave: valor, como (chaves, valores).
+def p_dict_items(p):
+    '''dict_items : dict_items COMMA expression COLON expression
+                  | expression COLON expression
+                  | empty'''
+    if len(p) == 6:
+        p[1][0].append(p[3])
+        p[1][1].append(p[5])
+        p[0] = p[1]
+    elif len(p) == 4:
+        p[0] = ([p[1]], [p[3]])
+    else:
+        p[0] = ([], [])
+
+    # Indexação: x[i] ou d[k].
+def p_expression_subscript(p):
+    'expression : expression LBRACKET expression RBRACKET'
+    p[0] = _pos(Subscript(p[1], p[3]), p)
+
+    # Chamada de método: x.append(v).
+def p_expression_method_call(p):
+    'expression : expression DOT NAME LPAREN arg_list RPAREN'
+    p[0] = _pos(MethodCall(p[1], p[3], p[5]), p)
+
     # Agrupamento de expressões com parênteses.
 def p_expression_group(p):
     'expression : LPAREN expression RPAREN'
@@ -227,50 +374,93 @@ def p_expression_group(p):
     # Valor Numérico
 def p_expression_number(p):
     'expression : NUMBER'
-    p[0] = Number(p[1])
+    p[0] = _pos(Number(p[1]), p)
 
     # Variável ou Identificador
 def p_expression_name(p):
     'expression : NAME'
-    p[0] = Name(p[1])
+    p[0] = _pos(Name(p[1]), p)
     
     # String
 def p_expression_string(p):
     'expression : STRING'
     from ast_nodes import String
-    p[0] = String(p[1])
+    p[0] = _pos(String(p[1]), p)
 
     # AND
 def p_expression_and(p):
     'expression : expression AND expression'
     from ast_nodes import BinOp
     # no C, usaremos &&
-    p[0] = BinOp(p[1], '&&', p[3])
+    p[0] = _pos(BinOp(p[1], '&&', p[3]), p)
 
     # OR
 def p_expression_or(p):
     'expression : expression OR expression'
     from ast_nodes import BinOp
     # no C, usaremos ||
-    p[0] = BinOp(p[1], '||', p[3])
+    p[0] = _pos(BinOp(p[1], '||', p[3]), p)
 
     # NOT
 def p_expression_not(p):
     'expression : NOT expression'
     from ast_nodes import UnaryOp
     # no C, usaremos !
-    p[0] = UnaryOp('!', p[2])
+    p[0] = _pos(UnaryOp('!', p[2]), p)
 
 # ---------------------------------------------------------------------
 # Tratamentos de Erros
 # ---------------------------------------------------------------------
-def p_error(p):
+def mensagem_erro(p):
     if p:
-        print(f"Erro sintático: token inesperado {p.value!r}")
-    else:
-        print("Erro sintático: fim de arquivo inesperado")
+        return f"Erro sintático: token inesperado {p.value!r} na linha {p.lineno}"
+    return "Erro sintático: fim de arquivo inesperado"
+
+def p_error(p):
+    print(mensagem_erro(p))
 
 # ---------------------------------------------------------------------
 # Criação do Parser
 # ---------------------------------------------------------------------
-parser = yacc.yacc()
+# As tabelas LALR ficam pré-geradas em tables/parsetab_<assinatura>.pickle e são carregadas só no
+# primeiro uso, sem reconstruir as tabelas nem gravar parser.out/parsetab.py no diretório corrente
+# (o pickle carrega bem mais rápido do que importar um parsetab.py com os mesmos dicionários). A
+# assinatura é um hash da gramática (regras, precedências e tokens): se a gramática mudar, o nome da
+# tabela muda e ela é gerada de novo (ver tables/__main__.py).
+def assinatura_gramatica():
+    g = globals()
+    regras = sorted((v.__code__.co_firstlineno, k, v.__doc__) for k, v in g.items()
+                    if k.startswith('p_') and callable(v))
+    dados = repr((tokens, precedence, [(k, doc) for _, k, doc in regras]))
+    return hashlib.sha1(dados.encode('utf-8')).hexdigest()[:12]
+
+PARSETAB = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tables",
+                        f"parsetab_{assinatura_gramatica()}.pickle")
+
+_parser = None
+_parser_lock = threading.Lock()
+
+def get_parser():
+    global _parser
+    if _parser is None:
+        with _parser_lock:
+            if _parser is None:
+                # optimize: a assinatura no nome da tabela já garante que ela corresponde à gramática
+                _parser = yacc.yacc(module=sys.modules[__name__], picklefile=PARSETAB,
+                                    optimize=True, debug=False)
+    return _parser
+
+# Parser padrão do módulo, mantido para quem faz "from parser import parser".
+def __getattr__(nome):
+    if nome == 'parser':
+        return get_parser()
+    raise AttributeError(f"module {__name__!r} has no attribute {nome!r}")
+
+# Cria um parser independente que compartilha as tabelas LALR (somente leitura) com o parser
+# do módulo, mas tem sua própria pilha de estados. Em vez de imprimir, os erros sintáticos
+# são acumulados em novo.errors, para quem chamou decidir o que fazer com eles.
+def build_parser():
+    novo = copy.copy(get_parser())
+    novo.errors = []
+    novo.errorfunc = lambda p: novo.errors.append(mensagem_erro(p))
+    return novo
@@ -0,0 +1,130 @@
+# ---------------------------------------------------------------------------------------------------
+# PERFIL DA TRANSPILAÇÃO
+# ---------------------------------------------------------------------------------------------------
+# Mede onde vão o tempo e a memória de uma transpilação, etapa por etapa (ver Transpiler.profile):
+    # leitura: leitura do arquivo de entrada (só em Transpiler.profile_file);
+    # lex: análise léxica do fonte inteiro (os tokens são guardados e entregues depois ao parser);
+    # parse: construção da AST a partir dos tokens;
+    # otimizacao: a passada do otimizador (optimizer.py), se ligado;
+    # tipos: anotação de tipos e resolução das especializações (CGenerator.resolve_program);
+    # codegen: geração do C (CGenerator.emit_program), sem o tempo gasto nas escritas;
+    # escrita: as chamadas de write no destino (arquivo de saída ou string).
+# Além dos tempos, o relatório traz o número de linhas, de tokens e de nós da AST e, opcionalmente,
+# as funções com mais tempo próprio segundo o cProfile. É um dicionário pronto para json.dump.
+# Memória: pico de memória alocada pelo Python durante a etapa, acima do que já estava em uso no
+# início dela (tracemalloc). A escrita acontece no meio da geração, então o seu pico entra no da
+# etapa codegen. O tracemalloc e o cProfile deixam o Python bem mais lento: os tempos medidos com
+# eles servem para comparar as etapas entre si, não com uma transpilação normal.
+# ---------------------------------------------------------------------------------------------------
+
+import os
+import time
+import cProfile
+import pstats
+import tracemalloc
+from contextlib import contextmanager
+
+from ast_nodes import iter_child_nodes
+
+
+# Número de nós da árvore com raiz em node (sem recursão, para ASTs profundas).
+def count_nodes(node):
+    n = 0
+    pilha = [node]
+    while pilha:
+        n += 1
+        pilha.extend(iter_child_nodes(pilha.pop()))
+    return n
+
+
+# Sink (ver CGenerator) que repassa as escritas para outro e mede o tempo gasto nelas.
+class TimedSink:
+    def __init__(self, sink):
+        self.sink = sink
+        self.segundos = 0.0
+        self.chamadas = 0
+        self.caracteres = 0
+
+    def write(self, texto):
+        inicio = time.perf_counter()
+        self.sink.write(texto)
+        self.segundos += time.perf_counter() - inicio
+        self.chamadas += 1
+        self.caracteres += len(texto)
+
+
+class Profiler:
+    # memoria: mede o pico de memória de cada etapa com o tracemalloc.
+    # top: número de funções do cProfile no relatório (0 para não usar o cProfile).
+    def __init__(self, memoria=True, top=0):
+        self.memoria = memoria
+        self.top = top
+        # nome da etapa -> {"segundos": ..., "pico_memoria": bytes ou None, ...}, na ordem de execução
+        self.etapas = {}
+        # Contagens sobre a entrada (linhas, tokens, nós da AST, ...)
+        self.contagens = {}
+        self.total = None
+        self._cprofile = None
+        self._iniciou_tracemalloc = False
+        self._inicio = None
+
+    def __enter__(self):
+        # Se o tracemalloc já estava ligado (por quem chamou), continua ligado no fim
+        if self.memoria and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self._iniciou_tracemalloc = True
+        if self.top:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+        self._inicio = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.total = time.perf_counter() - self._inicio
+        if self._cprofile is not None:
+            self._cprofile.disable()
+        if self._iniciou_tracemalloc:
+            tracemalloc.stop()
+            self._iniciou_tracemalloc = False
+        return False
+
+    @contextmanager
+    def stage(self, nome):
+        if self.memoria:
+            em_uso = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        inicio = time.perf_counter()
+        try:
+            yield
+        finally:
+            etapa = {"segundos": time.perf_counter() - inicio, "pico_memoria": None}
+            if self.memoria:
+                etapa["pico_memoria"] = tracemalloc.get_traced_memory()[1] - em_uso
+            self.etapas[nome] = etapa
+
+    # Registra as escritas feitas em sink (um TimedSink) durante a etapa dentro_de como uma etapa
+    # própria, descontando o seu tempo do da etapa de dentro.
+    def record_writes(self, nome, sink, dentro_de):
+        self.etapas[dentro_de]["segundos"] -= sink.segundos
+        self.etapas[nome] = {"segundos": sink.segundos, "pico_memoria": None,
+                             "chamadas": sink.chamadas, "caracteres": sink.caracteres}
+
+    # Funções com mais tempo próprio (sem contar as funções chamadas por elas).
+    def _funcoes_mais_caras(self):
+        stats = pstats.Stats(self._cprofile).stats
+        mais_caras = sorted(stats.items(), key=lambda item: item[1][2], reverse=True)[:self.top]
+        return [
+            {"funcao": f"{os.path.basename(arquivo)}:{linha}({nome})", "chamadas": chamadas,
+             "tempo_proprio": proprio, "tempo_acumulado": acumulado}
+            for (arquivo, linha, nome), (_, chamadas, proprio, acumulado, _) in mais_caras
+        ]
+
+    # Relatório da medição (depois do fim do bloco with); extra: campos a mais no início do relatório.
+    def report(self, **extra):
+        relatorio = dict(extra)
+        relatorio.update(self.contagens)
+        relatorio["etapas"] = self.etapas
+        relatorio["total_segundos"] = self.total
+        if self._cprofile is not None:
+            relatorio["funcoes_mais_caras"] = self._funcoes_mais_caras()
+        return relatorio
@@ -0,0 +1,769 @@
+# ---------------------------------------------------------------------------------------------------
+# RUNTIME DO C GERADO
+# ---------------------------------------------------------------------------------------------------
+# Trechos de C que o gerador (codegen.py) escreve no início do programa, depois dos #include, quando o
+# programa precisa deles, nesta ordem: saída bufferizada, strings, entrada, objetos, listas,
+# dicionários (cada um pode usar os de antes). São funções static inline: as que o programa não chama não geram código nem avisos do
+# compilador.
+# ---------------------------------------------------------------------------------------------------
+
+from string import Template
+
+# SAÍDA BUFFERIZADA (CGenerator(fast_io=True), --fast-io)
+    # Em vez de um printf por print (com a string de formato interpretada a cada chamada e a saída
+    # passando pelo buffer do stdio), cada valor é escrito direto em um buffer de 64 KiB por uma função
+    # escolhida na transpilação a partir do tipo do valor:
+        # _escreve_literal: strings literais (e os separadores " " e "\n"), com o tamanho calculado pelo
+        #   compilador (sizeof), sem strlen;
+        # _escreve_str (no runtime das strings), _escreve_char: strings e caracteres;
+        # _escreve_int: inteiros, convertidos dígito a dígito;
+        # _escreve_float: floats, no formato do %f (6 casas). O arredondamento da última casa é feito com
+        #   inteiros; só os valores muito grandes, inf, nan e os que ficam a menos de 1e-9 de um empate
+        #   no arredondamento vão para o snprintf, o que garante o mesmo texto do printf.
+    # O buffer é esvaziado (_saida_flush) quando enche, antes de ler a entrada padrão (para que o prompt
+    # e a saída anterior apareçam antes da leitura) e no fim do main.
+SAIDA_BUFFERIZADA = r"""
+#define _SAIDA_TAMANHO (1 << 16)
+static char _saida[_SAIDA_TAMANHO];
+static size_t _saida_pos = 0;
+
+static inline void _saida_flush(void) {
+    fwrite(_saida, 1, _saida_pos, stdout);
+    fflush(stdout);
+    _saida_pos = 0;
+}
+
+static inline char* _saida_reserva(size_t n) {
+    if (_saida_pos + n > _SAIDA_TAMANHO) _saida_flush();
+    return _saida + _saida_pos;
+}
+
+static inline void _escreve(const char* s, size_t n) {
+    if (n > _SAIDA_TAMANHO) {
+        _saida_flush();
+        fwrite(s, 1, n, stdout);
+        return;
+    }
+    memcpy(_saida_reserva(n), s, n);
+    _saida_pos += n;
+}
+
+#define _escreve_literal(s) _escreve(s, sizeof(s) - 1)
+
+static inline void _escreve_char(char c) {
+    *_saida_reserva(1) = c;
+    _saida_pos++;
+}
+
+static inline void _escreve_int(long long v) {
+    char digitos[20];
+    int n = 0;
+    char* p = _saida_reserva(21);
+    unsigned long long u = v < 0 ? 0ULL - (unsigned long long)v : (unsigned long long)v;
+    if (v < 0) *p++ = '-';
+    do {
+        digitos[n++] = (char)('0' + u % 10);
+        u /= 10;
+    } while (u);
+    while (n) *p++ = digitos[--n];
+    _saida_pos = (size_t)(p - _saida);
+}
+
+static inline void _escreve_float(double v) {
+    double a = signbit(v) ? -v : v;
+    long long inteira, fracao;
+    double escalada, resto;
+    char* p;
+    int i;
+    if (!(a < 1e15)) goto lento;
+    inteira = (long long)a;
+    escalada = (a - (double)inteira) * 1e6;
+    fracao = (long long)escalada;
+    resto = escalada - (double)fracao;
+    if (resto > 0.5 - 1e-9 && resto < 0.5 + 1e-9) goto lento;
+    if (resto > 0.5 && ++fracao == 1000000) {
+        fracao = 0;
+        inteira++;
+    }
+    if (signbit(v)) _escreve_char('-');
+    _escreve_int(inteira);
+    p = _saida_reserva(7);
+    *p = '.';
+    for (i = 6; i > 0; i--) {
+        p[i] = (char)('0' + fracao % 10);
+        fracao /= 10;
+    }
+    _saida_pos += 7;
+    return;
+lento:
+    p = _saida_reserva(512);
+    _saida_pos += (size_t)snprintf(p, 512, "%f", v);
+}
+"""
+
+# Cabeçalhos de que o runtime da saída precisa, além de stdio.h e string.h.
+CABECALHOS_SAIDA = ("#include <math.h>",)
+
+# STRINGS
+    # Uma string do Python vira um _str, passado por valor: o ponteiro para os bytes (UTF-8), o tamanho
+    # em bytes (n) e o número de caracteres (len, o len() do Python), então nenhuma operação precisa de
+    # strlen. Os literais são _STR("texto", caracteres), com o tamanho em bytes calculado pelo compilador
+    # e os caracteres, pelo transpilador. Os bytes são imutáveis e sempre têm um byte legível depois do
+    # fim (p[n]), que normalmente é um \0.
+    # As strings criadas pelo programa (concatenações, linhas lidas, str()) ficam em uma arena: blocos
+    # de 64 KiB alocados com malloc, em que cada string só avança o topo do bloco; nada é liberado
+    # antes do fim do main, que libera todos os blocos de uma vez (_arena_libera). Strings grandes têm
+    # um bloco só para elas.
+    # Concatenação (_str_concat): se a string da esquerda é a última alocada no seu bloco e ainda há
+    # espaço depois dela, a da direita é copiada ali mesmo, sem copiar a da esquerda (a string antiga
+    # continua válida: os seus bytes não mudam). Quando não dá, uma concatenação de 256 bytes ou mais
+    # vai para um bloco de crescimento novo, com o dobro do tamanho necessário; os quatro últimos blocos
+    # de crescimento continuam aceitando extensões no lugar, mesmo com outras alocações entre uma
+    # concatenação e outra. Assim, s = s + x em um laço custa tempo linear no tamanho final, e não
+    # quadrático.
+        # _str_igual, _str_compara: ==, != e <, <=, >, >= (ordem dos bytes, que em UTF-8 é a ordem dos
+        #   caracteres, como no Python);
+        # _str_de_int, _str_de_float: str(x), com o texto do Python (str(2.5) é "2.5", o menor número de
+        #   dígitos que volta ao mesmo float); _str_de_float_simples é o str de um float do C (modos native
+        #   e narrow), com o menor número de dígitos que volta ao mesmo float de precisão simples: o
+        #   double que ele vira tem ruído depois da 8ª casa (1.1 seria 1.100000023841858);
+        # _str_cstr: a string como char* terminado em \0 (copiada só se não terminar em \0);
+        # _escreve_str: escreve a string na saída (no buffer da saída bufferizada, se estiver no
+        #   programa).
+    # Os erros (_erro) escrevem "Tipo: mensagem" na saída de erros e terminam com código 1, como uma
+    # exceção não tratada do Python.
+STRINGS = r"""
+typedef struct {
+    const char* p;
+    size_t n;
+    size_t len;
+} _str;
+
+#define _STR(s, len) ((_str){s, sizeof(s) - 1, len})
+
+static inline void _erro(const char* tipo, const char* mensagem, const char* texto) {
+#ifdef _SAIDA_TAMANHO
+    _saida_flush();
+#endif
+    fflush(stdout);
+    if (mensagem == NULL) fprintf(stderr, "%s\n", tipo);
+    else if (texto == NULL) fprintf(stderr, "%s: %s\n", tipo, mensagem);
+    else fprintf(stderr, "%s: %s'%s'\n", tipo, mensagem, texto);
+    exit(1);
+}
+
+#define _ARENA_BLOCO (1 << 16)
+#define _STR_CRESCE 256
+#define _CRESCIMENTO 4
+
+typedef struct _bloco {
+    struct _bloco* proximo;
+    size_t usado, tamanho;
+    char dados[];
+} _bloco;
+
+static _bloco* _arena_blocos = NULL;
+static _bloco* _arena = NULL;
+static _bloco* _crescimento[_CRESCIMENTO];
+static unsigned _crescimento_prox = 0;
+
+static inline _bloco* _bloco_novo(size_t tamanho, size_t usado) {
+    _bloco* b = malloc(sizeof(_bloco) + tamanho);
+    if (b == NULL) _erro("MemoryError", NULL, NULL);
+    b->proximo = _arena_blocos;
+    b->usado = usado;
+    b->tamanho = tamanho;
+    _arena_blocos = b;
+    return b;
+}
+
+static inline char* _arena_aloca(size_t n) {
+    char* p;
+    if (n > _ARENA_BLOCO / 4) return _bloco_novo(n, n)->dados;
+    if (_arena == NULL || _arena->tamanho - _arena->usado < n) _arena = _bloco_novo(_ARENA_BLOCO, 0);
+    p = _arena->dados + _arena->usado;
+    _arena->usado += n;
+    return p;
+}
+
+static inline void _arena_libera(void) {
+    while (_arena_blocos != NULL) {
+        _bloco* proximo = _arena_blocos->proximo;
+        free(_arena_blocos);
+        _arena_blocos = proximo;
+    }
+    _arena = NULL;
+    memset(_crescimento, 0, sizeof(_crescimento));
+}
+
+static inline size_t _utf8_len(const char* p, size_t n) {
+    size_t len = 0, i;
+    for (i = 0; i < n; i++) len += ((unsigned char)p[i] & 0xC0) != 0x80;
+    return len;
+}
+
+static inline _str _str_de(const char* p, size_t n) {
+    char* copia = _arena_aloca(n + 1);
+    memcpy(copia, p, n);
+    copia[n] = '\0';
+    return (_str){copia, n, _utf8_len(copia, n)};
+}
+
+static inline const char* _str_cstr(_str s) {
+    char* copia;
+    if (s.p[s.n] == '\0') return s.p;
+    copia = _arena_aloca(s.n + 1);
+    memcpy(copia, s.p, s.n);
+    copia[s.n] = '\0';
+    return copia;
+}
+
+static inline int _str_estende(_bloco* b, _str s, size_t n) {
+    if (b == NULL || s.p + s.n + 1 != b->dados + b->usado || b->tamanho - b->usado < n) return 0;
+    b->usado += n;
+    return 1;
+}
+
+static inline _str _str_concat(_str a, _str b) {
+    size_t n = a.n + b.n;
+    char* p = NULL;
+    unsigned i;
+    if (b.n == 0) return a;
+    if (a.n == 0) return b;
+    if (_str_estende(_arena, a, b.n)) p = (char*)a.p;
+    for (i = 0; p == NULL && i < _CRESCIMENTO; i++)
+        if (_str_estende(_crescimento[i], a, b.n)) p = (char*)a.p;
+    if (p == NULL) {
+        if (n < _STR_CRESCE) {
+            p = _arena_aloca(n + 1);
+        } else {
+            _bloco* g = _bloco_novo(2 * (n + 1), n + 1);
+            _crescimento[_crescimento_prox++ % _CRESCIMENTO] = g;
+            p = g->dados;
+        }
+        memcpy(p, a.p, a.n);
+    }
+    memcpy(p + a.n, b.p, b.n);
+    p[n] = '\0';
+    return (_str){p, n, a.len + b.len};
+}
+
+static inline int _str_igual(_str a, _str b) {
+    return a.n == b.n && (a.p == b.p || memcmp(a.p, b.p, a.n) == 0);
+}
+
+static inline int _str_compara(_str a, _str b) {
+    int c = memcmp(a.p, b.p, a.n < b.n ? a.n : b.n);
+    if (c != 0) return c;
+    return (a.n > b.n) - (a.n < b.n);
+}
+
+static inline _str _str_de_int(long long v) {
+    char texto[24];
+    return _str_de(texto, (size_t)snprintf(texto, sizeof(texto), "%lld", v));
+}
+
+static inline _str _str_de_real(double v, int simples) {
+    char texto[48];
+    int digitos, expoente, decimais;
+    if (v != v) return _STR("nan", 3);
+    if (v == 1.0 / 0.0) return _STR("inf", 3);
+    if (v == -1.0 / 0.0) return _STR("-inf", 4);
+    for (digitos = 1; digitos < (simples ? 9 : 17); digitos++) {
+        snprintf(texto, sizeof(texto), "%.*e", digitos - 1, v);
+        if (simples ? strtof(texto, NULL) == (float)v : strtod(texto, NULL) == v) break;
+    }
+    snprintf(texto, sizeof(texto), "%.*e", digitos - 1, v);
+    expoente = atoi(strchr(texto, 'e') + 1);
+    if (expoente >= -4 && expoente < 16) {
+        decimais = digitos - 1 - expoente;
+        snprintf(texto, sizeof(texto), "%.*f", decimais > 0 ? decimais : 0, v);
+        if (strchr(texto, '.') == NULL) strcat(texto, ".0");
+    }
+    return _str_de(texto, strlen(texto));
+}
+
+static inline _str _str_de_float(double v) {
+    return _str_de_real(v, 0);
+}
+
+static inline _str _str_de_float_simples(float v) {
+    return _str_de_real(v, 1);
+}
+
+static inline void _escreve_str(_str s) {
+#ifdef _SAIDA_TAMANHO
+    _escreve(s.p, s.n);
+#else
+    fwrite(s.p, 1, s.n, stdout);
+#endif
+}
+"""
+
+# Cabeçalhos de que o runtime das strings precisa, além de stdio.h e string.h.
+CABECALHOS_STRINGS = ("#include <stdlib.h>",)
+
+# ENTRADA BUFFERIZADA (input(), int(input()), float(input()))
+    # A entrada padrão é lida em blocos de 64 KiB (read) em um buffer que cresce se uma linha não
+    # couber nele, e as linhas são separadas com memchr. Como no Python, input() devolve a linha
+    # inteira, de qualquer tamanho, sem o fim de linha ("\n" ou "\r\n"), e no fim da entrada termina o
+    # programa com EOFError.
+        # _le_linha: input(); devolve uma cópia da linha (um _str na arena);
+        # _le_int, _le_float: int(input()) e float(input()); convertem a linha direto no buffer, sem
+        #   copiá-la;
+        # _str_para_int, _str_para_float: int(s) e float(s) de uma string. Aceitam o que o int() e o
+        #   float() do Python aceitam (espaços em volta, sinal, _ entre os dígitos do int, expoente, inf,
+        #   nan) e, senão, terminam o programa com ValueError e a mesma mensagem do Python.
+    # Antes de esperar por mais entrada, a saída é esvaziada (a do runtime da saída bufferizada, se
+    # estiver no programa, ou a do stdio), para que o prompt apareça antes da leitura.
+    # Usa o runtime das strings, que sempre vem junto.
+ENTRADA_BUFFERIZADA = r"""
+#define _ENTRADA_TAMANHO (1 << 16)
+static char* _entrada = NULL;
+static size_t _entrada_cap = 0, _entrada_ini = 0, _entrada_fim = 0;
+
+static inline size_t _entrada_enche(void) {
+    ssize_t n;
+#ifdef _SAIDA_TAMANHO
+    _saida_flush();
+#else
+    fflush(stdout);
+#endif
+    if (_entrada_ini > 0) {
+        memmove(_entrada, _entrada + _entrada_ini, _entrada_fim - _entrada_ini);
+        _entrada_fim -= _entrada_ini;
+        _entrada_ini = 0;
+    }
+    if (_entrada_cap - _entrada_fim <= _ENTRADA_TAMANHO / 2) {
+        _entrada_cap = _entrada_cap ? 2 * _entrada_cap : _ENTRADA_TAMANHO;
+        _entrada = realloc(_entrada, _entrada_cap);
+        if (_entrada == NULL) _erro("MemoryError", NULL, NULL);
+    }
+    do n = read(0, _entrada + _entrada_fim, _entrada_cap - _entrada_fim - 1);
+    while (n < 0 && errno == EINTR);
+    if (n <= 0) return 0;
+    _entrada_fim += (size_t)n;
+    return (size_t)n;
+}
+
+static inline char* _le_linha_buffer(size_t* tamanho) {
+    size_t visto = 0, disponivel;
+    char* linha;
+    char* fim;
+    for (;;) {
+        disponivel = _entrada_fim - _entrada_ini;
+        if (disponivel > visto) {
+            fim = memchr(_entrada + _entrada_ini + visto, '\n', disponivel - visto);
+            if (fim != NULL) break;
+            visto = disponivel;
+        }
+        if (_entrada_enche() == 0) {
+            if (visto == 0) _erro("EOFError", "EOF when reading a line", NULL);
+            fim = _entrada + _entrada_ini + visto;
+            break;
+        }
+    }
+    linha = _entrada + _entrada_ini;
+    _entrada_ini += (size_t)(fim - linha) + (fim < _entrada + _entrada_fim);
+    if (fim > linha && fim[-1] == '\r') fim--;
+    *fim = '\0';
+    *tamanho = (size_t)(fim - linha);
+    return linha;
+}
+
+static inline int _espaco(char c) {
+    return c == ' ' || (c >= '\t' && c <= '\r');
+}
+
+static inline long long _texto_para_int(const char* s) {
+    const char* p = s;
+    unsigned long long v = 0;
+    int negativo = 0, digitos = 0;
+    while (_espaco(*p)) p++;
+    if (*p == '+' || *p == '-') negativo = *p++ == '-';
+    for (;; p++) {
+        if (*p >= '0' && *p <= '9') {
+            v = v * 10 + (unsigned)(*p - '0');
+            digitos++;
+        } else if (!(*p == '_' && digitos && p[1] >= '0' && p[1] <= '9')) {
+            break;
+        }
+    }
+    while (_espaco(*p)) p++;
+    if (!digitos || *p) _erro("ValueError", "invalid literal for int() with base 10: ", s);
+    return negativo ? (long long)(0ULL - v) : (long long)v;
+}
+
+static inline double _texto_para_float(const char* s) {
+    const char* p = s;
+    char* fim;
+    double v;
+    while (_espaco(*p)) p++;
+    v = strtod(p, &fim);
+    if (fim == p || memchr(p, 'x', (size_t)(fim - p)) || memchr(p, 'X', (size_t)(fim - p))) fim = (char*)p;
+    else while (_espaco(*fim)) fim++;
+    if (fim == p || *fim) _erro("ValueError", "could not convert string to float: ", s);
+    return v;
+}
+
+static inline long long _str_para_int(_str s) {
+    return _texto_para_int(_str_cstr(s));
+}
+
+static inline double _str_para_float(_str s) {
+    return _texto_para_float(_str_cstr(s));
+}
+
+static inline _str _le_linha(void) {
+    size_t n;
+    char* linha = _le_linha_buffer(&n);
+    return _str_de(linha, n);
+}
+
+static inline long long _le_int(void) {
+    size_t n;
+    return _texto_para_int(_le_linha_buffer(&n));
+}
+
+static inline double _le_float(void) {
+    size_t n;
+    return _texto_para_float(_le_linha_buffer(&n));
+}
+"""
+
+# Cabeçalhos de que o runtime da entrada precisa, além de stdio.h e string.h.
+CABECALHOS_ENTRADA = ("#include <stdlib.h>", "#include <errno.h>", "#include <unistd.h>")
+
+# OBJETOS
+    # Listas e dicionários são alocados com malloc e não são liberados antes do fim do main: cada um
+    # começa com um _objeto, que o põe na lista encadeada _objetos ao ser criado (_objeto_aloca), e
+    # _objetos_libera libera todos, cada um com a função libera do seu tipo (que libera os vetores
+    # que ele aponta). _memoria é um realloc que termina o programa com MemoryError se faltar memória.
+    # Usa o runtime das strings (_erro), que sempre vem junto.
+OBJETOS = r"""
+typedef struct _objeto {
+    struct _objeto* proximo;
+    void (*libera)(struct _objeto*);
+} _objeto;
+
+static _objeto* _objetos = NULL;
+
+static inline void* _memoria(void* p, size_t n) {
+    p = realloc(p, n);
+    if (p == NULL && n != 0) _erro("MemoryError", NULL, NULL);
+    return p;
+}
+
+static inline void* _objeto_aloca(size_t tamanho, void (*libera)(_objeto*)) {
+    _objeto* o = _memoria(NULL, tamanho);
+    o->proximo = _objetos;
+    o->libera = libera;
+    _objetos = o;
+    return o;
+}
+
+static inline void _objetos_libera(void) {
+    while (_objetos != NULL) {
+        _objeto* proximo = _objetos->proximo;
+        _objetos->libera(_objetos);
+        free(_objetos);
+        _objetos = proximo;
+    }
+}
+"""
+
+# Cabeçalhos de que o runtime dos objetos precisa, além de stdio.h e string.h.
+CABECALHOS_OBJETOS = ("#include <stdlib.h>",)
+
+# LISTAS
+    # Uma lista do Python vira um ponteiro para uma estrutura com os elementos em um vetor contíguo do
+    # tipo C dos elementos (dados), o tamanho (len) e a capacidade do vetor (cap). Como no Python, a
+    # lista é compartilhada por todos os nomes que apontam para ela: x = y e f(x) não copiam nada, e
+    # um append feito em uma função aparece para quem a chamou.
+    # Cada tipo de elemento tem a sua estrutura e as suas funções, escritas a partir do modelo LISTA
+    # ($nome: o sufixo do tipo nos nomes, como em _lista_int; $tipo: o tipo C dos elementos):
+        # _lista_<nome>_nova: lista vazia com capacidade para n elementos;
+        # _lista_<nome>_de: lista literal, a partir de um vetor C ([1, 2] vira
+        #   _lista_int_de(2, (int[]){1, 2}));
+        # _lista_<nome>_cheia, _lista_<nome>_repete: [v] * n e lista * n;
+        # _lista_<nome>_append: append; quando o vetor está cheio, a capacidade dobra (realloc), então
+        #   n appends custam tempo O(n) no total;
+        # _lista_<nome>_le, _lista_<nome>_guarda: x[i] e x[i] = v, com índices negativos contados do
+        #   fim, como no Python, e IndexError fora da lista. Sem a conferência
+        #   (CGenerator(bounds_check=False), --no-bounds-check), x[i] vira x->dados[i] e x[i] = v,
+        #   _lista_<nome>_poe, sem índices negativos. A atribuição é uma função, e não *endereço = v,
+        #   para que o valor seja calculado antes de achar o elemento: se o cálculo fizer um append na
+        #   mesma lista, o vetor pode mudar de lugar.
+    # As listas são objetos (ver OBJETOS), liberados no fim do main.
+LISTAS = r"""
+static inline size_t _lista_indice(long long i, size_t len) {
+    if (i < 0) i += (long long)len;
+    if (i < 0 || (size_t)i >= len) _erro("IndexError", "list index out of range", NULL);
+    return (size_t)i;
+}
+
+static inline size_t _lista_vezes(long long n) {
+    return n > 0 ? (size_t)n : 0;
+}
+"""
+
+LISTA = Template(r"""
+typedef struct {
+    _objeto objeto;
+    $tipo* dados;
+    size_t len, cap;
+} _lista_$nome;
+
+static inline void _lista_${nome}_libera(_objeto* o) {
+    free(((_lista_$nome*)o)->dados);
+}
+
+static inline _lista_$nome* _lista_${nome}_nova(size_t cap) {
+    _lista_$nome* l = _objeto_aloca(sizeof(_lista_$nome), _lista_${nome}_libera);
+    l->dados = _memoria(NULL, cap * sizeof($tipo));
+    l->len = 0;
+    l->cap = cap;
+    return l;
+}
+
+static inline _lista_$nome* _lista_${nome}_de(size_t n, const $tipo* valores) {
+    _lista_$nome* l = _lista_${nome}_nova(n);
+    memcpy(l->dados, valores, n * sizeof($tipo));
+    l->len = n;
+    return l;
+}
+
+static inline _lista_$nome* _lista_${nome}_cheia(long long vezes, $tipo valor) {
+    size_t n = _lista_vezes(vezes), i;
+    _lista_$nome* l = _lista_${nome}_nova(n);
+    for (i = 0; i < n; i++) l->dados[i] = valor;
+    l->len = n;
+    return l;
+}
+
+static inline _lista_$nome* _lista_${nome}_repete(const _lista_$nome* a, long long vezes) {
+    size_t n = _lista_vezes(vezes), i;
+    _lista_$nome* l = _lista_${nome}_nova(n * a->len);
+    if (a->len != 0)
+        for (i = 0; i < n; i++) memcpy(l->dados + i * a->len, a->dados, a->len * sizeof($tipo));
+    l->len = n * a->len;
+    return l;
+}
+
+static inline void _lista_${nome}_append(_lista_$nome* l, $tipo valor) {
+    if (l->len == l->cap) {
+        l->cap = l->cap ? 2 * l->cap : 8;
+        l->dados = _memoria(l->dados, l->cap * sizeof($tipo));
+    }
+    l->dados[l->len++] = valor;
+}
+
+static inline $tipo _lista_${nome}_le(const _lista_$nome* l, long long i) {
+    return l->dados[_lista_indice(i, l->len)];
+}
+
+static inline void _lista_${nome}_guarda(_lista_$nome* l, long long i, $tipo valor) {
+    l->dados[_lista_indice(i, l->len)] = valor;
+}
+
+static inline void _lista_${nome}_poe(_lista_$nome* l, size_t i, $tipo valor) {
+    l->dados[i] = valor;
+}
+""")
+
+
+# DICIONÁRIOS
+    # Um dicionário do Python vira um ponteiro para uma tabela hash com endereçamento aberto, no formato
+    # compacto do dicionário do CPython:
+        # entradas: vetor com as entradas (hash, chave, valor) na ordem de inserção, sempre preenchido do
+        #   início, então uma inserção só escreve no fim do vetor;
+        # indices: a tabela hash propriamente dita, com capacidade (cap) que é sempre uma potência de 2.
+        #   Cada posição vale 0 (vazia) ou tem os 32 bits altos do hash da chave e, nos 32 baixos, a
+        #   posição da entrada + 1. A posição inicial de uma chave são os bits baixos do seu hash, e as
+        #   colisões ocupam a próxima posição livre (sondagem linear), então uma busca lê posições
+        #   vizinhas de um vetor de 8 bytes por posição e só lê uma entrada (e compara chaves) quando os
+        #   32 bits do hash são iguais.
+    # Quando uma chave nova deixaria a tabela mais de 3/4 cheia, a capacidade dobra (_dict_<nome>_cresce):
+    # só indices é refeito, a partir dos hashes guardados nas entradas, sem mover nenhuma entrada nem
+    # calcular nenhum hash de novo; n inserções custam tempo O(n) no total. Não há remoção de chaves (del).
+    # A última busca de cada dicionário fica guardada (hash, chave e posição em indices): em
+    # if k in d: d[k] = d[k] + 1, só a primeira operação percorre a tabela. A posição continua valendo
+    # até a tabela crescer, já que a única inserção que pode acontecer antes disso é a da própria chave.
+    # Como as listas, um dicionário é compartilhado por todos os nomes que apontam para ele e é um
+    # objeto (ver OBJETOS), liberado no fim do main.
+    # As chaves são int ou str:
+        # _hash_int: os bits do inteiro misturados pelo finalizador do splitmix64 (inteiros próximos ficam
+        #   em posições distantes);
+        # _hash_str: FNV-1a sobre os bytes da string, misturado da mesma forma. As chaves str apontam para
+        #   os bytes da string, que nunca mudam nem são liberados antes do fim do main (ver STRINGS).
+        # O hash nunca é 0, o valor que marca a última busca como inválida.
+    # Cada par de tipos (chave, valor) tem a sua estrutura e as suas funções, escritas a partir do modelo
+    # DICIONARIO ($nome: o sufixo dos tipos nos nomes, como em _dict_str_int; $chave, $valor: os tipos
+    # C das chaves e dos valores; $k: o tipo das chaves, int ou str, que escolhe _hash_$k,
+    # _chave_igual_$k e _erro_chave_$k):
+        # _dict_<nome>_novo: dicionário vazio com capacidade para n chaves;
+        # _dict_<nome>_de: dicionário literal, a partir de vetores C com as chaves e os valores
+        #   ({'a': 1} vira _dict_str_int_de(1, (_str[]){_STR("a", 1)}, (int[]){1}));
+        # _dict_<nome>_le: d[k], com KeyError se a chave não estiver no dicionário;
+        # _dict_<nome>_guarda: d[k] = v (uma função, como em _lista_<nome>_guarda: o valor é calculado
+        #   antes de achar a entrada, e a tabela pode crescer se o cálculo inserir outra chave);
+        # _dict_<nome>_contem: k in d.
+DICIONARIOS = r"""
+static inline uint64_t _hash_mistura(uint64_t x) {
+    x ^= x >> 30;
+    x *= 0xbf58476d1ce4e5b9ULL;
+    x ^= x >> 27;
+    x *= 0x94d049bb133111ebULL;
+    x ^= x >> 31;
+    return x ? x : 1;
+}
+
+static inline uint64_t _hash_int(long long k) {
+    return _hash_mistura((uint64_t)k);
+}
+
+static inline uint64_t _hash_str(_str k) {
+    uint64_t h = 0xcbf29ce484222325ULL;
+    size_t i;
+    for (i = 0; i < k.n; i++) h = (h ^ (unsigned char)k.p[i]) * 0x100000001b3ULL;
+    return _hash_mistura(h);
+}
+
+static inline int _chave_igual_int(long long a, long long b) {
+    return a == b;
+}
+
+static inline int _chave_igual_str(_str a, _str b) {
+    return _str_igual(a, b);
+}
+
+static inline void _erro_chave_int(long long k) {
+    char texto[24];
+    snprintf(texto, sizeof(texto), "%lld", k);
+    _erro("KeyError", texto, NULL);
+}
+
+static inline void _erro_chave_str(_str k) {
+    _erro("KeyError", "", _str_cstr(k));
+}
+
+#define _DICT_MARCA 0xffffffff00000000ULL
+
+static inline size_t _dict_entrada(uint64_t indice) {
+    return (size_t)(indice & 0xffffffffu) - 1;
+}
+
+static inline size_t _dict_capacidade(size_t n) {
+    size_t cap = 8;
+    while (4 * n > 3 * cap) cap *= 2;
+    return cap;
+}
+
+static inline void* _memoria_zerada(size_t n, size_t tamanho) {
+    void* p = calloc(n, tamanho);
+    if (p == NULL) _erro("MemoryError", NULL, NULL);
+    return p;
+}
+"""
+
+DICIONARIO = Template(r"""
+typedef struct {
+    uint64_t hash;
+    $chave chave;
+    $valor valor;
+} _dict_${nome}_entrada;
+
+typedef struct {
+    _objeto objeto;
+    uint64_t* indices;
+    _dict_${nome}_entrada* entradas;
+    size_t len, cap;
+    uint64_t ultimo_hash;
+    $chave ultima_chave;
+    size_t ultima_posicao;
+} _dict_$nome;
+
+static inline void _dict_${nome}_libera(_objeto* o) {
+    free(((_dict_$nome*)o)->indices);
+    free(((_dict_$nome*)o)->entradas);
+}
+
+static inline void _dict_${nome}_vetores(_dict_$nome* d, size_t cap) {
+    d->indices = _memoria_zerada(cap, sizeof(uint64_t));
+    d->entradas = _memoria(d->entradas, cap / 4 * 3 * sizeof(_dict_${nome}_entrada));
+    d->cap = cap;
+    d->ultimo_hash = 0;
+}
+
+static inline _dict_$nome* _dict_${nome}_novo(size_t n) {
+    _dict_$nome* d = _objeto_aloca(sizeof(_dict_$nome), _dict_${nome}_libera);
+    d->entradas = NULL;
+    d->len = 0;
+    _dict_${nome}_vetores(d, _dict_capacidade(n));
+    return d;
+}
+
+static inline size_t _dict_${nome}_posicao(_dict_$nome* d, $chave chave, uint64_t h) {
+    size_t mascara = d->cap - 1, i = (size_t)h & mascara;
+    uint64_t marca = h & _DICT_MARCA, indice;
+    if (d->ultimo_hash == h && _chave_igual_$k(d->ultima_chave, chave)) return d->ultima_posicao;
+    while ((indice = d->indices[i]) != 0
+           && ((indice & _DICT_MARCA) != marca || !_chave_igual_$k(d->entradas[_dict_entrada(indice)].chave, chave)))
+        i = (i + 1) & mascara;
+    d->ultimo_hash = h;
+    d->ultima_chave = chave;
+    d->ultima_posicao = i;
+    return i;
+}
+
+static inline void _dict_${nome}_cresce(_dict_$nome* d) {
+    size_t mascara = 2 * d->cap - 1, e, i;
+    free(d->indices);
+    _dict_${nome}_vetores(d, 2 * d->cap);
+    for (e = 0; e < d->len; e++) {
+        uint64_t h = d->entradas[e].hash;
+        i = (size_t)h & mascara;
+        while (d->indices[i] != 0) i = (i + 1) & mascara;
+        d->indices[i] = (h & _DICT_MARCA) | (e + 1);
+    }
+}
+
+static inline void _dict_${nome}_guarda(_dict_$nome* d, $chave chave, $valor valor) {
+    uint64_t h = _hash_$k(chave);
+    size_t i = _dict_${nome}_posicao(d, chave, h);
+    _dict_${nome}_entrada* e;
+    if (d->indices[i] != 0) {
+        d->entradas[_dict_entrada(d->indices[i])].valor = valor;
+        return;
+    }
+    if (4 * (d->len + 1) > 3 * d->cap) {
+        _dict_${nome}_cresce(d);
+        i = _dict_${nome}_posicao(d, chave, h);
+    }
+    e = &d->entradas[d->len++];
+    e->hash = h;
+    e->chave = chave;
+    e->valor = valor;
+    d->indices[i] = (h & _DICT_MARCA) | d->len;
+}
+
+static inline $valor _dict_${nome}_le(_dict_$nome* d, $chave chave) {
+    uint64_t indice = d->indices[_dict_${nome}_posicao(d, chave, _hash_$k(chave))];
+    if (indice == 0) _erro_chave_$k(chave);
+    return d->entradas[_dict_entrada(indice)].valor;
+}
+
+static inline int _dict_${nome}_contem(_dict_$nome* d, $chave chave) {
+    return d->indices[_dict_${nome}_posicao(d, chave, _hash_$k(chave))] != 0;
+}
+
+static inline _dict_$nome* _dict_${nome}_de(size_t n, $chave* chaves, $valor* valores) {
+    _dict_$nome* d = _dict_${nome}_novo(n);
+    size_t i;
+    for (i = 0; i < n; i++) _dict_${nome}_guarda(d, chaves[i], valores[i]);
+    return d;
+}
+""")
+
+# Cabeçalhos de que o runtime dos dicionários precisa, além de stdio.h e string.h.
+CABECALHOS_DICIONARIOS = ("#include <stdlib.h>", "#include <stdint.h>")
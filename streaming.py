@@ -0,0 +1,65 @@
+# ---------------------------------------------------------------------------------------------------
+# LEITURA EM STREAMING
+# ---------------------------------------------------------------------------------------------------
+# Para entradas muito grandes (scripts gerados por máquina com centenas de MB), o arquivo não é lido
+# inteiro para a memória: ele é lido em blocos de tamanho fixo e quebrado em comandos de nível
+# superior, entregues um de cada vez por um gerador.
+# Um comando de nível superior começa em uma linha na coluna 0 que não é um "else" (que pertence ao
+# if anterior) — a mesma regra de incremental.source_fingerprints. Como cada comando começa com a
+# pilha de indentação em [0] e termina fechando todos os seus blocos, o lexer de cada comando começa
+# e termina com o estado de indentação correto, mesmo que o comando esteja dividido entre dois blocos
+# lidos do arquivo (a linha incompleta do fim de um bloco é completada com o início do seguinte).
+# ---------------------------------------------------------------------------------------------------
+
+TAMANHO_BLOCO = 1 << 20     # 1 MiB
+
+_ESPACOS = (b" ", b"\t", b"\r", b"\n")
+
+def _inicia_comando(linha):
+    if linha[:1] in _ESPACOS or not linha:
+        return False
+    if linha.startswith(b"else"):
+        seguinte = linha[4:5]
+        if not (seguinte.isalnum() or seguinte == b"_"):
+            return False
+    return True
+
+# Lê o arquivo binário f em blocos e devolve, um por vez, (linha inicial, texto) de cada comando de
+# nível superior. Linhas em branco entre comandos ficam no fim do comando anterior; trechos só com
+# espaços e linhas em branco são descartados.
+def iter_top_level_chunks(f, chunk_size=TAMANHO_BLOCO):
+    pendente = b""      # linha incompleta no fim do último bloco lido
+    atual = []          # linhas do comando corrente
+    inicio = 1          # linha onde o comando corrente começa
+    lineno = 1
+
+    def linhas_do_arquivo():
+        nonlocal pendente
+        while True:
+            bloco = f.read(chunk_size)
+            if not bloco:
+                break
+            linhas = (pendente + bloco).split(b"\n")
+            pendente = linhas.pop()
+            for linha in linhas:
+                yield linha + b"\n"
+        if pendente:
+            yield pendente
+
+    for linha in linhas_do_arquivo():
+        if _inicia_comando(linha) and atual:
+            texto = b"".join(atual).decode("utf-8")
+            if texto.strip():
+                yield inicio, texto
+            atual = []
+            inicio = lineno
+        atual.append(linha)
+        lineno += 1
+
+    texto = b"".join(atual).decode("utf-8")
+    if texto.strip():
+        yield inicio, texto
+
+# Diz, sem fazer o parse, se o trecho é uma definição de função.
+def is_function_chunk(texto):
+    return texto.startswith("def") and texto[3:4] in (" ", "\t")
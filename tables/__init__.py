@@ -0,0 +1,7 @@
+# ---------------------------------------------------------------------------------------------------
+# TABELAS PRÉ-GERADAS DO LEXER E DO PARSER
+# ---------------------------------------------------------------------------------------------------
+# lextab_<assinatura>.py: tabela do lexer (regex mestre), carregada em modo otimizado pelo lexer.py.
+# parsetab_<assinatura>.pickle: tabelas LALR, carregadas pelo parser.py.
+# A assinatura é um hash das regras; quando a gramática muda, regenere com: python -m tables
+# ---------------------------------------------------------------------------------------------------
@@ -0,0 +1,29 @@
+# Regenera as tabelas do lexer e do parser para as regras atuais, apagando as tabelas antigas.
+# Uso (na raiz do projeto): python -m tables
+
+import os
+import glob
+
+import ply.lex as lex
+import ply.yacc as yacc
+
+import lexer
+import parser
+
+DIR = os.path.dirname(os.path.abspath(__file__))
+
+def main():
+    for antigo in glob.glob(os.path.join(DIR, "lextab_*.py")) + glob.glob(os.path.join(DIR, "parsetab_*")):
+        os.remove(antigo)
+
+    # Lexer: a validação completa das regras roda aqui (e não a cada início de processo)
+    lex.lex(module=lexer, optimize=1, lextab=lexer.LEXTAB, outputdir=DIR)
+    # Parser: constrói as tabelas LALR mostrando avisos de conflitos, sem gerar parser.out
+    yacc.yacc(module=parser, picklefile=parser.PARSETAB, debug=False, write_tables=True)
+
+    for nome in sorted(os.listdir(DIR)):
+        if nome.startswith(("lextab_", "parsetab_")):
+            print(f"gerado: tables/{nome}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,10 @@
+# lextab_74473e69c17c.py. This file automatically created by PLY (version 3.11). Don't edit!
+_tabversion   = '3.10'
+_lextokens    = set(('AND', 'ARROW', 'ASSIGN', 'BREAK', 'COLON', 'COMMA', 'COMMENT', 'CONTINUE', 'DEDENT', 'DEF', 'DICT', 'DIVIDE', 'DOT', 'ELSE', 'EQEQ', 'FOR', 'GE', 'GT', 'IF', 'IN', 'INDENT', 'LBRACE', 'LBRACKET', 'LE', 'LIST', 'LPAREN', 'LT', 'MINUS', 'NAME', 'NE', 'NEWLINE', 'NOT', 'NUMBER', 'OR', 'PASS', 'PLUS', 'RANGE', 'RBRACE', 'RBRACKET', 'RETURN', 'RPAREN', 'STRING', 'TIMES', 'TYPE', 'WHILE'))
+_lexreflags   = 64
+_lexliterals  = ''
+_lexstateinfo = {'INITIAL': 'inclusive'}
+_lexstatere   = {'INITIAL': [('(?P<t_COMMENT>\\#.*)|(?P<t_NAME>[A-Za-z_][A-Za-z0-9_]*)|(?P<t_NUMBER>\\d+(\\.\\d+)?)|(?P<t_STRING>(\\".*?\\"|\\\'.*?\\\'))|(?P<t_NEWLINE>\\n[ \\t]*)|(?P<t_ARROW>->)|(?P<t_DOT>\\.)|(?P<t_EQEQ>==)|(?P<t_GE>>=)|(?P<t_LBRACE>\\{)|(?P<t_LBRACKET>\\[)|(?P<t_LE><=)|(?P<t_LPAREN>\\()|(?P<t_NE>!=)|(?P<t_PLUS>\\+)|(?P<t_RBRACE>\\})|(?P<t_RBRACKET>\\])|(?P<t_RPAREN>\\))|(?P<t_TIMES>\\*)|(?P<t_ASSIGN>=)|(?P<t_COLON>:)|(?P<t_COMMA>,)|(?P<t_DIVIDE>/)|(?P<t_GT>>)|(?P<t_LT><)|(?P<t_MINUS>-)', [None, ('t_COMMENT', 'COMMENT'), ('t_NAME', 'NAME'), ('t_NUMBER', 'NUMBER'), None, ('t_STRING', 'STRING'), None, ('t_NEWLINE', 'NEWLINE'), (None, 'ARROW'), (None, 'DOT'), (None, 'EQEQ'), (None, 'GE'), (None, 'LBRACE'), (None, 'LBRACKET'), (None, 'LE'), (None, 'LPAREN'), (None, 'NE'), (None, 'PLUS'), (None, 'RBRACE'), (None, 'RBRACKET'), (None, 'RPAREN'), (None, 'TIMES'), (None, 'ASSIGN'), (None, 'COLON'), (None, 'COMMA'), (None, 'DIVIDE'), (None, 'GT'), (None, 'LT'), (None, 'MINUS')])]}
+_lexstateignore = {'INITIAL': ' \t'}
+_lexstateerrorf = {'INITIAL': 't_error'}
+_lexstateeoff = {'INITIAL': 't_eof'}
@@ -0,0 +1,71 @@
+# ---------------------------------------------------------------------------------------------------
+# TESTES DE PROGRAMAS TRANSPILADOS
+# ---------------------------------------------------------------------------------------------------
+# Cada teste transpila um pequeno programa, compila o C gerado (build.Builder) e confere a saída do
+# executável com a do mesmo programa no CPython. Sem um compilador C na máquina, os testes são pulados.
+# Uso: python -m pytest -q
+# ---------------------------------------------------------------------------------------------------
+
+import os
+import sys
+import shutil
+import subprocess
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from transpiler import Transpiler
+from build import Builder, COMPILADOR_PADRAO
+
+pytestmark = pytest.mark.skipif(shutil.which(COMPILADOR_PADRAO) is None,
+                                reason=f"compilador C não encontrado: {COMPILADOR_PADRAO!r}")
+
+
+# Transpila e compila fonte (com as opções do Transpiler) em tmp_path e devolve a saída do executável.
+def executa(tmp_path, fonte, **opcoes):
+    fonte_c = str(tmp_path / "programa.c")
+    binario = str(tmp_path / "programa")
+    with open(fonte_c, "w", encoding="utf-8") as f:
+        f.write(Transpiler(**opcoes).transpile(fonte))
+    Builder(link_flags=("-lm",)).build(fonte_c, binario)
+    return subprocess.run([binario], capture_output=True, text=True, check=True).stdout
+
+def saida_do_python(fonte):
+    return subprocess.run([sys.executable, "-c", fonte], capture_output=True, text=True, check=True).stdout
+
+
+# Contagem com um dicionário vazio sem anotação: o tipo dos valores vem do d[k] = 1 do else, mesmo com
+# o d[k] do if lido antes dele.
+CONTAGEM = """\
+palavras = ["a", "b", "a", "c", "a"]
+contagem = {}
+for i in range(len(palavras)):
+    p = palavras[i]
+    if p in contagem:
+        contagem[p] = contagem[p] + 1
+    else:
+        contagem[p] = 1
+print(len(contagem), contagem["a"], contagem["c"])
+"""
+
+@pytest.mark.parametrize("c_types", ["native", "wide", "narrow"])
+def test_contagem_em_dicionario_sem_anotacao(tmp_path, c_types):
+    assert executa(tmp_path, CONTAGEM, c_types=c_types) == saida_do_python(CONTAGEM)
+
+
+# str de um float do C (modos native e narrow): o menor texto que volta ao mesmo float de precisão
+# simples, sem o ruído do double que ele vira (1.1 não é 1.100000023841858); com double, o do Python.
+STR_DE_FLOAT = """\
+x = 0.1 + 0.2
+y = 1.1
+print(str(x))
+print("y=" + str(y), str(2.5), str(y * 1000.0), str(0.001))
+"""
+
+@pytest.mark.parametrize("c_types", ["native", "narrow"])
+def test_str_de_float_de_precisao_simples(tmp_path, c_types):
+    assert executa(tmp_path, STR_DE_FLOAT, c_types=c_types) == "0.3\ny=1.1 2.5 1100.0 0.001\n"
+
+def test_str_de_float_em_double(tmp_path):
+    assert executa(tmp_path, STR_DE_FLOAT, c_types="wide") == saida_do_python(STR_DE_FLOAT)
@@ -0,0 +1,415 @@
+# ---------------------------------------------------------------------------------------------------
+# TRANSPILER
+# ---------------------------------------------------------------------------------------------------
+# Junta as três etapas (lexer -> parser -> gerador de código C) em um único objeto reentrante.
+# Cada instância de Transpiler tem o seu próprio lexer (pilha de indentação e fila de tokens
+# pendentes), o seu próprio parser e o seu próprio CGenerator, então várias instâncias podem
+# transpilar fontes diferentes ao mesmo tempo, por exemplo a partir de um pool de threads.
+# As tabelas LALR e a regex do lexer são compartilhadas (somente leitura) entre as instâncias.
+# ---------------------------------------------------------------------------------------------------
+
+import gc
+import io
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+from lexer import build_lexer, reset_lexer
+from parser import build_parser
+from codegen import CGenerator, C_TYPE_MODES
+from incremental import IncrementalCache, source_fingerprints
+from optimizer import Optimizer, optimize_statements
+from streaming import iter_top_level_chunks, is_function_chunk
+from profiling import Profiler, TimedSink, count_nodes
+from ast_nodes import FunctionDef
+
+VERSION = "0.2.0"
+
+# Módulos cujo código determina a saída gerada. O hash deles entra na versão usada como chave do
+# cache, então qualquer mudança no transpilador invalida automaticamente os resultados antigos.
+_MODULOS_DO_PIPELINE = ("lexer.py", "parser.py", "ast_nodes.py", "codegen.py", "incremental.py",
+                        "streaming.py", "transpiler.py", "annotate.py", "optimizer.py", "runtime.py")
+_versao_completa = None
+
+def transpiler_version():
+    global _versao_completa
+    if _versao_completa is None:
+        h = hashlib.sha256()
+        base = os.path.dirname(os.path.abspath(__file__))
+        for nome in _MODULOS_DO_PIPELINE:
+            with open(os.path.join(base, nome), "rb") as f:
+                h.update(f.read())
+        _versao_completa = f"{VERSION}+{h.hexdigest()[:16]}"
+    return _versao_completa
+
+# Pausa o coletor de lixo durante as passadas que criam muitos objetos sem ciclos (parse, otimização):
+# as coletas completas, cada vez mais caras à medida que a árvore cresce, tornariam essas passadas
+# superlineares em entradas grandes.
+@contextmanager
+def _sem_gc():
+    gc_ativo = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if gc_ativo:
+            gc.enable()
+
+# Abre saida para escrita e chama escreve(arquivo). Se escreve falhar, o arquivo é apagado, para não
+# deixar para trás uma saída pela metade; se o próprio open falhar, o erro dele sobe sem mudanças.
+def _grava(saida, escreve):
+    f = open(saida, "w", encoding="utf-8")
+    try:
+        with f:
+            escreve(f)
+    except BaseException:
+        os.remove(saida)
+        raise
+
+# Lexer que só entrega tokens já produzidos (ver Transpiler.tokenize). Tem os atributos que o parser
+# e as ações das regras usam do lexer: token, lexdata, lineno e lexpos.
+class _TokensProntos:
+    def __init__(self, tokens, source, lineno):
+        self._tokens = iter(tokens)
+        self.lexdata = source
+        self.lineno = lineno
+        self.lexpos = 0
+
+    def token(self):
+        tok = next(self._tokens, None)
+        if tok is not None:
+            self.lineno = tok.lineno
+            self.lexpos = tok.lexpos
+        return tok
+
+
+class Transpiler:
+    # cache: um TranspileCache (cache.py) opcional; sem ele, todo fonte é transpilado do zero.
+    # incremental: mantém entre as chamadas um IncrementalCache com o C de cada função e comando do main,
+    #   de forma que transpilar de novo um fonte com uma função editada só regenera o que mudou.
+    # optimize: passa a AST pelo otimizador (optimizer.py) antes da geração de código.
+    # c_types: modo de tipos do C ("native", "wide" ou "narrow"; ver codegen.C_TYPE_MODES).
+    # fast_io: o C gerado escreve a saída com o runtime de saída bufferizada (ver runtime.py).
+    # bounds_check: o C gerado confere os índices das listas (ver CGenerator).
+    def __init__(self, cache=None, incremental=False, optimize=True, c_types="native", fast_io=False,
+                 bounds_check=True):
+        if c_types not in C_TYPE_MODES:
+            raise ValueError(f"modo de tipos desconhecido: {c_types!r} (use {', '.join(C_TYPE_MODES)})")
+        self.cache = cache
+        self.optimize = optimize
+        self.c_types = c_types
+        self.fast_io = fast_io
+        self.bounds_check = bounds_check
+        self.incremental = IncrementalCache() if incremental else None
+        self.lexer = build_lexer()
+        self.parser = build_parser()
+        # Gerador usado na última chamada de transpile() (um novo a cada chamada).
+        self.generator = None
+        # Remoções feitas pelo otimizador na última transpilação (ver removed).
+        self._removidos = {}
+        # Uma mesma instância compartilhada entre threads continua correta: as chamadas são serializadas.
+        # Para paralelismo de verdade, use uma instância por thread.
+        self._lock = threading.Lock()
+
+    # Faz a análise léxica e sintática do código-fonte e devolve a AST (nó Program).
+    # Levanta SyntaxError se o lexer (um caractere inválido) ou o parser encontrou algum erro.
+    # lineno: número da primeira linha de source no arquivo (usado nas mensagens de erro).
+    # tokens: opcional, os tokens de source já produzidos por tokenize; normalmente o lexer é chamado
+    #   pelo próprio parser, à medida que ele precisa dos tokens.
+    def parse(self, source, lineno=1, tokens=None):
+        self.parser.errors = []
+        if tokens is None:
+            reset_lexer(self.lexer)
+            self.lexer.lineno = lineno
+            entrada, lexer = source, self.lexer
+        else:
+            entrada, lexer = None, _TokensProntos(tokens, source, lineno)
+        # A AST não tem ciclos (ver _sem_gc)
+        with _sem_gc():
+            ast = self.parser.parse(entrada, lexer=lexer)
+        if tokens is None and self.lexer.errors:
+            raise SyntaxError(self.lexer.errors[0])
+        if self.parser.errors:
+            raise SyntaxError(self.parser.errors[0])
+        if ast is None:
+            raise SyntaxError("Erro sintático: programa vazio ou inválido")
+        return ast
+
+    # Só a análise léxica: devolve a lista com todos os tokens de source (que pode ser passada a parse).
+    # Levanta SyntaxError se o lexer encontrou um caractere inválido.
+    def tokenize(self, source, lineno=1):
+        reset_lexer(self.lexer)
+        self.lexer.lineno = lineno
+        self.lexer.input(source)
+        with _sem_gc():
+            tokens = list(iter(self.lexer.token, None))
+        if self.lexer.errors:
+            raise SyntaxError(self.lexer.errors[0])
+        return tokens
+
+    # Opções que alteram o código gerado (entram na chave do cache).
+    def options(self):
+        return {"optimize": self.optimize, "c_types": self.c_types, "fast_io": self.fast_io,
+                "bounds_check": self.bounds_check}
+
+    def cache_key(self, source):
+        return self.cache.key(source, transpiler_version(), self.options())
+
+    # Transpila o código Python recebido como string e devolve o código C como string.
+    def transpile(self, source):
+        if self.cache is None:
+            return self._generate(source)
+        key = self.cache_key(source)
+        codigo_c = self.cache.get(key)
+        if codigo_c is None:
+            codigo_c = self._generate(source)
+            self.cache.put(key, codigo_c)
+        return codigo_c
+
+    # Executa o pipeline completo, sem consultar o cache.
+    # Sem saida, devolve o código C como string. Com saida (caminho de arquivo), o código é escrito no
+    # arquivo à medida que é gerado; o arquivo só é aberto depois de um parse sem erros e é apagado se
+    # a geração falhar no meio.
+    def _generate(self, source, saida=None):
+        with self._lock:
+            ast = self.parse(source)
+            fingerprints = self._optimize(ast, source)
+            if saida is None:
+                return self._codegen(ast, fingerprints, None)
+            _grava(saida, lambda f: self._codegen(ast, fingerprints, f))
+
+    # O que o otimizador removeu na última transpilação (funções não usadas, código inalcançável,
+    # atribuições mortas): uma lista de {"tipo", "nome", "linha", "motivo"} (ver optimizer.py).
+    @property
+    def removed(self):
+        return sorted(self._removidos.values(), key=lambda r: r["linha"])
+
+    # Otimiza a AST (se self.optimize) e devolve, no modo incremental, as impressões digitais dos
+    # comandos de nível superior resultantes (None fora dele ou se não puderem ser tiradas do texto).
+    # A de um comando do main que mudou por causa de outros comandos (constantes propagadas,
+    # atribuições a variáveis nunca lidas removidas) inclui o que veio de fora; a de cada comando que
+    # saiu de um if eliminado inclui a sua posição.
+    def _optimize(self, ast, source):
+        self._removidos = {}
+        fingerprints = None
+        if self.incremental is not None:
+            fingerprints = source_fingerprints(source)
+            if len(fingerprints) != len(ast.statements):
+                fingerprints = None
+        if not self.optimize:
+            return fingerprints
+        statements, novas = [], []
+        with _sem_gc():
+            otimizados = list(optimize_statements(ast.statements, self._removidos))
+        for i, (finais, de_fora) in enumerate(otimizados):
+            statements.extend(finais)
+            if fingerprints is None:
+                continue
+            if len(finais) == 1 and de_fora == ((), ()):
+                novas.append(fingerprints[i])
+                continue
+            novas.extend(hashlib.sha1(f"{fingerprints[i]}{de_fora!r}{j}".encode("utf-8")).hexdigest()
+                         for j in range(len(finais)))
+        ast.statements = statements
+        return novas if fingerprints is not None else None
+
+    def _codegen(self, ast, fingerprints, sink):
+        self.generator = CGenerator(cache=self.incremental, sink=sink, c_types=self.c_types, fast_io=self.fast_io,
+                                    bounds_check=self.bounds_check)
+        return self.generator.generate(ast, fingerprints=fingerprints)
+
+    # Transpila o arquivo entrada e grava o resultado em saida.
+    # O C é escrito no arquivo à medida que é gerado, sem montar a string do programa inteiro.
+    # Com cache, um acerto custa só o hash do fonte e a cópia do arquivo. Devolve True se veio do cache.
+    # stream: usa transpile_stream, com memória proporcional ao maior comando e não ao arquivo.
+    def transpile_file(self, entrada, saida, stream=False):
+        os.makedirs(os.path.dirname(saida) or ".", exist_ok=True)
+        if stream:
+            key = None
+            if self.cache is not None:
+                key = self.cache.key_file(entrada, transpiler_version(), self.options())
+                if self.cache.copy_to(key, saida):
+                    return True
+            with open(entrada, "rb") as fin:
+                _grava(saida, lambda fout: self.transpile_stream(fin, fout))
+            if key is not None:
+                self.cache.put_file(key, saida)
+            return False
+
+        with open(entrada, "r", encoding="utf-8") as f:
+            source = f.read()
+        key = None
+        if self.cache is not None:
+            key = self.cache_key(source)
+            if self.cache.copy_to(key, saida):
+                return True
+        self._generate(source, saida)
+        if key is not None:
+            self.cache.put_file(key, saida)
+        return False
+
+    # PERFIL
+        # Executa o pipeline completo (sem consultar o cache de transpilação) medindo cada etapa em
+        # separado e devolve o relatório (ver profiling.py). Com saida, o C é gravado no arquivo como
+        # em transpile_file; sem, é gerado em uma string, que é descartada.
+        # memoria: mede o pico de memória de cada etapa; top: número de funções do cProfile no relatório.
+    def profile(self, source, saida=None, memoria=True, top=0):
+        with self._lock, Profiler(memoria, top) as perfil:
+            self._profile(perfil, source, saida)
+        return perfil.report(versao=transpiler_version())
+
+    def profile_file(self, entrada, saida=None, memoria=True, top=0):
+        if saida is not None:
+            os.makedirs(os.path.dirname(saida) or ".", exist_ok=True)
+        with self._lock, Profiler(memoria, top) as perfil:
+            with perfil.stage("leitura"):
+                with open(entrada, "r", encoding="utf-8") as f:
+                    source = f.read()
+            self._profile(perfil, source, saida)
+        return perfil.report(versao=transpiler_version(), arquivo=entrada)
+
+    def _profile(self, perfil, source, saida):
+        with perfil.stage("lex"):
+            tokens = self.tokenize(source)
+        with perfil.stage("parse"):
+            ast = self.parse(source, tokens=tokens)
+        perfil.contagens.update(bytes=len(source), linhas=source.count("\n"), tokens=len(tokens),
+                                nos_ast=count_nodes(ast))
+        del tokens
+        with perfil.stage("otimizacao"):
+            fingerprints = self._optimize(ast, source)
+        perfil.contagens["removidos"] = len(self._removidos)
+
+        self.generator = gen = CGenerator(cache=self.incremental, c_types=self.c_types, fast_io=self.fast_io,
+                                          bounds_check=self.bounds_check)
+        with perfil.stage("tipos"):
+            resolvido = gen.resolve_program(ast, fingerprints)
+
+        def gera(destino):
+            gen.sink = TimedSink(destino)
+            with perfil.stage("codegen"):
+                gen.emit_program(resolvido)
+            perfil.record_writes("escrita", gen.sink, dentro_de="codegen")
+
+        if saida is None:
+            gera(io.StringIO())
+        else:
+            _grava(saida, gera)
+
+    # TRANSPILAÇÃO EM STREAMING
+        # Lê a entrada (arquivo binário com seek) em blocos, faz o parse de um comando de nível superior
+        # por vez e grava o C em saida (arquivo texto) assim que cada comando é gerado. Só os comandos
+        # sendo processados ficam na memória, mais o texto das funções (não a sua AST). Como as
+        # especializações das funções dependem de todas as chamadas do programa e o C precisa das
+        # funções antes do main, a entrada é percorrida em quatro passadas:
+            # 1. só as funções: guarda o texto de cada uma (a AST é refeita quando a função é necessária);
+            # 2. só os comandos do main: resolve as especializações das funções (CGenerator.resolve_specializations);
+            # 3. só as funções: gera o C de cada especialização;
+            # 4. só os comandos do main: gera o main.
+        # Com o otimizador, há ainda duas passadas pelos comandos do main antes da 2, uma para saber
+        # quais variáveis do main são atribuídas uma única vez e outra para saber quais são lidas e
+        # quais funções são chamadas (ver optimizer.py); na passada 1, as funções também são otimizadas,
+        # para saber quais funções cada uma chama.
+        # O resultado é idêntico ao de transpile() para a mesma entrada.
+    def transpile_stream(self, entrada, saida, chunk_size=None):
+        with self._lock:
+            gen = CGenerator(sink=saida, c_types=self.c_types, fast_io=self.fast_io,
+                             bounds_check=self.bounds_check)
+            self.generator = gen
+
+            def trechos(so_funcoes):
+                entrada.seek(0)
+                chunks = iter_top_level_chunks(entrada) if chunk_size is None else \
+                    iter_top_level_chunks(entrada, chunk_size)
+                for lineno, texto in chunks:
+                    if is_function_chunk(texto) == so_funcoes:
+                        yield lineno, texto
+
+            def comandos_do_main():
+                for lineno, texto in trechos(so_funcoes=False):
+                    yield from self.parse(texto, lineno).statements
+
+            self._removidos = {}
+            otimizador = Optimizer(comandos_do_main(), self._removidos) if self.optimize else None
+
+            def comandos_otimizados():
+                if otimizador is None:
+                    yield from comandos_do_main()
+                    return
+                otimizador.reset()
+                for s in comandos_do_main():
+                    for novo in otimizador.optimize(s):
+                        yield from otimizador.eliminate(novo)
+
+            fontes = {}
+            for lineno, texto in trechos(so_funcoes=True):
+                for f in self.parse(texto, lineno).statements:
+                    if isinstance(f, FunctionDef):
+                        fontes[f.name] = (lineno, texto)     # redefinida: vale a última
+                        if otimizador is not None:
+                            otimizador.collect(otimizador.optimize(f)[0])
+            if otimizador is not None:
+                # Usos no main, para decidir as atribuições mortas e as funções não usadas
+                otimizador.reset()
+                for s in comandos_do_main():
+                    for novo in otimizador.optimize(s):
+                        otimizador.collect(novo)
+                otimizador.finish()
+                fontes = {nome: fonte for nome, fonte in fontes.items() if nome in otimizador.reachable}
+            gen.functions = _FuncoesDoTexto(self, fontes)
+            gen.resolve_specializations(comandos_otimizados)
+
+            gen.emit_headers()
+            for lineno, texto in trechos(so_funcoes=True):
+                for f in self.parse(texto, lineno).statements:
+                    if not isinstance(f, FunctionDef) or otimizador is not None and not otimizador.eliminate(f):
+                        continue
+                    if fontes[f.name][0] == lineno:
+                        gen.generate_function_def(self._optimize_function(f))
+                        gen.result.append("")
+                        gen.flush()
+
+            gen.begin_main()
+            for s in comandos_otimizados():
+                gen.generate_main_statement(s)
+                gen.flush()
+            gen.end_main()
+            gen.flush()
+
+    # Otimiza uma função isolada (a otimização do corpo de uma função não depende do resto do programa).
+    def _optimize_function(self, f):
+        if not self.optimize:
+            return f
+        return Optimizer(report=self._removidos).optimize(f)[0]
+
+
+# Funções do programa no modo streaming, no formato de CGenerator.functions (nome -> FunctionDef), mas
+# guardando só o texto de cada função: a AST é refeita pelo parse quando pedida, e só as últimas
+# TAMANHO_CACHE_FUNCOES ficam na memória.
+class _FuncoesDoTexto:
+    TAMANHO_CACHE_FUNCOES = 64
+
+    def __init__(self, transpiler, fontes):
+        self.transpiler = transpiler
+        self.fontes = fontes
+        self._recentes = OrderedDict()
+
+    def __iter__(self):
+        return iter(self.fontes)
+
+    def get(self, nome):
+        f = self._recentes.get(nome)
+        if f is not None:
+            self._recentes.move_to_end(nome)
+            return f
+        fonte = self.fontes.get(nome)
+        if fonte is None:
+            return None
+        lineno, texto = fonte
+        f = self.transpiler._optimize_function(self.transpiler.parse(texto, lineno).statements[0])
+        self._recentes[nome] = f
+        if len(self._recentes) > self.TAMANHO_CACHE_FUNCOES:
+            self._recentes.popitem(last=False)
+        return f